@@ -1,7 +1,29 @@
+import asyncio
+import contextvars
+import functools
+import hmac
+import logging
 import os
-from fastapi import FastAPI
-from pydantic import BaseModel
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, ConfigDict
+from api.responses import FastJSONResponse, dumps, json_response
+from api.serve import PARENT_PID_ENV, RELOAD_SIGNAL
 from recommender.scorer import SHLRecommender
+from recommender.batching import MicroBatcher
+from recommender import metrics
+from recommender.ann import parse_search_params
+from recommender.bundle import BundleError, bundle_exists
+from recommender.catalogs import CatalogRegistry, UnknownCatalogError, parse_catalogs
+from recommender.embedding import shared_encoders
+from recommender.index_manager import IndexManager
+from recommender.result_store import ResultStore
 
 # ============================================================
 # Resolve project root directory
@@ -15,72 +37,838 @@ DATA_PATH = os.path.join(
     "assessments.json"
 )
 
+# Versioned index bundle written by `python -m recommender.build_index`
+BUNDLE_DIR = os.getenv(
+    "SHL_INDEX_BUNDLE",
+    os.path.join(BASE_DIR, "data", "processed", "index_bundle")
+)
+
+# Query encoder backend: "torch" (fp32), "int8" (dynamic quantization) or "onnx"
+ENCODER_BACKEND = os.getenv("SHL_ENCODER_BACKEND", "torch")
+
+# Queries longer than the encoder's max sequence length: truncated
+# (unset), or split into overlapping token windows that are pooled
+# ("mean" / "max") or searched separately with fused hits ("fusion")
+LONG_QUERY_MODE = os.getenv("SHL_LONG_QUERY_MODE", "") or None
+LONG_QUERY_OVERLAP = int(os.getenv("SHL_LONG_QUERY_OVERLAP", "64"))
+LONG_QUERY_MAX_WINDOWS = int(os.getenv("SHL_LONG_QUERY_MAX_WINDOWS", "8"))
+
+# Answer short keyword queries from the BM25 index when the match is
+# confident; fuse dense + BM25 rankings for other short queries
+LEXICAL_ROUTING = os.getenv("SHL_LEXICAL_ROUTING", "0") == "1"
+
+# Diversified results: unset, "collapse" (one per near-duplicate cluster)
+# or "mmr" (maximal marginal relevance, relevance weight SHL_MMR_LAMBDA)
+DIVERSITY = os.getenv("SHL_DIVERSITY", "") or None
+MMR_LAMBDA = float(os.getenv("SHL_MMR_LAMBDA", "0.5"))
+
+# Extra named catalogs served under /catalogs/{name}/recommend, e.g.
+# "uk=/bundles/uk,us=/bundles/us" (index bundle dirs or legacy JSON paths)
+CATALOGS = parse_catalogs(os.getenv("SHL_CATALOGS", ""))
+
+# Least recently used catalogs are evicted past this many MB (0 = no limit)
+CATALOG_MEMORY_MB = float(os.getenv("SHL_CATALOG_MEMORY_MB", "0"))
+
+# Max number of normalized query embeddings kept in the LRU cache
+QUERY_CACHE_SIZE = int(os.getenv("SHL_QUERY_CACHE_SIZE", "1024"))
+
+# ANN search tuning, e.g. "nprobe=16,efSearch=64"
+SEARCH_PARAMS = parse_search_params(os.getenv("SHL_SEARCH_PARAMS", ""))
+
+# Verify SHA-256 checksums of every bundle file on load and reload, not
+# only sizes (startup and reloads then take time proportional to the bundle)
+VERIFY_CHECKSUMS = os.getenv("SHL_VERIFY_CHECKSUMS", "0") == "1"
+
+# Poll the index artifacts every N seconds and hot-reload on change (0 = off)
+INDEX_WATCH_SECONDS = float(os.getenv("SHL_INDEX_WATCH_SECONDS", "0"))
+
+# Token required by /admin/* endpoints (unset = admin endpoints disabled)
+ADMIN_TOKEN = os.getenv("SHL_ADMIN_TOKEN", "")
+
+# Max number of queries accepted by /recommend/batch
+MAX_BATCH_QUERIES = int(os.getenv("SHL_MAX_BATCH_QUERIES", "512"))
+
+# Opt-in request coalescing for /recommend
+MICROBATCH_ENABLED = os.getenv("SHL_MICROBATCH", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("SHL_MICROBATCH_MAX_SIZE", "16"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("SHL_MICROBATCH_MAX_WAIT_MS", "5"))
+
+# Responses at least this large are gzip/br compressed when the client
+# accepts it (0 = never compress)
+COMPRESS_MIN_BYTES = int(os.getenv("SHL_COMPRESS_MIN_BYTES", "0"))
+
+# Opt-in async /recommend endpoints that run retrieval + serialization on
+# a dedicated executor instead of the shared default threadpool
+ASYNC_ENDPOINTS = os.getenv("SHL_ASYNC_ENDPOINTS", "0") == "1"
+ENCODE_WORKERS = int(os.getenv("SHL_ENCODE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Intra-op threads per process for torch and FAISS (0 = library default).
+# `python -m api.serve` sets this to cores // workers.
+TORCH_THREADS = int(os.getenv("SHL_TORCH_THREADS", "0"))
+
+# Requests slower than this are logged with a per-stage breakdown (0 = off)
+SLOW_QUERY_MS = float(os.getenv("SHL_SLOW_QUERY_MS", "0"))
+
+# Load the model and index in a background thread once the server is
+# listening (1), or synchronously at import (0)
+BACKGROUND_LOAD = os.getenv("SHL_BACKGROUND_LOAD", "1") == "1"
+
+slow_query_log = logging.getLogger("shl.slow_query")
+startup_log = logging.getLogger("shl.startup")
+
+# Set once the index is loaded and the model warmed up (readiness)
+ready = threading.Event()
+
+
+def configure_threads():
+    """
+    Caps torch / FAISS intra-op threads so workers don't oversubscribe
+    cores. Runs at import and again in each (forked) worker.
+    """
+    if TORCH_THREADS <= 0:
+        return
+
+    try:
+        import torch
+    except ImportError:
+        torch = None
+
+    import faiss
+
+    if torch is not None:
+        torch.set_num_threads(TORCH_THREADS)
+    faiss.omp_set_num_threads(TORCH_THREADS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup/shutdown. Background threads are started here rather
+    than at import, so a pre-forking parent (api.serve) never owns them.
+    The server starts listening right away; /ready reports 503 until the
+    background load has finished.
+    """
+    configure_threads()
+
+    if recommender is not None:
+        index_manager.start()
+    else:
+        threading.Thread(target=background_startup, name="shl-startup", daemon=True).start()
+
+    yield
+
+    ready.clear()
+    if index_manager is not None:
+        index_manager.close()
+    if batcher is not None:
+        batcher.close()
+    if encode_executor is not None:
+        encode_executor.shutdown(wait=False)
+
 # ============================================================
 # Initialize FastAPI application
 # ============================================================
 app = FastAPI(
     title="SHL Assessment Recommendation API",
     description="API that recommends relevant SHL Individual Test Solutions based on a natural language query",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
+)
+
+configure_threads()
+
+# ============================================================
+# Recommender, hot-reload manager and micro-batcher
+# (None until load_recommender() has finished)
+# ============================================================
+recommender = None
+index_manager = None
+batcher = None
+
+load_lock = threading.Lock()
+load_error = None
+load_seconds = None
+
+
+def recommender_options() -> dict:
+    """
+    SHLRecommender settings shared by the default index and every catalog.
+    """
+    return {
+        "cache_size": QUERY_CACHE_SIZE,
+        "search_params": SEARCH_PARAMS,
+        "backend": ENCODER_BACKEND,
+        "long_query_mode": LONG_QUERY_MODE,
+        "window_overlap": LONG_QUERY_OVERLAP,
+        "max_windows": LONG_QUERY_MAX_WINDOWS,
+        "lexical_routing": LEXICAL_ROUTING,
+        "diversity": DIVERSITY,
+        "mmr_lambda": MMR_LAMBDA,
+        "verify_checksums": VERIFY_CHECKSUMS
+    }
+
+
+def load_recommender():
+    """
+    Loads the model and index (the prebuilt index bundle when present,
+    otherwise the legacy precomputed embeddings), warms up the encoder
+    and marks the app ready. Idempotent; api.serve calls it before
+    forking so workers start warm.
+    """
+    global recommender, index_manager, batcher, load_error, load_seconds
+
+    with load_lock:
+        if recommender is not None:
+            return
+
+        started = time.perf_counter()
+        try:
+            if bundle_exists(BUNDLE_DIR):
+                source = {"bundle_dir": BUNDLE_DIR}
+            else:
+                source = {"json_path": DATA_PATH}
+
+            loaded = SHLRecommender(**recommender_options(), **source)
+
+            # Warm up before reporting ready
+            loaded.warmup()
+        except Exception as e:
+            load_error = f"{type(e).__name__}: {e}"
+            raise
+
+        # Index hot-reload (admin call or artifact watcher)
+        index_manager = IndexManager(
+            loaded,
+            bundle_dir=BUNDLE_DIR,
+            json_path=DATA_PATH,
+            poll_seconds=INDEX_WATCH_SECONDS
+        )
+
+        # Optional micro-batching of concurrent /recommend calls
+        if MICROBATCH_ENABLED:
+            batcher = MicroBatcher(
+                loaded,
+                max_batch_size=MICROBATCH_MAX_SIZE,
+                max_wait_ms=MICROBATCH_MAX_WAIT_MS
+            )
+
+        # Published last: request handlers treat it as the ready flag
+        recommender = loaded
+        load_seconds = time.perf_counter() - started
+        ready.set()
+        startup_log.info("recommender ready in %.2fs (index %s)",
+                         load_seconds, loaded.index_version)
+
+
+def reload_from_signal():
+    """
+    api.serve's reload broadcast: reloads this worker's index in the
+    background if the artifacts changed since its last attempt, so the
+    worker that handled /admin/reload does not load them twice.
+    """
+    if index_manager is not None:
+        threading.Thread(target=index_manager.check, name="shl-index-reload", daemon=True).start()
+
+
+def signal_other_workers() -> bool:
+    """
+    Under api.serve, asks the parent to broadcast a reload to every
+    worker. Returns False when not running pre-forked.
+    """
+    parent = os.getenv(PARENT_PID_ENV)
+    if not parent:
+        return False
+    os.kill(int(parent), RELOAD_SIGNAL)
+    return True
+
+
+def background_startup():
+    try:
+        load_recommender()
+    except Exception:
+        startup_log.exception("recommender failed to load")
+        return
+    index_manager.start()
+
+
+if not BACKGROUND_LOAD:
+    load_recommender()
+
+# ============================================================
+# Named catalogs (loaded on first use, sharing the encoder)
+# ============================================================
+catalogs = CatalogRegistry(
+    CATALOGS,
+    memory_budget=int(CATALOG_MEMORY_MB * 2**20),
+    **recommender_options()
 )
 
 # ============================================================
-# Load recommender once at startup
-# (Uses precomputed embeddings + FAISS index)
+# Metrics
 # ============================================================
-recommender = SHLRecommender(json_path=DATA_PATH)
+REQUESTS = metrics.REGISTRY.register(metrics.Counter(
+    "shl_requests_total",
+    "HTTP requests by path and status",
+    label_names=("path", "status")
+))
+ERRORS = metrics.REGISTRY.register(metrics.Counter(
+    "shl_request_errors_total",
+    "HTTP requests that failed with a 5xx or an exception",
+    label_names=("path",)
+))
+REQUEST_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "shl_request_duration_seconds",
+    "End-to-end request latency",
+    label_names=("path",)
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "shl_ready",
+    "1 once the index is loaded and the model warmed up",
+    callback=lambda: ready.is_set()
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "shl_startup_load_seconds",
+    "Time taken by the startup model + index load and warmup",
+    callback=lambda: load_seconds or 0
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "shl_index_size",
+    "Number of vectors in the loaded index",
+    callback=lambda: recommender.index.ntotal if recommender else 0
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "shl_index_loaded_timestamp_seconds",
+    "Unix time the live index was loaded",
+    callback=lambda: recommender.state.loaded_at if recommender else 0
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "shl_query_cache_hits",
+    "Query embedding cache hits",
+    callback=lambda: recommender.query_cache.hits if recommender else 0
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "shl_query_cache_misses",
+    "Query embedding cache misses",
+    callback=lambda: recommender.query_cache.misses if recommender else 0
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "shl_catalogs_loaded",
+    "Named catalogs currently loaded in memory",
+    callback=lambda: sum(1 for c in catalogs.status() if c["loaded"])
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "shl_catalog_memory_bytes",
+    "Approximate memory held by loaded named catalogs",
+    callback=lambda: catalogs.loaded_bytes()
+))
+if MICROBATCH_ENABLED:
+    metrics.REGISTRY.register(metrics.Gauge(
+        "shl_microbatch_queue_depth",
+        "Queries waiting in the micro-batcher",
+        callback=lambda: batcher.stats()["queue_depth"] if batcher else 0
+    ))
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Counts requests/errors, times them, and traces per-stage timings
+    for the slow-query log.
+    """
+    trace, token = metrics.start_trace()
+    status = 500
+
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - trace["_started"]
+        metrics.end_trace(token)
+
+        # Label by route template to keep label cardinality bounded
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+
+        REQUESTS.inc(path, str(status))
+        REQUEST_SECONDS.observe(elapsed, path)
+        if status >= 500:
+            ERRORS.inc(path)
+
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            stages = {
+                name: round(seconds * 1000, 3)
+                for name, seconds in trace.items()
+                if not name.startswith("_")
+            }
+            slow_query_log.warning(
+                "slow request path=%s status=%s total_ms=%.3f stages_ms=%s",
+                path, status, elapsed * 1000, stages
+            )
 
 # ============================================================
 # Request schema
 # ============================================================
+class RecommendationFilters(BaseModel):
+    # Unknown keys are rejected (422); remote_support is not filterable
+    # because the crawl cannot see it
+    model_config = ConfigDict(extra="forbid")
+
+    test_type: Optional[List[str]] = None        # letter codes or names, any-of
+    job_levels: Optional[List[str]] = None       # any-of
+    languages: Optional[List[str]] = None        # any-of
+    adaptive_support: Optional[bool] = None
+    max_duration: Optional[int] = None           # minutes
+
+
 class RecommendationRequest(BaseModel):
     query: str
     top_k: int = 5
+    filters: Optional[RecommendationFilters] = None
+    fields: Optional[List[str]] = None           # e.g. ["url", "name"]; default all
+
+
+class BatchRecommendationRequest(BaseModel):
+    queries: List[str]
+    top_k: int = 5
+    filters: Optional[RecommendationFilters] = None
+    fields: Optional[List[str]] = None
+
+
+class MultiCatalogRecommendationRequest(BaseModel):
+    query: str
+    catalogs: Optional[List[str]] = None         # default: every catalog
+    top_k: int = 5
+    filters: Optional[RecommendationFilters] = None
+    fields: Optional[List[str]] = None
 
+
+# ============================================================
+# Response schema (documentation; bodies are pre-serialized)
 # ============================================================
-# Health Check Endpoint
+class Assessment(BaseModel):
+    # Fields are omitted when excluded by the request's `fields`
+    url: Optional[str] = None
+    name: Optional[str] = None
+    adaptive_support: Optional[str] = None
+    description: Optional[str] = None
+    duration: Optional[int] = None
+    remote_support: Optional[str] = None
+    test_type: Optional[List[str]] = None
+
+
+class RecommendationResponse(BaseModel):
+    recommended_assessments: List[Assessment]
+
+
+class QueryRecommendations(BaseModel):
+    query: str
+    recommended_assessments: List[Assessment]
+
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[QueryRecommendations]
+
+
+class CatalogAssessment(Assessment):
+    catalog: str
+
+
+class MultiCatalogRecommendationResponse(BaseModel):
+    recommended_assessments: List[CatalogAssessment]
+
+
+def filters_dict(filters: Optional[RecommendationFilters]):
+    if filters is None:
+        return None
+    return filters.model_dump(exclude_none=True) or None
+
 # ============================================================
+# Response helpers
+# ============================================================
+def clamp_top_k(top_k: int) -> int:
+    """
+    Enforce min = 1, max = 10
+    """
+    return min(max(top_k, 1), 10)
+
+
+def require_recommender():
+    """
+    503 until the background startup load has finished.
+    """
+    if recommender is None:
+        raise HTTPException(
+            status_code=503,
+            detail=load_error or "Index is loading",
+            headers={"Retry-After": "1"}
+        )
+
+
+def resolve_fields(fields: Optional[List[str]]):
+    """
+    Validates the requested field projection (422 on unknown fields).
+    """
+    try:
+        return ResultStore.resolve_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def encode_response(body: str, accept_encoding: str):
+    """
+    UTF-8 encodes a serialized body, compressing large ones when enabled.
+    """
+    return json_response(body.encode("utf-8"), accept_encoding, COMPRESS_MIN_BYTES)
+
+
+def recommend_response(request: RecommendationRequest, accept_encoding: str):
+    require_recommender()
+    top_k = clamp_top_k(request.top_k)
+    filters = filters_dict(request.filters)
+    fields = resolve_fields(request.fields)
+
+    # Search and render against one index snapshot, even across a reload
+    state = recommender.state
+
+    if batcher is not None:
+        ids, _ = batcher.retrieve(request.query, top_k, filters, state)
+    else:
+        ids, _ = recommender.retrieve(
+            query=request.query,
+            top_k=top_k,
+            filters=filters,
+            state=state
+        )
+
+    # Rows are pre-cleaned and pre-serialized at index load time
+    with metrics.stage("format"):
+        recommended_assessments = state.result_store.json_array(ids, fields)
+        return encode_response(
+            '{"recommended_assessments":' + recommended_assessments + "}",
+            accept_encoding
+        )
+
+
+def recommend_batch_response(request: BatchRecommendationRequest, accept_encoding: str):
+    require_recommender()
+    top_k = clamp_top_k(request.top_k)
+    fields = resolve_fields(request.fields)
+    state = recommender.state
+
+    batch_hits = recommender.retrieve_batch(
+        queries=request.queries,
+        top_k=top_k,
+        filters=filters_dict(request.filters),
+        state=state
+    )
+
+    with metrics.stage("format"):
+        store = state.result_store
+        formatted = ",".join(
+            '{"query":' + dumps(query) +
+            ',"recommended_assessments":' + store.json_array(ids, fields) + "}"
+            for query, (ids, _) in zip(request.queries, batch_hits)
+        )
+        return encode_response('{"results":[' + formatted + "]}", accept_encoding)
+
+
+def require_catalog(name: str) -> SHLRecommender:
+    """
+    The named catalog, loaded on demand (404 if not configured).
+    """
+    try:
+        return catalogs.get(name)
+    except UnknownCatalogError:
+        raise HTTPException(status_code=404, detail=f"Unknown catalog {name!r}")
+    except (BundleError, OSError) as e:
+        raise HTTPException(status_code=503, detail=f"Catalog {name!r} failed to load: {e}")
+
+
+def catalog_recommend_response(name: str, request: RecommendationRequest, accept_encoding: str):
+    catalog = require_catalog(name)
+    top_k = clamp_top_k(request.top_k)
+    fields = resolve_fields(request.fields)
+    state = catalog.state
+
+    ids, _ = catalog.retrieve(
+        query=request.query,
+        top_k=top_k,
+        filters=filters_dict(request.filters),
+        state=state
+    )
+
+    with metrics.stage("format"):
+        recommended_assessments = state.result_store.json_array(ids, fields)
+        return encode_response(
+            '{"recommended_assessments":' + recommended_assessments + "}",
+            accept_encoding
+        )
+
+
+def multi_catalog_recommend_response(request: MultiCatalogRecommendationRequest,
+                                     accept_encoding: str):
+    names = request.catalogs or catalogs.names()
+    unknown = [name for name in names if name not in catalogs.paths]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown catalogs {unknown}")
+    top_k = clamp_top_k(request.top_k)
+    fields = resolve_fields(request.fields)
+
+    try:
+        hits = catalogs.retrieve_across(names, request.query, top_k, filters_dict(request.filters))
+    except (BundleError, OSError) as e:
+        raise HTTPException(status_code=503, detail=f"Catalog failed to load: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # Each row is tagged with its catalog: '{"catalog":"uk",' + '"url":...}'
+    with metrics.stage("format"):
+        formatted = ",".join(
+            '{"catalog":' + dumps(name) + "," +
+            state.result_store.json_objects([row], fields)[0][1:]
+            for name, state, row, _ in hits
+        )
+        return encode_response('{"recommended_assessments":[' + formatted + "]}", accept_encoding)
+
+
+def check_batch_size(request: BatchRecommendationRequest):
+    if len(request.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BATCH_QUERIES} queries per batch"
+        )
+
+# ============================================================
+# Dedicated executor for the async endpoints
+# ============================================================
+encode_executor = None
+if ASYNC_ENDPOINTS:
+    encode_executor = ThreadPoolExecutor(
+        max_workers=ENCODE_WORKERS,
+        thread_name_prefix="shl-encode"
+    )
+
+
+async def run_in_encode_executor(func, *args):
+    """
+    Runs CPU-bound work on the encode executor, keeping the request's
+    context (stage trace) visible to the worker thread.
+    """
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        encode_executor,
+        functools.partial(context.run, func, *args)
+    )
+
+
+async def run_endpoint(func, *args):
+    """
+    Runs a recommendation endpoint's (sync) body off the event loop: on
+    the encode executor with SHL_ASYNC_ENDPOINTS, otherwise on the
+    shared threadpool that plain `def` endpoints use.
+    """
+    if encode_executor is not None:
+        return await run_in_encode_executor(func, *args)
+    return await run_in_threadpool(func, *args)
+
+# ============================================================
+# Liveness / Readiness / Health Endpoints
+# ============================================================
+@app.get("/live")
+def liveness():
+    """
+    Liveness: the process is up and serving HTTP. Fails once the startup
+    load has failed, since the process will never become ready.
+    """
+    if load_error is not None:
+        return FastJSONResponse({"status": "failed", "error": load_error}, status_code=503)
+
+    return {"status": "alive"}
+
+
+@app.get("/ready")
+def readiness():
+    """
+    Readiness: index loaded and model warm (503 otherwise, e.g. while
+    shutting down), so load balancers only route to warm workers.
+    """
+    if not ready.is_set():
+        return FastJSONResponse(
+            {"status": "failed" if load_error else "not ready", "error": load_error},
+            status_code=503
+        )
+
+    return {
+        "status": "ready",
+        "pid": os.getpid(),
+        "index_version": recommender.index_version,
+        "load_seconds": round(load_seconds, 3)
+    }
+
+
 @app.get("/health")
 def health_check():
     """
-    Simple health check endpoint to verify the API is running.
+    Health check with the active index version and when it was loaded.
     """
+    if recommender is None:
+        return FastJSONResponse(
+            {
+                "status": "failed" if load_error else "loading",
+                "message": load_error or "Index is loading",
+                "encoder_backend": ENCODER_BACKEND
+            },
+            status_code=503
+        )
+
     return {
         "status": "ok",
-        "message": "SHL Assessment Recommendation API is running"
+        "message": "SHL Assessment Recommendation API is running",
+        "encoder_backend": recommender.backend,
+        **index_manager.status()
     }
 
 # ============================================================
-# Assessment Recommendation Endpoint
+# Assessment Recommendation Endpoints
 # ============================================================
-@app.post("/recommend")
-def recommend_assessments(request: RecommendationRequest):
+@app.post("/recommend", response_model=RecommendationResponse)
+async def recommend_assessments(request: RecommendationRequest, http_request: Request):
     """
     Accepts a job description or natural language query and returns
     1–10 relevant SHL Individual Test Solutions.
     """
+    metrics.mark_since_start("parse")
+    return await run_endpoint(
+        recommend_response,
+        request,
+        http_request.headers.get("accept-encoding", "")
+    )
 
-    # Enforce min = 1, max = 10
-    top_k = min(max(request.top_k, 1), 10)
 
-    results = recommender.recommend(
-        query=request.query,
-        top_k=top_k
+@app.post("/recommend/batch", response_model=BatchRecommendationResponse)
+async def recommend_assessments_batch(request: BatchRecommendationRequest,
+                                      http_request: Request):
+    """
+    Accepts many queries at once and returns recommendations
+    for each query, in input order. All queries are encoded in
+    a single batched model call and searched with one FAISS query.
+    """
+    metrics.mark_since_start("parse")
+    check_batch_size(request)
+    return await run_endpoint(
+        recommend_batch_response,
+        request,
+        http_request.headers.get("accept-encoding", "")
     )
 
-    recommended_assessments = []
 
-    for item in results:
-        recommended_assessments.append({
-            "url": item["url"],
-            "name": item["assessment_name"],
-            "adaptive_support": item.get("adaptive_support", "No"),
-            "description": item.get("description", ""),
-            "duration": item.get("duration", None),
-            "remote_support": item.get("remote_support", "Yes"),
-            "test_type": item.get("test_type", [])
-        })
+@app.post("/catalogs/recommend", response_model=MultiCatalogRecommendationResponse)
+async def recommend_across_catalogs(request: MultiCatalogRecommendationRequest,
+                                    http_request: Request):
+    """
+    Searches several named catalogs (default: all) with one encoded
+    query and returns the best hits overall, each tagged with its catalog.
+    """
+    metrics.mark_since_start("parse")
+    return await run_endpoint(
+        multi_catalog_recommend_response,
+        request,
+        http_request.headers.get("accept-encoding", "")
+    )
+
 
+@app.post("/catalogs/{name}/recommend", response_model=RecommendationResponse)
+async def recommend_from_catalog(name: str, request: RecommendationRequest,
+                                 http_request: Request):
+    """
+    /recommend against one named catalog.
+    """
+    metrics.mark_since_start("parse")
+    return await run_endpoint(
+        catalog_recommend_response,
+        name,
+        request,
+        http_request.headers.get("accept-encoding", "")
+    )
+
+# ============================================================
+# Admin: Index Reload Endpoint
+# ============================================================
+@app.post("/admin/reload")
+def reload_index(wait: bool = True, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Loads the current index artifacts in the background and swaps them in
+    without a restart. With wait=false, returns 202 immediately. Under
+    api.serve every worker reloads, not just the one serving this call.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    require_recommender()
+
+    if not wait:
+        # Signal the other workers only after this one's attempt, so they see
+        # the same artifacts and this worker skips the broadcast
+        def reload_and_broadcast():
+            index_manager.reload()
+            signal_other_workers()
+
+        threading.Thread(target=reload_and_broadcast, name="shl-index-reload", daemon=True).start()
+        return FastJSONResponse({"status": "reloading"}, status_code=202)
+
+    reloaded = index_manager.reload()
+    all_workers = signal_other_workers()
+    if not reloaded:
+        raise HTTPException(status_code=422, detail=index_manager.last_error)
+
+    return {"status": "reloaded", "all_workers": all_workers, **index_manager.status()}
+
+# ============================================================
+# Named Catalogs Endpoint
+# ============================================================
+@app.get("/catalogs")
+def list_catalogs():
+    """
+    Configured catalogs, which are loaded and their approximate memory,
+    plus the shared encoders.
+    """
     return {
-        "recommended_assessments": recommended_assessments
+        "memory_budget_bytes": catalogs.memory_budget,
+        "loaded_bytes": catalogs.loaded_bytes(),
+        "encoders": [
+            {"model_name": model_name, "backend": backend}
+            for model_name, backend in shared_encoders()
+        ],
+        "catalogs": catalogs.status()
     }
+
+# ============================================================
+# Micro-batching Metrics Endpoint
+# ============================================================
+@app.get("/batching/stats")
+def batching_stats():
+    """
+    Queue depth and batch-size metrics of the micro-batcher.
+    """
+    if batcher is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **batcher.stats()}
+
+# ============================================================
+# Prometheus Metrics Endpoint
+# ============================================================
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Per-stage latency histograms, request/error counters, cache hits,
+    index size and model load time in Prometheus text format.
+    """
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,90 @@
+"""
+JSON encoding and content negotiation for API responses.
+
+orjson and brotli are optional: without orjson the stdlib json module is
+used, and without brotli only gzip is negotiated.
+"""
+import gzip
+import json
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def dumps(obj) -> str:
+    """
+    Compact JSON (UTF-8, non-ASCII kept), via orjson when installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class FastJSONResponse(Response):
+    """
+    JSONResponse equivalent that renders with `dumps`.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content).encode("utf-8")
+
+
+def negotiate_encoding(accept_encoding: str):
+    """
+    Picks "br" or "gzip" from an Accept-Encoding header, or None.
+    """
+    accepted = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def json_response(body: bytes, accept_encoding: str = "", min_bytes: int = 0) -> Response:
+    """
+    Wraps an already serialized JSON body. When `min_bytes` is set, bodies
+    at least that large are compressed with the client's preferred
+    encoding.
+    """
+    if not min_bytes:
+        return Response(content=body, media_type="application/json")
+
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= min_bytes:
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is not None:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
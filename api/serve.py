@@ -0,0 +1,184 @@
+"""
+Pre-forking multi-worker server.
+
+The app is imported and its model, index and result store are loaded
+and warmed up once in the parent, the GC is frozen, and workers are
+forked from it. Model weights and index memory are then shared
+copy-on-write across workers instead of being loaded once per worker,
+as with `uvicorn --workers`.
+Torch / FAISS threads are split so workers * threads <= cores; the
+caps are set before torch is imported, torch resets its thread pools
+in forked children, and each worker re-applies its cap on startup.
+CPU only: CUDA cannot be used in a child forked after initializing it.
+
+An index reload in one worker (POST /admin/reload) is broadcast to all
+of them: the worker sends RELOAD_SIGNAL to the parent, which forwards it
+to every worker.
+
+Usage:
+    python -m api.serve --workers 4 --port 8000
+"""
+import argparse
+import gc
+import importlib
+import logging
+import os
+import signal
+import socket
+import time
+
+logger = logging.getLogger("shl.serve")
+
+# A worker that dies faster than this after starting is not restarted
+# again immediately (avoids a crash loop)
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+# Worker -> parent -> all workers: reload the index
+RELOAD_SIGNAL = signal.SIGUSR1
+
+# Set in workers to the parent's pid, so the app knows whom to signal
+PARENT_PID_ENV = "SHL_SERVE_PARENT_PID"
+
+
+def threads_per_worker(workers: int, threads: int = 0) -> int:
+    if threads > 0:
+        return threads
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, log_level: str, on_reload=None):
+    import uvicorn
+
+    # The parent froze the preloaded heap; new objects are collected as usual
+    gc.enable()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(RELOAD_SIGNAL, (lambda signum, frame: on_reload()) if on_reload else signal.SIG_IGN)
+
+    config = uvicorn.Config(app, log_level=log_level, access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forking multi-worker API server")
+    parser.add_argument("--app", default="api.main:app")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SHL_WORKERS", "2")))
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="Torch/FAISS threads per worker (default: cores // workers)"
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(message)s")
+
+    # -------------------------
+    # Thread budget (must be set before torch / OpenMP initialize)
+    # -------------------------
+    threads = threads_per_worker(args.workers, args.threads)
+    os.environ["SHL_TORCH_THREADS"] = str(threads)
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(threads))
+
+    # -------------------------
+    # Preload: import the app, then load the model and index and warm up
+    # synchronously (the app would otherwise load in the background in
+    # every worker)
+    # -------------------------
+    from uvicorn.importer import import_from_string
+
+    gc.disable()
+    started = time.perf_counter()
+    app = import_from_string(args.app)
+    module = importlib.import_module(args.app.partition(":")[0])
+    load = getattr(module, "load_recommender", None)
+    if load is not None:
+        load()
+    on_reload = getattr(module, "reload_from_signal", None)
+    logger.info("preloaded %s in %.2fs", args.app, time.perf_counter() - started)
+
+    # Move everything allocated so far out of the GC's reach, so
+    # collections in workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port)
+
+    # -------------------------
+    # Fork and supervise workers
+    # -------------------------
+    workers = {}
+    stopping = False
+    parent_pid = os.getpid()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.environ[PARENT_PID_ENV] = str(parent_pid)
+                run_worker(app, sock, args.log_level, on_reload)
+            finally:
+                os._exit(0)
+        workers[pid] = time.monotonic()
+        logger.info("worker %s started (%s threads)", pid, threads)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def broadcast_reload(signum, frame):
+        logger.info("reloading the index in %d workers", len(workers))
+        for pid in list(workers):
+            try:
+                os.kill(pid, RELOAD_SIGNAL)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(RELOAD_SIGNAL, broadcast_reload)
+
+    for _ in range(args.workers):
+        spawn()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        started_at = workers.pop(pid, None)
+        if started_at is None or stopping:
+            continue
+
+        logger.warning("worker %s exited with status %s, restarting", pid, status)
+        if time.monotonic() - started_at < RESPAWN_BACKOFF_SECONDS:
+            time.sleep(RESPAWN_BACKOFF_SECONDS)
+        spawn()
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,14 @@ import os
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(ROOT_DIR)
 
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
+from recommender.bundle import bundle_exists
 from recommender.scorer import SHLRecommender
 
-DATA_PATH = "data/processed/assessments.json"
+DATA_PATH = os.path.join(ROOT_DIR, "data", "processed", "assessments.json")
+BUNDLE_DIR = os.path.join(ROOT_DIR, "data", "processed", "index_bundle")
 
 st.set_page_config(page_title="SHL Assessment Recommender", layout="centered")
 
@@ -18,11 +21,22 @@ st.write(
     "Enter a job description or hiring requirement, and get the most relevant SHL Individual Test Solutions."
 )
 
-@st.cache_resource
 def load_recommender():
-    return SHLRecommender(DATA_PATH)
+    if bundle_exists(BUNDLE_DIR):
+        recommender = SHLRecommender(bundle_dir=BUNDLE_DIR)
+    else:
+        recommender = SHLRecommender(DATA_PATH)
+    recommender.warmup()
+    return recommender
+
 
-recommender = load_recommender()
+@st.cache_resource
+def start_loading_recommender():
+    # Loads in the background while the page renders; the first
+    # recommendation waits for it if it is still running
+    return ThreadPoolExecutor(max_workers=1).submit(load_recommender)
+
+recommender_future = start_loading_recommender()
 
 query = st.text_area(
     "Job Requirement / Description",
@@ -36,7 +50,11 @@ if st.button("Recommend Assessments"):
     if not query.strip():
         st.warning("Please enter a job requirement.")
     else:
-        results = recommender.recommend(query, top_k=top_k)
+        if not recommender_future.done():
+            with st.spinner("Loading the recommendation model..."):
+                recommender_future.result()
+
+        results = recommender_future.result().recommend(query, top_k=top_k)
 
         if not results:
             st.info("No relevant assessments found.")
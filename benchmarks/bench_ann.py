@@ -0,0 +1,121 @@
+"""
+ANN backend benchmark: build time, memory, p50/p99 query latency and
+recall@k of FAISS index types against the exact flat index.
+
+The catalog is scaled up synthetically: rows of assessment_embeddings.npy
+are copied with small Gaussian perturbations and re-normalized, which
+keeps the real embedding geometry (clusters, norms) at larger sizes.
+
+Usage:
+    python -m benchmarks.bench_ann --rows 200000 \\
+        --factories "Flat" "HNSW32,Flat" "IVF1024,Flat" "IVF1024,PQ32" "IVF1024,SQ8" \\
+        --nprobe 8 32 --ef-search 32 128
+"""
+import argparse
+import json
+import time
+import numpy as np
+import faiss
+
+from recommender.ann import apply_search_params, build_index
+
+EMBEDDINGS_PATH = "data/processed/assessment_embeddings.npy"
+
+
+def scale_embeddings(base, rows: int, noise: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(base), size=rows)
+    vectors = base[picks] + rng.normal(0, noise, size=(rows, base.shape[1])).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def make_queries(base, n: int, noise: float, seed: int = 1):
+    # Queries lie near catalog items but are not copies of them
+    return scale_embeddings(base, n, noise * 2, seed)
+
+
+def latency_percentiles(index, queries, top_k: int):
+    timings = []
+    for q in queries:
+        started = time.perf_counter()
+        index.search(q.reshape(1, -1), top_k)
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+def recall_at_k(truth, found, k: int) -> float:
+    hits = sum(len(set(t[:k]) & set(f[:k])) for t, f in zip(truth, found))
+    return hits / (len(truth) * k)
+
+
+def sweep_params(factory: str, nprobes, ef_searches):
+    if "IVF" in factory:
+        return [{"nprobe": n} for n in nprobes]
+    if "HNSW" in factory:
+        return [{"efSearch": ef} for ef in ef_searches]
+    return [{}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS index type benchmark")
+    parser.add_argument("--embeddings", default=EMBEDDINGS_PATH)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=0.02)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--train-size", type=int, default=50_000)
+    parser.add_argument(
+        "--factories",
+        nargs="+",
+        default=["Flat", "HNSW32,Flat", "IVF1024,Flat", "IVF1024,PQ32", "IVF1024,SQ8"]
+    )
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 128])
+    parser.add_argument("--threads", type=int, default=1, help="FAISS OpenMP threads")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+
+    base = np.load(args.embeddings).astype("float32")
+    vectors = scale_embeddings(base, args.rows, args.noise)
+    queries = make_queries(base, args.queries, args.noise)
+
+    # -------------------------
+    # Ground truth from the exact index
+    # -------------------------
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.top_k)
+
+    results = []
+    for factory in args.factories:
+        started = time.perf_counter()
+        index = build_index(vectors, factory, train_size=args.train_size)
+        build_seconds = time.perf_counter() - started
+        memory_mb = len(faiss.serialize_index(index)) / 1e6
+
+        for params in sweep_params(factory, args.nprobe, args.ef_search):
+            apply_search_params(index, params)
+
+            p50, p99 = latency_percentiles(index, queries, args.top_k)
+            _, found = index.search(queries, args.top_k)
+
+            row = {
+                "factory": factory,
+                "params": params,
+                "rows": args.rows,
+                "build_seconds": round(build_seconds, 3),
+                "memory_mb": round(memory_mb, 1),
+                "p50_ms": round(p50, 3),
+                "p99_ms": round(p99, 3),
+                f"recall@{args.top_k}": round(recall_at_k(truth, found, args.top_k), 4)
+            }
+            results.append(row)
+            print(json.dumps(row))
+
+    print(json.dumps({"results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
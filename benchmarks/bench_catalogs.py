@@ -0,0 +1,107 @@
+"""
+Multi-catalog benchmark: N catalogs (copies of one index) served behind
+one shared encoder. Reports per-catalog load time, estimated size and
+RSS growth, single-catalog vs cross-catalog query latency (one encode
+for all catalogs), and loads / evictions under a memory budget.
+
+Usage:
+    python -m benchmarks.bench_catalogs [--mode fake|real] [--catalogs 4] [--budget-catalogs 2]
+"""
+import argparse
+import json
+import os
+import resource
+import time
+
+from benchmarks.bench_recommender import DATA_PATH, SHORT_QUERIES, percentiles
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-encoder multi-catalog serving")
+    parser.add_argument("--mode", choices=["fake", "real"], default="fake")
+    parser.add_argument("--source", default=DATA_PATH, help="Bundle dir or legacy JSON per catalog")
+    parser.add_argument("--catalogs", type=int, default=4)
+    parser.add_argument("--budget-catalogs", type=int, default=2,
+                        help="Memory budget, in catalogs' worth of bytes, for the eviction run")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--fake-cost-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.mode == "fake":
+        from benchmarks.fake_encoder import install_fake_encoder
+        install_fake_encoder(cost_per_token_us=args.fake_cost_us)
+    else:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    from recommender.catalogs import CatalogRegistry
+
+    names = [f"catalog{i}" for i in range(args.catalogs)]
+    registry = CatalogRegistry({name: args.source for name in names}, cache_size=0)
+
+    # -------------------------
+    # Load every catalog; the first one also loads the encoder
+    # -------------------------
+    loads = []
+    for name in names:
+        before = rss_mb()
+        started = time.perf_counter()
+        registry.get(name)
+        loads.append({
+            "catalog": name,
+            "load_seconds": round(time.perf_counter() - started, 3),
+            "estimated_mb": round(registry.status()[len(loads)]["bytes"] / 2**20, 2),
+            "rss_growth_mb": round(rss_mb() - before, 1)
+        })
+
+    # -------------------------
+    # One catalog vs all catalogs per query
+    # -------------------------
+    single, across = [], []
+    for query in SHORT_QUERIES:
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            registry.get(names[0]).retrieve(query, args.top_k)
+            single.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            registry.retrieve_across(names, query, args.top_k)
+            across.append((time.perf_counter() - started) * 1000)
+
+    # -------------------------
+    # Round-robin requests under a budget of --budget-catalogs catalogs
+    # -------------------------
+    catalog_bytes = registry.loaded_bytes() // len(names)
+    budgeted = CatalogRegistry({name: args.source for name in names}, cache_size=0,
+                               memory_budget=catalog_bytes * args.budget_catalogs)
+    budget_loads = 0
+    for _ in range(2):
+        for name in names:
+            loaded = {c["name"] for c in budgeted.status() if c["loaded"]}
+            budget_loads += name not in loaded
+            budgeted.get(name).retrieve(SHORT_QUERIES[0], args.top_k)
+    still_loaded = sum(1 for c in budgeted.status() if c["loaded"])
+
+    report = {
+        "mode": args.mode,
+        "catalogs": args.catalogs,
+        "loads": loads,
+        "single_catalog": percentiles(single),
+        "across_catalogs": percentiles(across),
+        "budget": {
+            "catalogs": args.budget_catalogs,
+            "loaded": still_loaded,
+            "loads": budget_loads,
+            "evictions": budget_loads - still_loaded
+        }
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
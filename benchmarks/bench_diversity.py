@@ -0,0 +1,90 @@
+"""
+Diversified search benchmark: retrieve latency with diversity off,
+"collapse" and "mmr", the share of each top-k taken by near-duplicates
+(rows whose cluster already appeared higher in the list), and the time
+the diversify stage itself adds per query.
+
+Clusters come from the stored document embeddings (computed at load
+for the legacy index), so the duplicate share is meaningful in fake
+mode too; only the query vectors are fake.
+
+Usage:
+    python -m benchmarks.bench_diversity [--mode fake|real] [--top-k 10]
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from benchmarks.bench_recommender import DATA_PATH, SHORT_QUERIES, long_queries, percentiles
+from recommender.diversity import DIVERSITY_MODES
+
+MODES = (None,) + DIVERSITY_MODES
+
+
+def duplicate_share(ids, clusters) -> float:
+    if not ids:
+        return 0.0
+    return 1.0 - len(set(clusters[ids].tolist())) / len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and duplicate share by diversity mode")
+    parser.add_argument("--mode", choices=["fake", "real"], default="fake")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20, help="Repetitions of each query")
+    parser.add_argument("--long-queries", type=int, default=10)
+    parser.add_argument("--fake-cost-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.mode == "fake":
+        from benchmarks.fake_encoder import install_fake_encoder
+        install_fake_encoder(cost_per_token_us=args.fake_cost_us)
+    else:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    from recommender.scorer import SHLRecommender
+
+    # Loaded with diversity on so the clusters are computed; the query
+    # cache keeps the encoder out of the comparison
+    recommender = SHLRecommender(json_path=DATA_PATH, diversity="collapse")
+    recommender.warmup()
+
+    state = recommender.state
+    queries = SHORT_QUERIES + long_queries(args.long_queries)
+    recommender.retrieve_batch(queries, args.top_k, state=state)
+
+    report = {
+        "mode": args.mode,
+        "queries": len(queries),
+        "clusters": int(len(np.unique(state.cluster_ids))),
+        "rows": len(state.data),
+        "results": {}
+    }
+    for mode in MODES:
+        recommender.diversity = mode
+
+        timings = []
+        shares = []
+        for query in queries:
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                ids, _ = recommender.retrieve(query, args.top_k, state=state)
+                timings.append((time.perf_counter() - started) * 1000)
+            shares.append(duplicate_share(ids, state.cluster_ids))
+
+        report["results"][mode or "off"] = {
+            "duplicate_share": round(float(np.mean(shares)), 3),
+            **percentiles(timings)
+        }
+
+    for mode in DIVERSITY_MODES:
+        result = report["results"][mode]
+        result["added_p50_ms"] = round(result["p50_ms"] - report["results"]["off"]["p50_ms"], 3)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
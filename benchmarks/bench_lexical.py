@@ -0,0 +1,97 @@
+"""
+Lexical routing benchmark: per-query latency by retrieval path with
+routing on, against dense retrieval of the same queries with routing
+off, plus how often each path is taken.
+
+For queries answered lexically, `dense_overlap` is |lexical top-k ∩
+dense top-k| / k: how far the fast path departs from the dense ranking
+(meaningful with --mode real only).
+
+Usage:
+    python -m benchmarks.bench_lexical [--mode fake|real] [--top-k 10]
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+import numpy as np
+
+from benchmarks.bench_recommender import DATA_PATH, SHORT_QUERIES, long_queries, percentiles
+
+# Keyword lookups plus short natural-language queries
+SHORT_MIXED_QUERIES = SHORT_QUERIES + [
+    "java developer with sql", "graduate numerical test", "call centre agent",
+    "team player with good communication", "entry level sales role", "project manager"
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency per retrieval path under lexical routing")
+    parser.add_argument("--mode", choices=["fake", "real"], default="fake")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20, help="Repetitions of each query")
+    parser.add_argument("--long-queries", type=int, default=10)
+    parser.add_argument("--fake-cost-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.mode == "fake":
+        from benchmarks.fake_encoder import install_fake_encoder
+        install_fake_encoder(cost_per_token_us=args.fake_cost_us)
+    else:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    from recommender.scorer import SHLRecommender
+
+    # The query cache would hide encoder cost on repetitions
+    recommender = SHLRecommender(json_path=DATA_PATH, cache_size=0, lexical_routing=True)
+    recommender.warmup()
+
+    queries = SHORT_MIXED_QUERIES + long_queries(args.long_queries)
+    state = recommender.state
+    mask = None
+
+    routed = defaultdict(list)
+    dense = defaultdict(list)
+    routes = {}
+    overlaps = []
+
+    for query in queries:
+        route, _, _ = recommender._route(query, args.top_k, mask, state)
+        routes[query] = route
+
+        recommender.lexical_routing = True
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            routed_ids, _ = recommender.retrieve(query, args.top_k, state=state)
+            routed[route].append((time.perf_counter() - started) * 1000)
+
+        recommender.lexical_routing = False
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            dense_ids, _ = recommender.retrieve(query, args.top_k, state=state)
+            dense[route].append((time.perf_counter() - started) * 1000)
+
+        if route == "lexical":
+            overlaps.append(len(set(routed_ids) & set(dense_ids)) / args.top_k)
+
+    report = {
+        "mode": args.mode,
+        "queries": len(queries),
+        "routes": {route: sum(1 for r in routes.values() if r == route)
+                   for route in ("lexical", "hybrid", "dense")},
+        "by_route": {
+            route: {
+                "routed": percentiles(routed[route]),
+                "dense_only": percentiles(dense[route])
+            }
+            for route in routed
+        },
+        "lexical_dense_overlap": round(float(np.mean(overlaps)), 3) if overlaps else None,
+        "query_routes": routes
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Long-query benchmark: single-query latency against query length for
+today's truncation vs the windowed long-query modes (mean / max pooling,
+per-window search with fused hits).
+
+For each length, distinct job descriptions of that many words are built
+from the benchmark JD paragraphs and retrieved one at a time with the
+query cache disabled. Also reported: windows encoded per query and the
+share of the query's tokens the encoder actually sees.
+
+Usage:
+    python -m benchmarks.bench_long_query [--mode fake|real] [--lengths 64 512 4096]
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from benchmarks.bench_recommender import DATA_PATH, JD_PARAGRAPHS, percentiles
+from recommender.embedding import SPECIAL_TOKENS, window_starts
+
+MODES = ("truncate", "mean", "max", "fusion")
+
+
+def job_descriptions(words: int, n: int):
+    vocabulary = " ".join(JD_PARAGRAPHS).split()
+    queries = []
+    for i in range(n):
+        # A different starting word per query keeps every query distinct
+        offset = (i * 37) % len(vocabulary)
+        body = [vocabulary[(offset + j) % len(vocabulary)] for j in range(words - 2)]
+        queries.append(f"Requisition #{i}. " + " ".join(body))
+    return queries
+
+
+def token_count(model, text: str) -> int:
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is not None:
+        return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+    return len(text.split())
+
+
+def coverage(recommender, n_tokens: int):
+    """
+    (windows, share of the query's tokens inside some window).
+    """
+    window = recommender.model.model.max_seq_length - SPECIAL_TOKENS
+    if recommender.long_query_mode is None:
+        starts = [0]
+    else:
+        starts = window_starts(n_tokens, window, recommender.window_overlap,
+                               recommender.max_windows)
+
+    seen = np.zeros(n_tokens, dtype=bool)
+    for start in starts:
+        seen[start:start + window] = True
+    return len(starts), float(seen.mean())
+
+
+def bench_length(recommender, queries, top_k: int):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        recommender.retrieve(query, top_k)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tokens = [token_count(recommender.model.model, q) for q in queries]
+    windows, covered = zip(*(coverage(recommender, n) for n in tokens))
+
+    return {
+        "tokens": int(np.mean(tokens)),
+        "windows": round(float(np.mean(windows)), 1),
+        "coverage": round(float(np.mean(covered)), 3),
+        **percentiles(timings)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency vs query length for long-query modes")
+    parser.add_argument("--mode", choices=["fake", "real"], default="fake")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[64, 256, 512, 1024, 2048, 4096])
+    parser.add_argument("--queries", type=int, default=30, help="Queries per length")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--window-overlap", type=int, default=64)
+    parser.add_argument("--max-windows", type=int, default=8)
+    parser.add_argument("--fake-cost-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.mode == "fake":
+        from benchmarks.fake_encoder import install_fake_encoder
+        install_fake_encoder(cost_per_token_us=args.fake_cost_us)
+    else:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    from recommender.scorer import SHLRecommender
+
+    recommender = SHLRecommender(
+        json_path=DATA_PATH,
+        cache_size=0,
+        window_overlap=args.window_overlap,
+        max_windows=args.max_windows
+    )
+    recommender.warmup()
+
+    report = {"mode": args.mode, "max_windows": args.max_windows, "results": {}}
+    for mode in MODES:
+        recommender.long_query_mode = None if mode == "truncate" else mode
+        report["results"][mode] = {
+            str(words): bench_length(recommender, job_descriptions(words, args.queries), args.top_k)
+            for words in args.lengths
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
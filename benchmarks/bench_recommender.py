@@ -0,0 +1,268 @@
+"""
+Reproducible benchmark suite for the recommender and API hot paths:
+
+  - build_index end-to-end (full encode and cached incremental rebuild)
+  - SHLRecommender cold start (legacy JSON + .npy and index bundle)
+  - single-query latency (short keyword vs long multi-paragraph JD)
+  - batch throughput at several batch sizes and query lengths
+  - in-process load test of POST /recommend at a given concurrency
+
+`--mode fake` (default) uses a deterministic hashing encoder so the suite
+runs in seconds without model weights; `--mode real` uses the real
+all-mpnet-base-v2 weights from the local cache (no downloads).
+Results are emitted as JSON so runs can be compared across commits.
+
+Usage:
+    python -m benchmarks.bench_recommender [--mode fake|real] [--output results.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+DATA_PATH = "data/processed/assessments.json"
+
+SHORT_QUERIES = [
+    "java 8", "python", "opq32r", "excel 365", "sql server", "selenium",
+    "numerical reasoning", "sales", "customer service", "leadership",
+    "data entry", "javascript", "verbal ability", "personality", "tableau"
+]
+
+JD_PARAGRAPHS = [
+    "We are hiring a software engineer to design, build and maintain scalable backend "
+    "services. The role requires strong problem-solving skills, experience with Java or "
+    "Python, and familiarity with relational databases and REST APIs.",
+    "The ideal candidate collaborates with product managers and designers, writes clean "
+    "and well-tested code, participates in code reviews and mentors junior engineers.",
+    "You will own features end to end, from requirements gathering through deployment and "
+    "monitoring in production, and contribute to improving our engineering practices.",
+    "Excellent written and verbal communication skills are required, as is the ability to "
+    "work in a fast-paced environment with changing priorities and tight deadlines.",
+    "Experience with cloud platforms, containerization, CI/CD pipelines and agile "
+    "methodologies is a strong plus. A degree in computer science or equivalent is preferred."
+]
+
+
+def long_queries(n: int):
+    # Distinct multi-paragraph JDs built by rotating the paragraphs
+    queries = []
+    for i in range(n):
+        paragraphs = JD_PARAGRAPHS[i % len(JD_PARAGRAPHS):] + JD_PARAGRAPHS[:i % len(JD_PARAGRAPHS)]
+        queries.append(f"Requisition #{i}.\n\n" + "\n\n".join(paragraphs * 2))
+    return queries
+
+
+def short_queries(n: int):
+    return [f"{SHORT_QUERIES[i % len(SHORT_QUERIES)]} {i}" for i in range(n)]
+
+
+def percentiles(timings_ms):
+    return {
+        "p50_ms": round(float(np.percentile(timings_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(timings_ms, 99)), 3),
+        "mean_ms": round(float(np.mean(timings_ms)), 3)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+# ============================================================
+# Benchmarks
+# ============================================================
+def bench_build_index(bundle_dir: str, cache_dir: str):
+    from recommender import build_index
+
+    def run(extra_args):
+        argv = sys.argv
+        sys.argv = ["build_index", "--output", bundle_dir, "--cache-dir", cache_dir] + extra_args
+        try:
+            started = time.perf_counter()
+            # Keep stdout clean for the JSON report
+            with contextlib.redirect_stdout(sys.stderr):
+                build_index.main()
+            return round(time.perf_counter() - started, 3)
+        finally:
+            sys.argv = argv
+
+    return {
+        "full_seconds": run(["--no-cache"]),
+        "cold_cache_seconds": run([]),
+        "incremental_seconds": run([])
+    }
+
+
+def bench_cold_start(bundle_dir: str):
+    from recommender.embedding import clear_shared_encoders
+    from recommender.scorer import SHLRecommender
+
+    results = {}
+    for name, kwargs in (
+        ("legacy", {"json_path": DATA_PATH}),
+        ("bundle", {"bundle_dir": bundle_dir})
+    ):
+        # Cold start includes the model load
+        clear_shared_encoders()
+        started = time.perf_counter()
+        SHLRecommender(**kwargs)
+        results[f"{name}_seconds"] = round(time.perf_counter() - started, 3)
+    return results
+
+
+def bench_single_query(recommender, n: int):
+    results = {}
+    for name, queries in (("short", short_queries(n)), ("long", long_queries(n))):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            recommender.recommend(query, top_k=10)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = percentiles(timings)
+    return results
+
+
+def bench_batch_throughput(recommender, batch_sizes, n: int):
+    results = {}
+    for name, make in (("short", short_queries), ("long", long_queries)):
+        results[name] = {}
+        for batch_size in batch_sizes:
+            queries = make(max(n, batch_size))
+            batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+
+            started = time.perf_counter()
+            for batch in batches:
+                recommender.recommend_batch(batch, top_k=10)
+            elapsed = time.perf_counter() - started
+
+            results[name][str(batch_size)] = {
+                "queries_per_second": round(len(queries) / elapsed, 1)
+            }
+    return results
+
+
+def bench_api(concurrency: int, requests: int, long_share: float, app=None,
+              headers: dict = None, payload: dict = None):
+    import httpx
+    if app is None:
+        # ASGITransport runs no lifespan, so load synchronously
+        from api.main import app, load_recommender
+        load_recommender()
+
+    n_long = int(requests * long_share)
+    queries = long_queries(n_long) + short_queries(requests - n_long)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        timings = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def one(query):
+                nonlocal errors
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post(
+                        "/recommend",
+                        json={"query": query, "top_k": 10, **(payload or {})},
+                        headers=headers
+                    )
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(q) for q in queries))
+            elapsed = time.perf_counter() - started
+
+        return {
+            "concurrency": concurrency,
+            "requests": requests,
+            "errors": errors,
+            "requests_per_second": round(requests / elapsed, 1),
+            **percentiles(timings)
+        }
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommender / API benchmark suite")
+    parser.add_argument("--mode", choices=["fake", "real"], default="fake")
+    parser.add_argument(
+        "--fake-cost-us",
+        type=float,
+        default=0.0,
+        help="Simulated encoder cost per token (fake mode)"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--api-requests", type=int, default=500)
+    parser.add_argument("--long-share", type=float, default=0.5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    # Measure encoder work, not the query cache
+    os.environ.setdefault("SHL_QUERY_CACHE_SIZE", "0")
+
+    if args.mode == "fake":
+        from benchmarks.fake_encoder import install_fake_encoder
+        install_fake_encoder(cost_per_token_us=args.fake_cost_us)
+    else:
+        # Only use locally cached weights
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    from recommender.scorer import SHLRecommender
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir = os.path.join(tmp, "index_bundle")
+        cache_dir = os.path.join(tmp, "embedding_cache")
+
+        report = {
+            "meta": {
+                "mode": args.mode,
+                "commit": git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpu_count": os.cpu_count()
+            },
+            "build_index": bench_build_index(bundle_dir, cache_dir),
+            "cold_start": bench_cold_start(bundle_dir)
+        }
+
+        recommender = SHLRecommender(bundle_dir=bundle_dir, cache_size=0)
+        report["single_query"] = bench_single_query(recommender, args.queries)
+        report["batch_throughput"] = bench_batch_throughput(
+            recommender,
+            args.batch_sizes,
+            args.queries
+        )
+
+    report["api"] = bench_api(args.concurrency, args.api_requests, args.long_share)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
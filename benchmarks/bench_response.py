@@ -0,0 +1,164 @@
+"""
+/recommend response-path benchmark.
+
+1. Serialization only (10 hits per response):
+   - dicts:  per-request clean_description + two dict rebuilds +
+             jsonable_encoder + stdlib json (the former response path)
+   - store:  pre-serialized result store fragments
+   - store + fields projection, store + gzip
+2. End to end, in process, for API variants configured through the
+   environment (sync vs async endpoints, compression on/off).
+
+Usage:
+    python -m benchmarks.bench_response [--mode fake|real] [--concurrency 16]
+"""
+import argparse
+import importlib
+import json
+import os
+import time
+import numpy as np
+
+from benchmarks.bench_recommender import bench_api
+
+VARIANTS = {
+    "sync": {},
+    "async": {"SHL_ASYNC_ENDPOINTS": "1"},
+    "async_gzip": {"SHL_ASYNC_ENDPOINTS": "1", "SHL_COMPRESS_MIN_BYTES": "1024"}
+}
+
+
+def dict_response(data, ids):
+    """
+    The former path: hydrate with clean_description, remap keys for the
+    API, then FastAPI's jsonable_encoder + JSONResponse rendering.
+    """
+    from fastapi.encoders import jsonable_encoder
+    from recommender.utils import clean_description
+
+    results = []
+    for idx in ids:
+        item = data[idx]
+        results.append({
+            "assessment_name": item["assessment_name"],
+            "url": item["url"],
+            "description": clean_description(item.get("description", "")),
+            "duration": item.get("duration", None),
+            "remote_support": item.get("remote_support", "Yes"),
+            "adaptive_support": item.get("adaptive_support", "No"),
+            "test_type": item.get("test_type", []),
+            "score": 0.5
+        })
+
+    formatted = [
+        {
+            "url": item["url"],
+            "name": item["assessment_name"],
+            "adaptive_support": item.get("adaptive_support", "No"),
+            "description": item.get("description", ""),
+            "duration": item.get("duration", None),
+            "remote_support": item.get("remote_support", "Yes"),
+            "test_type": item.get("test_type", [])
+        }
+        for item in results
+    ]
+
+    content = jsonable_encoder({"recommended_assessments": formatted})
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def bench_serialization(recommender, rounds: int, top_k: int = 10):
+    from api.responses import compress
+
+    store = recommender.result_store
+    rng = np.random.default_rng(0)
+    hit_lists = [rng.choice(store.size, size=top_k, replace=False).tolist() for _ in range(rounds)]
+
+    def store_body(ids, fields=None):
+        return ('{"recommended_assessments":' + store.json_array(ids, fields) + "}").encode("utf-8")
+
+    paths = {
+        "dicts": lambda ids: dict_response(recommender.data, ids),
+        "store": store_body,
+        "store_fields_url_name": lambda ids: store_body(ids, ["url", "name"]),
+        "store_gzip": lambda ids: compress(store_body(ids), "gzip")
+    }
+
+    results = {}
+    for name, render in paths.items():
+        sizes = []
+        started = time.perf_counter()
+        for ids in hit_lists:
+            sizes.append(len(render(ids)))
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            "us_per_response": round(elapsed / rounds * 1e6, 1),
+            "bytes": int(np.mean(sizes))
+        }
+    return results
+
+
+def load_api(env: dict):
+    """
+    (Re)imports api.main with the variant's environment.
+    """
+    for key in {k for variant in VARIANTS.values() for k in variant}:
+        os.environ.pop(key, None)
+    os.environ.update(env)
+
+    import api.main
+    module = importlib.reload(api.main)
+    module.load_recommender()
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/recommend response-path benchmark")
+    parser.add_argument("--mode", choices=["fake", "real"], default="fake")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--api-requests", type=int, default=500)
+    parser.add_argument("--long-share", type=float, default=0.5)
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    args = parser.parse_args()
+
+    os.environ.setdefault("SHL_QUERY_CACHE_SIZE", "0")
+
+    if args.mode == "fake":
+        from benchmarks.fake_encoder import install_fake_encoder
+        install_fake_encoder()
+    else:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    report = {"serialization": None, "api": {}}
+
+    for name in args.variants:
+        module = load_api(VARIANTS[name])
+        if report["serialization"] is None:
+            report["serialization"] = bench_serialization(module.recommender, args.rounds)
+
+        for fields in (None, ["url", "name"]):
+            key = name if fields is None else f"{name}_fields"
+            report["api"][key] = bench_api(
+                args.concurrency,
+                args.api_requests,
+                args.long_share,
+                app=module.app,
+                headers={"Accept-Encoding": "gzip"},
+                payload={"fields": fields} if fields else None
+            )
+
+        if module.encode_executor is not None:
+            module.encode_executor.shutdown()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
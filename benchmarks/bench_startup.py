@@ -0,0 +1,156 @@
+"""
+Startup benchmark: import-time profile of the API module, and
+time-to-listen vs time-to-ready of a uvicorn server.
+
+  - import profile: `python -X importtime -c "import api.main"`,
+    summarized as self time per top-level package; --check fails when a
+    heavy package (torch, sentence_transformers, faiss, ...) is imported
+    eagerly instead of on first model / index load
+  - time-to-listen: process start until /live answers
+  - time-to-ready: process start until /ready answers 200 (index
+    loaded, encoder warmed up)
+
+Both are measured with background loading (the default) and with
+SHL_BACKGROUND_LOAD=0, where the server only listens once loaded.
+
+Usage:
+    python -m benchmarks.bench_startup [--mode fake|real] [--check]
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from collections import defaultdict
+import httpx
+
+FAKE_APP = "benchmarks.fake_app:app"
+REAL_APP = "api.main:app"
+
+# Must not be imported by `import api.main`; they load with the model/index
+HEAVY_PACKAGES = (
+    "torch", "sentence_transformers", "transformers", "faiss",
+    "onnxruntime", "optimum", "pandas"
+)
+
+
+def import_profile(module: str, env: dict, top: int = 10) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    self_us = defaultdict(int)
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_part, cumulative_part, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        self_us[name.split(".")[0]] += int(self_part)
+        if name == module:
+            total_us = int(cumulative_part)
+
+    ranked = sorted(self_us.items(), key=lambda item: -item[1])
+    return {
+        "module": module,
+        "import_ms": round(total_us / 1000, 1),
+        "top_packages_ms": {name: round(us / 1000, 1) for name, us in ranked[:top]},
+        "heavy_packages_imported": sorted(p for p in HEAVY_PACKAGES if p in self_us)
+    }
+
+
+def time_startup(app: str, port: int, env: dict, timeout: float) -> dict:
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        env=env,
+        start_new_session=True
+    )
+
+    listen_seconds = ready_seconds = None
+    try:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and ready_seconds is None:
+            try:
+                if listen_seconds is None:
+                    httpx.get(base_url + "/live", timeout=2.0)
+                    listen_seconds = time.perf_counter() - started
+                if httpx.get(base_url + "/ready", timeout=2.0).status_code == 200:
+                    ready_seconds = time.perf_counter() - started
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+
+    if ready_seconds is None:
+        raise TimeoutError(f"{app} did not become ready within {timeout}s")
+
+    return {
+        "time_to_listen_seconds": round(listen_seconds, 3),
+        "time_to_ready_seconds": round(ready_seconds, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API import profile and startup timings")
+    parser.add_argument("--mode", choices=["fake", "real"], default="fake")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--fake-weights-mb", type=float, default=420.0)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit 1 if `import api.main` imports a heavy package"
+    )
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.mode == "fake":
+        app = FAKE_APP
+        env["SHL_FAKE_WEIGHTS_MB"] = str(args.fake_weights_mb)
+    else:
+        app = REAL_APP
+        env.setdefault("HF_HUB_OFFLINE", "1")
+
+    profile = import_profile("api.main", env, args.top)
+
+    startup = {}
+    for name, background in (("background_load", "1"), ("import_load", "0")):
+        runs = [
+            time_startup(app, args.port, dict(env, SHL_BACKGROUND_LOAD=background),
+                         args.startup_timeout)
+            for _ in range(args.runs)
+        ]
+        startup[name] = {
+            key: round(sorted(run[key] for run in runs)[len(runs) // 2], 3)
+            for key in runs[0]
+        }
+
+    report = {
+        "mode": args.mode,
+        "import_profile": profile,
+        "startup_median": startup
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.check and profile["heavy_packages_imported"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Multi-worker serving benchmark: memory per worker and throughput per
+core of naive `uvicorn --workers N` (each worker loads its own model and
+index) vs the pre-forking `python -m api.serve` (loaded once, shared
+copy-on-write).
+
+Each server runs as a subprocess. Memory is read from
+/proc/<pid>/smaps_rollup (Linux): PSS splits shared pages across the
+processes mapping them, USS counts pages private to one process.
+
+Usage:
+    python -m benchmarks.bench_workers --workers 4 [--mode fake|real]
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import httpx
+import numpy as np
+
+from benchmarks.bench_recommender import long_queries, percentiles, short_queries
+
+FAKE_APP = "benchmarks.fake_app:app"
+REAL_APP = "api.main:app"
+
+
+def server_command(kind: str, app: str, workers: int, port: int):
+    if kind == "naive":
+        return [
+            sys.executable, "-m", "uvicorn", app,
+            "--workers", str(workers), "--port", str(port), "--log-level", "warning"
+        ]
+    return [
+        sys.executable, "-m", "api.serve", "--app", app,
+        "--workers", str(workers), "--port", str(port), "--log-level", "warning"
+    ]
+
+
+def process_tree(root: int):
+    """
+    root pid plus all descendants.
+    """
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def memory_mb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_mb": fields.get("Rss", 0) / 1024,
+        "pss_mb": fields.get("Pss", 0) / 1024,
+        "uss_mb": (fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024
+    }
+
+
+def wait_ready(base_url: str, workers: int, timeout: float):
+    """
+    Polls /ready until `workers` distinct worker pids answered.
+    """
+    pids = set()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            # A fresh connection per poll, so the kernel spreads them over workers
+            response = httpx.get(base_url + "/ready", timeout=2.0)
+            if response.status_code == 200:
+                pids.add(response.json()["pid"])
+                if len(pids) >= workers:
+                    return pids
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"only {len(pids)} of {workers} workers became ready")
+
+
+def load_test(base_url: str, concurrency: int, requests: int, long_share: float):
+    n_long = int(requests * long_share)
+    queries = long_queries(n_long) + short_queries(requests - n_long)
+
+    async def run():
+        timings = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency)
+
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+            async def one(query):
+                nonlocal errors
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/recommend", json={"query": query, "top_k": 10})
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(q) for q in queries))
+            elapsed = time.perf_counter() - started
+
+        return {
+            "requests": requests,
+            "errors": errors,
+            "requests_per_second": round(requests / elapsed, 1),
+            **percentiles(timings)
+        }
+
+    return asyncio.run(run())
+
+
+def bench_server(kind: str, args, env: dict):
+    base_url = f"http://127.0.0.1:{args.port}"
+    proc = subprocess.Popen(
+        server_command(kind, args.app, args.workers, args.port),
+        env=env,
+        start_new_session=True
+    )
+
+    try:
+        started = time.perf_counter()
+        worker_pids = wait_ready(base_url, args.workers, args.startup_timeout)
+        startup_seconds = time.perf_counter() - started
+
+        load = load_test(base_url, args.concurrency, args.requests, args.long_share)
+
+        # Memory after serving, when workers have touched what they use
+        tree = {pid: memory_mb(pid) for pid in process_tree(proc.pid)}
+        workers = [tree[pid] for pid in worker_pids if pid in tree]
+        cores = min(args.workers, os.cpu_count() or 1)
+
+        return {
+            "workers": args.workers,
+            "startup_seconds": round(startup_seconds, 2),
+            "total_pss_mb": round(sum(m["pss_mb"] for m in tree.values()), 1),
+            "worker_pss_mb": round(float(np.mean([m["pss_mb"] for m in workers])), 1),
+            "worker_uss_mb": round(float(np.mean([m["uss_mb"] for m in workers])), 1),
+            "worker_rss_mb": round(float(np.mean([m["rss_mb"] for m in workers])), 1),
+            "requests_per_second_per_core": round(load["requests_per_second"] / cores, 1),
+            **load
+        }
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Naive vs pre-forked multi-worker serving")
+    parser.add_argument("--mode", choices=["fake", "real"], default="fake")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--long-share", type=float, default=0.5)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument(
+        "--fake-weights-mb",
+        type=float,
+        default=420.0,
+        help="Resident weight buffer per fake model (all-mpnet-base-v2 is ~420 MB)"
+    )
+    parser.add_argument("--fake-cost-us", type=float, default=20.0)
+    parser.add_argument("--kinds", nargs="+", default=["naive", "prefork"], choices=["naive", "prefork"])
+    args = parser.parse_args()
+
+    env = dict(os.environ, SHL_QUERY_CACHE_SIZE="0")
+    if args.mode == "fake":
+        args.app = FAKE_APP
+        env["SHL_FAKE_WEIGHTS_MB"] = str(args.fake_weights_mb)
+        env["SHL_FAKE_COST_US"] = str(args.fake_cost_us)
+    else:
+        args.app = REAL_APP
+        env.setdefault("HF_HUB_OFFLINE", "1")
+
+    report = {
+        "mode": args.mode,
+        "cpu_count": os.cpu_count(),
+        "results": {kind: bench_server(kind, args, env) for kind in args.kinds}
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+api.main with the deterministic fake encoder installed, for serving
+benchmarks without model weights:
+
+    uvicorn benchmarks.fake_app:app
+    python -m api.serve --app benchmarks.fake_app:app
+
+SHL_FAKE_COST_US and SHL_FAKE_WEIGHTS_MB configure the fake encoder.
+"""
+import os
+
+from benchmarks.fake_encoder import install_fake_encoder
+
+install_fake_encoder(
+    cost_per_token_us=float(os.getenv("SHL_FAKE_COST_US", "0")),
+    weights_mb=float(os.getenv("SHL_FAKE_WEIGHTS_MB", "0"))
+)
+
+from api.main import app, load_recommender, reload_from_signal  # noqa: E402,F401
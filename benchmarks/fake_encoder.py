@@ -0,0 +1,83 @@
+"""
+Deterministic stand-in for SentenceTransformer, for benchmarks that must
+run fast without model weights.
+
+Texts are embedded by signed feature hashing of their word tokens, so
+lexically similar texts get similar vectors and results are stable
+across runs and machines. `cost_per_token_us` optionally simulates
+encoder compute so batching effects stay visible, and `weights_mb`
+allocates a resident weight buffer the size of a real model so memory
+benchmarks see a realistic footprint.
+"""
+import hashlib
+import re
+import time
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class FakeSentenceTransformer:
+    max_seq_length = 384
+
+    def __init__(self, model_name_or_path: str = "fake", dim: int = 768,
+                 cost_per_token_us: float = 0.0, weights_mb: float = 0.0, **kwargs):
+        self.model_name = model_name_or_path
+        self.dim = dim
+        self.cost_per_token_us = cost_per_token_us
+        self._token_cache = {}
+
+        # Touched (resident) but otherwise unused, like frozen model weights
+        self.weights = np.ones(int(weights_mb * (1 << 20) / 4), dtype="float32")
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _token_vector(self, token: str):
+        cached = self._token_cache.get(token)
+        if cached is None:
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            rng = np.random.default_rng(int.from_bytes(digest, "little"))
+            cached = self._token_cache[token] = rng.standard_normal(self.dim).astype("float32")
+        return cached
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False,
+               normalize_embeddings: bool = False, convert_to_numpy: bool = True, **kwargs):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        out = np.zeros((len(sentences), self.dim), dtype="float32")
+        total_tokens = 0
+
+        for row, text in enumerate(sentences):
+            tokens = TOKEN_RE.findall(text.lower())[:self.max_seq_length]
+            total_tokens += len(tokens)
+            for token in tokens:
+                out[row] += self._token_vector(token)
+
+        if self.cost_per_token_us:
+            time.sleep(total_tokens * self.cost_per_token_us / 1e6)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out /= np.maximum(norms, 1e-12)
+
+        return out[0] if single else out
+
+
+def install_fake_encoder(**kwargs):
+    """
+    Replaces SentenceTransformer behind EmbeddingModel with the fake.
+    Must run before the recommender / API are instantiated.
+    """
+    import recommender.embedding
+
+    def factory(model_name_or_path="fake", **extra):
+        return FakeSentenceTransformer(model_name_or_path, **{**kwargs, **extra})
+
+    recommender.embedding.SentenceTransformer = factory
+    # Token counts fall back to words, like the fake model itself
+    recommender.embedding.load_tokenizer = lambda model_name: (
+        None, FakeSentenceTransformer.max_seq_length
+    )
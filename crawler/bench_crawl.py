@@ -0,0 +1,221 @@
+"""
+Offline crawl benchmark against a local stand-in for the SHL catalog.
+
+Serves generated fixture catalog + assessment pages from a threaded
+local HTTP server (with optional latency, injected 503s to exercise
+retries, and ETags for conditional requests) and times the full link
+discovery + parse pipeline, including a process-pool parse stage, a
+cached refresh run and an offline re-parse of the page cache.
+
+Usage:
+    python -m crawler.bench_crawl [--assessments 500] [--latency-ms 50] [--error-rate 0.05]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from crawler import crawl_catalog, parse_assessment
+from crawler.fetcher import Fetcher
+from crawler.page_cache import PageCache
+
+PAGE_SIZE = 12
+
+
+def catalog_page(slugs) -> str:
+    links = "".join(
+        f'<li><a href="/products/product-catalog/view/{slug}/">{slug}</a></li>'
+        for slug in slugs
+    )
+    return f"<html><body><main><ul>{links}</ul></main></body></html>"
+
+
+def assessment_page(slug: str, packaged: bool) -> str:
+    kind = "Pre-packaged Job Solution" if packaged else "Individual Test Solution"
+    return (
+        "<html><body><main>"
+        f"<h1>{slug.replace('-', ' ').title()}</h1>"
+        f"<p>{kind}</p>"
+        "<h2>Description</h2>"
+        f"<p>Measures {slug.replace('-', ' ')} skills for candidates.</p>"
+        "<p>Job levels mid-professional, graduate. Test type: K Remote testing:</p>"
+        "<h3>Downloads</h3><p>Sample report</p>"
+        "</main></body></html>"
+    )
+
+
+def make_handler(n_assessments: int, latency: float, error_rate: float):
+    slugs = [f"fixture-assessment-{i}" for i in range(n_assessments)]
+    packaged = {slug for i, slug in enumerate(slugs) if i % 10 == 0}
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+    stats = {"not_modified": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: str = "", headers: dict = None):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+
+            with rng_lock:
+                fail = rng.random() < error_rate
+            if fail:
+                self._send(503)
+                return
+
+            parsed = urlparse(self.path)
+
+            if parsed.path == "/products/product-catalog/":
+                params = parse_qs(parsed.query)
+                start = int(params.get("start", ["0"])[0])
+                type_id = int(params.get("type", ["1"])[0])
+                # Type 1 lists the first half, type 2 the second half
+                half = (n_assessments + 1) // 2
+                pool = slugs[:half] if type_id == 1 else slugs[half:]
+                self._send(200, catalog_page(pool[start:start + PAGE_SIZE]))
+                return
+
+            prefix = "/products/product-catalog/view/"
+            if parsed.path.startswith(prefix):
+                slug = parsed.path[len(prefix):].strip("/")
+                if slug in slugs:
+                    body = assessment_page(slug, slug in packaged)
+                    etag = '"' + hashlib.md5(body.encode("utf-8")).hexdigest() + '"'
+
+                    if self.headers.get("If-None-Match") == etag:
+                        with rng_lock:
+                            stats["not_modified"] += 1
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+
+                    self._send(200, body, {"ETag": etag})
+                    return
+
+            self._send(404)
+
+    return Handler, stats
+
+
+def run(fetcher: Fetcher, base_url: str, parse_workers: int = 0,
+        parser: str = parse_assessment.DEFAULT_PARSER) -> dict:
+    catalog_url = f"{base_url}/products/product-catalog/"
+
+    started = time.perf_counter()
+    links = crawl_catalog.crawl_all_assessments(fetcher, catalog_url, base_url)
+    crawl_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    records = parse_assessment.parse_all(
+        sorted(links),
+        fetcher,
+        progress=False,
+        parse_workers=parse_workers,
+        parser=parser
+    )
+    parse_seconds = time.perf_counter() - started
+
+    return {
+        "links": len(links),
+        "records": len(records),
+        "crawl_seconds": round(crawl_seconds, 3),
+        "parse_seconds": round(parse_seconds, 3),
+        "pages_per_second": round(len(links) / parse_seconds, 1) if parse_seconds else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawl throughput benchmark")
+    parser.add_argument("--assessments", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rps", type=float, default=200.0, help="Per-host rate limit")
+    parser.add_argument("--parse-workers", type=int, default=4)
+    parser.add_argument("--parser", choices=parse_assessment.PARSERS, default="html.parser")
+    args = parser.parse_args()
+
+    handler, server_stats = make_handler(
+        args.assessments,
+        args.latency_ms / 1000.0,
+        args.error_rate
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def concurrent_fetcher(page_cache=None):
+        return Fetcher(max_workers=args.workers, requests_per_second=args.rps,
+                       burst=args.workers, backoff_base=0.01, page_cache=page_cache)
+
+    try:
+        report = {
+            "sequential": run(
+                Fetcher(max_workers=1, requests_per_second=args.rps, backoff_base=0.01),
+                base_url
+            ),
+            "concurrent": run(concurrent_fetcher(), base_url),
+            "concurrent_process_parse": run(
+                concurrent_fetcher(),
+                base_url,
+                parse_workers=args.parse_workers,
+                parser=args.parser
+            )
+        }
+
+        # -------------------------
+        # Populate a page cache, then refresh with conditional GETs
+        # -------------------------
+        with tempfile.TemporaryDirectory() as cache_dir:
+            run(concurrent_fetcher(PageCache(cache_dir)), base_url)
+            server_stats["not_modified"] = 0
+            report["cached_refresh"] = run(concurrent_fetcher(PageCache(cache_dir)), base_url)
+            report["cached_refresh"]["not_modified"] = server_stats["not_modified"]
+
+            # -------------------------
+            # Offline re-parse of the cache (no network)
+            # -------------------------
+            page_cache = PageCache(cache_dir)
+            started = time.perf_counter()
+            records, _ = parse_assessment.reparse_cached(
+                None,
+                page_cache,
+                parse_workers=args.parse_workers,
+                parser=args.parser
+            )
+            report["offline_reparse"] = {
+                "pages": sum(1 for name in os.listdir(cache_dir) if name.endswith(".html")),
+                "records": len(records),
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+    finally:
+        server.shutdown()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,22 @@
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 import json
 
+from crawler.fetcher import Fetcher
+
 BASE_URL = "https://www.shl.com"
 CATALOG_URL = "https://www.shl.com/products/product-catalog/"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0"
-}
 
 START_STEP = 12          # SHL offset step
 MAX_NO_NEW_PAGES = 5     # stop after 5 consecutive pages with no new links
+PAGE_WINDOW = 5          # catalog pages fetched concurrently per round
 
 
-def extract_links_from_page(start, type_id):
+def extract_links(html: str, base_url: str = BASE_URL) -> set:
     """
-    Fetch a catalog page and extract assessment detail links.
+    Extract assessment detail links from catalog page HTML.
     """
-    url = f"{CATALOG_URL}?start={start}&type={type_id}"
-    response = requests.get(url, headers=HEADERS, timeout=10)
-
-    if response.status_code != 200:
-        return set()
-
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(html, "html.parser")
     links = set()
 
     for a in soup.find_all("a", href=True):
@@ -32,16 +24,34 @@ def extract_links_from_page(start, type_id):
 
         # Pattern 1: product-catalog detail pages
         if href.startswith("/products/product-catalog/view/"):
-            links.add(urljoin(BASE_URL, href))
+            links.add(urljoin(base_url, href))
 
         # Pattern 2: deep assessment pages
         elif href.startswith("/products/assessments/") and href.count("/") > 4:
-            links.add(urljoin(BASE_URL, href))
+            links.add(urljoin(base_url, href))
 
     return links
 
 
-def crawl_all_assessments():
+def extract_links_from_page(start, type_id, fetcher: Fetcher = None,
+                            catalog_url: str = CATALOG_URL, base_url: str = BASE_URL):
+    """
+    Fetch a catalog page and extract assessment detail links.
+    """
+    fetcher = fetcher or Fetcher()
+
+    url = f"{catalog_url}?start={start}&type={type_id}"
+    result = fetcher.fetch(url)
+
+    if result is None or result.status != 200:
+        return set()
+
+    return extract_links(result.text, base_url)
+
+
+def crawl_all_assessments(fetcher: Fetcher = None, catalog_url: str = CATALOG_URL,
+                          base_url: str = BASE_URL):
+    fetcher = fetcher or Fetcher()
     all_links = set()
 
     for type_id in [1, 2]:
@@ -49,27 +59,37 @@ def crawl_all_assessments():
         start = 0
         no_new_pages = 0
 
-        while True:
-            print(f"Fetching start={start} ... ", end="")
-
-            current_links = extract_links_from_page(start, type_id)
-            new_links = current_links - all_links
-
-            if new_links:
-                print(f"found {len(new_links)} NEW links")
-                all_links.update(new_links)
-                no_new_pages = 0
-            else:
-                print("no new unique links")
-                no_new_pages += 1
-
-            # Stop condition
-            if no_new_pages >= MAX_NO_NEW_PAGES:
-                print("No new links for multiple pages. Stopping this type.")
-                break
-
-            start += START_STEP
-            time.sleep(0.5)  # be polite to the server
+        while no_new_pages < MAX_NO_NEW_PAGES:
+            # -------------------------
+            # Fetch a window of offsets concurrently,
+            # then process them in page order
+            # -------------------------
+            offsets = [start + i * START_STEP for i in range(PAGE_WINDOW)]
+            pages = dict(fetcher.map(
+                lambda offset: extract_links_from_page(
+                    offset, type_id, fetcher, catalog_url, base_url
+                ),
+                offsets,
+                progress=False
+            ))
+
+            for offset in offsets:
+                new_links = pages[offset] - all_links
+
+                if new_links:
+                    print(f"start={offset}: found {len(new_links)} NEW links")
+                    all_links.update(new_links)
+                    no_new_pages = 0
+                else:
+                    print(f"start={offset}: no new unique links")
+                    no_new_pages += 1
+
+                # Stop condition
+                if no_new_pages >= MAX_NO_NEW_PAGES:
+                    print("No new links for multiple pages. Stopping this type.")
+                    break
+
+            start += PAGE_WINDOW * START_STEP
 
     return all_links
 
@@ -0,0 +1,207 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0"
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    text: str = ""
+    headers: dict = field(default_factory=dict)
+    attempts: int = 1
+    elapsed: float = 0.0
+    from_cache: bool = False
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class Fetcher:
+    """
+    Concurrent HTTP fetcher for the crawler.
+
+    - bounded thread pool
+    - pooled keep-alive sessions (one per worker thread)
+    - token-bucket rate limit per host
+    - retry with exponential backoff + jitter on 429/5xx, timeouts
+      and connection errors (honours Retry-After)
+    - optional PageCache: conditional GETs, 304s served from the cache
+    """
+
+    def __init__(self, max_workers: int = 8, requests_per_second: float = 4.0,
+                 burst: int = 2, max_retries: int = 4, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, timeout: float = 10, headers: dict = None,
+                 page_cache=None):
+        self.max_workers = max_workers
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.headers = headers or HEADERS
+        self.page_cache = page_cache
+
+        self._local = threading.local()
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+
+    # -------------------------
+    # Sessions + rate limiting
+    # -------------------------
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.requests_per_second, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def _backoff(self, attempt: int, retry_after: str = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+
+        delay = self.backoff_base * (2 ** (attempt - 1))
+        return min(delay, self.backoff_max) * (0.5 + random.random() / 2)
+
+    # -------------------------
+    # Fetching
+    # -------------------------
+    def fetch(self, url: str, headers: dict = None) -> FetchResult | None:
+        """
+        Fetches a URL with retries. Returns the final response as a
+        FetchResult, or None when every attempt failed at the network level.
+        """
+        started = time.monotonic()
+        bucket = self._bucket(url)
+
+        request_headers = dict(headers or {})
+        if self.page_cache is not None:
+            request_headers.update(self.page_cache.conditional_headers(url))
+
+        for attempt in range(1, self.max_retries + 2):
+            bucket.acquire()
+
+            try:
+                response = self._session().get(
+                    url,
+                    headers=request_headers,
+                    timeout=self.timeout
+                )
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if attempt > self.max_retries:
+                    print("Error fetching:", url, e)
+                    return None
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt <= self.max_retries:
+                time.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                continue
+
+            # -------------------------
+            # Not modified: serve from the page cache
+            # -------------------------
+            if response.status_code == 304 and self.page_cache is not None:
+                cached = self.page_cache.get(url)
+                if cached is not None:
+                    return FetchResult(
+                        url=url,
+                        status=200,
+                        text=cached,
+                        headers=dict(response.headers),
+                        attempts=attempt,
+                        elapsed=time.monotonic() - started,
+                        from_cache=True
+                    )
+
+            if response.status_code == 200 and self.page_cache is not None:
+                self.page_cache.put(url, response.text, response.headers)
+
+            return FetchResult(
+                url=url,
+                status=response.status_code,
+                text=response.text,
+                headers=dict(response.headers),
+                attempts=attempt,
+                elapsed=time.monotonic() - started
+            )
+
+        return None
+
+    def map(self, func, items, desc: str = "Fetching", progress: bool = True):
+        """
+        Runs func(item) on the worker pool and yields (item, result)
+        as they complete, with a progress bar.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(func, item): item for item in items}
+
+            with tqdm(total=len(futures), desc=desc, disable=not progress) as bar:
+                for future in as_completed(futures):
+                    bar.update(1)
+                    yield futures[future], future.result()
+
+    def fetch_many(self, urls, desc: str = "Fetching", progress: bool = True):
+        """
+        Fetches URLs concurrently, yielding (url, FetchResult | None)
+        as they complete.
+        """
+        yield from self.map(self.fetch, urls, desc=desc, progress=progress)
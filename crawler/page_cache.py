@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import time
+
+PAGE_CACHE_DIR = "data/raw/pages"
+
+
+class PageCache:
+    """
+    Persistent raw-HTML cache keyed by URL.
+
+    Each page is stored as <key>.html plus a <key>.json sidecar holding
+    the URL, ETag and Last-Modified validators used for conditional GETs.
+    """
+
+    def __init__(self, cache_dir: str = PAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".html", base + ".json"
+
+    def get(self, url: str) -> str | None:
+        html_path, _ = self._paths(url)
+        if not os.path.exists(html_path):
+            return None
+
+        with open(html_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def meta(self, url: str) -> dict | None:
+        _, meta_path = self._paths(url)
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def conditional_headers(self, url: str) -> dict:
+        """
+        Validators for a conditional GET, if the page is cached.
+        """
+        meta = self.meta(url)
+        if not meta:
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def put(self, url: str, html: str, headers: dict):
+        html_path, meta_path = self._paths(url)
+
+        # Write the page before its validators so a crash never leaves
+        # validators pointing at a missing page
+        tmp_path = html_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, html_path)
+
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time()
+        }
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def items(self):
+        """
+        Yields (url, html) for every cached page.
+        """
+        for name in sorted(os.listdir(self.cache_dir)):
+            if not name.endswith(".json"):
+                continue
+
+            with open(os.path.join(self.cache_dir, name), "r", encoding="utf-8") as f:
+                url = json.load(f)["url"]
+
+            html = self.get(url)
+            if html is not None:
+                yield url, html
@@ -1,13 +1,15 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+import argparse
 import json
-import time
+import os
+import queue
 import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0"
-}
+from crawler.fetcher import Fetcher
+from crawler.page_cache import PageCache
 
 NOISE_PATTERNS = [
     r"we recommend upgrading.*",
@@ -18,6 +20,11 @@ NOISE_PATTERNS = [
 
 RAW_LINKS_PATH = "data/raw/assessment_links.json"
 OUTPUT_PATH = "data/processed/assessments.json"
+CHECKPOINT_PATH = "data/processed/assessments.checkpoint.jsonl"
+
+# BeautifulSoup tree builders; lxml is considerably faster than html.parser
+PARSERS = ["html.parser", "lxml"]
+DEFAULT_PARSER = "html.parser"
 
 
 def clean_text(text: str) -> str:
@@ -28,13 +35,24 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
-def extract_description(soup: BeautifulSoup) -> str:
+def detail_container(soup: BeautifulSoup) -> Tag:
+    """
+    The element holding the assessment details (<main>), so navigation,
+    header and footer are never walked; the whole page if there is none.
+    """
+    return soup.find("main") or soup.body or soup
+
+
+def extract_description(container: Tag) -> str:
     collected = []
 
-    for heading in soup.find_all(["h2", "h3"]):
+    for heading in container.find_all(["h2", "h3"]):
         title = heading.get_text(strip=True).lower()
         if any(k in title for k in ["overview", "description", "what", "measure"]):
-            for sib in heading.find_next_siblings():
+            # Walk siblings lazily instead of materializing all of them
+            for sib in heading.next_siblings:
+                if not isinstance(sib, Tag):
+                    continue
                 if sib.name in ["h2", "h3"]:
                     break
                 collected.append(sib.get_text(" ", strip=True))
@@ -42,65 +60,299 @@ def extract_description(soup: BeautifulSoup) -> str:
     if collected:
         return clean_text(" ".join(collected))
 
-    main = soup.find("main")
-    if main:
-        return clean_text(main.get_text(" ", strip=True))
+    if container.name == "main":
+        return clean_text(container.get_text(" ", strip=True))
 
     return ""
 
 
-def parse_assessment_page(url: str) -> dict | None:
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        if response.status_code != 200:
-            return None
+def parse_assessment_html(url: str, html: str, parser: str = DEFAULT_PARSER) -> dict | None:
+    """
+    Extracts an Individual Test Solution record from a page's HTML.
+    Returns None for pre-packaged job solutions or pages without a name.
+    Pure CPU work, safe to run in a process pool.
+    """
+    soup = BeautifulSoup(html, parser)
+    container = detail_container(soup)
+
+    name_tag = container.find("h1") or soup.find("h1")
+    name = name_tag.get_text(strip=True) if name_tag else None
 
-        soup = BeautifulSoup(response.text, "html.parser")
+    # Classify on the detail text only, not the full document
+    detail_text = container.get_text(" ", strip=True).lower()
+    is_individual = not (
+        "pre-packaged" in detail_text or
+        "job solution" in detail_text
+    )
 
-        name_tag = soup.find("h1")
-        name = name_tag.get_text(strip=True) if name_tag else None
+    # Skip description extraction for pages that are dropped anyway
+    if not name or not is_individual:
+        return None
 
-        description = extract_description(soup)
+    return {
+        "assessment_name": name,
+        "description": extract_description(container),
+        "url": url
+    }
 
-        page_text = soup.get_text(" ", strip=True).lower()
-        is_individual = not (
-            "pre-packaged" in page_text or
-            "job solution" in page_text
-        )
 
-        if not name or not is_individual:
-            return None
+def fetch_and_parse(url: str, fetcher: Fetcher):
+    """
+    Returns (completed, record). `completed` is False when the page
+    could not be fetched, so the URL is retried on the next run.
+    """
+    try:
+        result = fetcher.fetch(url)
+        if result is None:
+            return False, None
+        if result.status != 200:
+            return True, None
 
-        return {
-            "assessment_name": name,
-            "description": description,
-            "url": url
-        }
+        return True, parse_assessment_html(url, result.text)
 
     except Exception as e:
         print("Error parsing:", url, e)
-        return None
-
+        return False, None
+
+
+def parse_assessment_page(url: str, fetcher: Fetcher = None) -> dict | None:
+    _, record = fetch_and_parse(url, fetcher or Fetcher())
+    return record
+
+
+def load_checkpoint(path: str) -> dict:
+    """
+    Reads the append-only checkpoint: {url: record | None}.
+    A truncated trailing line (crash mid-write) is ignored.
+    """
+    done = {}
+    if not Path(path).exists():
+        return done
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[entry["url"]] = entry["record"]
+
+    return done
+
+
+def parse_all(urls, fetcher: Fetcher = None, progress: bool = True,
+              checkpoint_path: str = None, parse_workers: int = 0,
+              parser: str = DEFAULT_PARSER, queue_size: int = 64):
+    """
+    Fetches and parses assessment pages as a two-stage pipeline:
+    fetcher threads stream raw HTML into a bounded queue, and a process
+    pool (`parse_workers` > 0) or the calling thread parses it.
+
+    With a checkpoint path, every completed URL is appended to a JSONL
+    checkpoint and URLs already in it are skipped, so a restarted run
+    continues where the previous one stopped. Once every URL has completed
+    the checkpoint is deleted, so the next run fetches again (cheaply, with
+    conditional requests) instead of replaying old records.
+    Returns records in input URL order.
+    """
+    fetcher = fetcher or Fetcher()
+
+    done = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    pending = [url for url in urls if url not in done]
+
+    if done:
+        print(f"Resuming: {len(done)} URLs already completed, {len(pending)} remaining")
+
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+    if checkpoint and checkpoint.tell() > 0:
+        # Terminate a line truncated by a crash so new entries stay parseable
+        with open(checkpoint_path, "rb") as f:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                checkpoint.write("\n")
+
+    def complete(url, record):
+        done[url] = record
+        if checkpoint:
+            checkpoint.write(json.dumps({"url": url, "record": record}) + "\n")
+            checkpoint.flush()
+
+    # -------------------------
+    # Stage 1: fetchers -> bounded queue
+    # -------------------------
+    pages = queue.Queue(maxsize=queue_size)
+    finished = object()
+
+    def fetch_into_queue(url):
+        try:
+            result = fetcher.fetch(url)
+        except Exception as e:
+            print("Error fetching:", url, e)
+            result = None
+        pages.put((url, result))
+
+    def produce():
+        try:
+            for _ in fetcher.map(fetch_into_queue, pending, desc="Fetching", progress=progress):
+                pass
+        finally:
+            pages.put(finished)
+
+    threading.Thread(target=produce, name="shl-fetch-stage", daemon=True).start()
+
+    # -------------------------
+    # Stage 2: parse (process pool or inline)
+    # -------------------------
+    pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+    in_flight = {}
+
+    def collect(futures):
+        for future in futures:
+            url = in_flight.pop(future)
+            try:
+                complete(url, future.result())
+            except Exception as e:
+                print("Error parsing:", url, e)
 
-def main():
-    Path("data/processed").mkdir(parents=True, exist_ok=True)
-
-    with open(RAW_LINKS_PATH, "r", encoding="utf-8") as f:
-        urls = json.load(f)
-
-    results = []
-    total = len(urls)
+    try:
+        while True:
+            item = pages.get()
+            if item is finished:
+                break
+
+            url, result = item
+            if result is None:
+                # Network failure: leave out of the checkpoint, retried next run
+                continue
+            if result.status != 200:
+                complete(url, None)
+                continue
+
+            if pool is None:
+                try:
+                    complete(url, parse_assessment_html(url, result.text, parser))
+                except Exception as e:
+                    print("Error parsing:", url, e)
+                continue
+
+            in_flight[pool.submit(parse_assessment_html, url, result.text, parser)] = url
+
+            # Bound the HTML held by queued parse jobs
+            if len(in_flight) >= queue_size:
+                finished_futures, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished_futures)
+
+        collect(list(in_flight))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if checkpoint:
+            checkpoint.close()
+
+    # Keep the checkpoint only while URLs are still outstanding (network failures)
+    if checkpoint_path and all(url in done for url in urls):
+        Path(checkpoint_path).unlink(missing_ok=True)
+
+    return [done[url] for url in urls if done.get(url)]
+
+
+def reparse_cached(urls, page_cache: PageCache, parse_workers: int = 0,
+                   parser: str = DEFAULT_PARSER):
+    """
+    Offline mode: re-parses cached raw HTML without touching the network,
+    for the given URLs or, when `urls` is None, every page in the cache.
+    Returns (records in input URL / cache order, number of URLs missing
+    from the cache).
+    """
+    if urls is None:
+        cached = list(page_cache.items())
+        missing = 0
+    else:
+        cached = [(url, page_cache.get(url)) for url in urls]
+        missing = sum(1 for _, html in cached if html is None)
+        cached = [(url, html) for url, html in cached if html is not None]
+
+    urls_, htmls = [url for url, _ in cached], [html for _, html in cached]
+    parsers = [parser] * len(cached)
+
+    if parse_workers > 0:
+        with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+            records = list(pool.map(parse_assessment_html, urls_, htmls, parsers, chunksize=16))
+    else:
+        records = list(map(parse_assessment_html, urls_, htmls, parsers))
+
+    return [record for record in records if record], missing
 
-    print(f"Parsing {total} assessment pages...\n")
 
-    for idx, url in enumerate(urls, start=1):
-        print(f"[{idx}/{total}] Parsing: {url}")
-        data = parse_assessment_page(url)
+def main():
+    parser = argparse.ArgumentParser(description="Fetch and parse SHL assessment pages")
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Discard the checkpoint and parse every URL again"
+    )
+    parser.add_argument(
+        "--no-page-cache",
+        action="store_true",
+        help="Do not use the raw HTML cache / conditional requests"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Re-parse cached raw HTML only, without network access"
+    )
+    parser.add_argument(
+        "--links",
+        default=None,
+        help=f"JSON list of assessment URLs (default: {RAW_LINKS_PATH}; "
+             "with --offline, every page in the cache)"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes for the HTML parse stage (0 = parse inline)"
+    )
+    parser.add_argument("--parser", choices=PARSERS, default=DEFAULT_PARSER)
+    args = parser.parse_args()
 
-        if data:
-            results.append(data)
+    Path("data/processed").mkdir(parents=True, exist_ok=True)
 
-        time.sleep(0.5)  # polite crawling
+    links_path = args.links or (None if args.offline else RAW_LINKS_PATH)
+    urls = None
+    if links_path:
+        with open(links_path, "r", encoding="utf-8") as f:
+            urls = json.load(f)
+
+    if args.offline:
+        # -------------------------
+        # Offline re-parse of the raw page cache
+        # -------------------------
+        print(f"Re-parsing {len(urls) if urls is not None else 'all'} cached assessment pages...\n")
+        results, missing = reparse_cached(
+            urls,
+            PageCache(),
+            parse_workers=args.parse_workers,
+            parser=args.parser
+        )
+        if missing:
+            print(f"Warning: {missing} URLs are not in the page cache")
+    else:
+        if args.fresh:
+            Path(CHECKPOINT_PATH).unlink(missing_ok=True)
+
+        page_cache = None if args.no_page_cache else PageCache()
+        fetcher = Fetcher(page_cache=page_cache)
+
+        print(f"Parsing {len(urls)} assessment pages...\n")
+
+        results = parse_all(
+            urls,
+            fetcher,
+            checkpoint_path=CHECKPOINT_PATH,
+            parse_workers=args.parse_workers,
+            parser=args.parser
+        )
 
     with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2)
@@ -6,11 +6,14 @@ CLEAN_DATA_PATH = "data/processed/assessments_clean.json"
 
 def normalize_url(url: str) -> str:
     """
-    Normalize URLs so that minor differences (trailing slash, http/https)
-    do not cause mismatches.
+    Normalize URLs so that minor differences (trailing slash, http/https,
+    the /solutions/products/ alias of /products/) do not cause mismatches.
     """
     parsed = urlparse(url.strip())
-    return parsed.scheme + "://" + parsed.netloc + parsed.path.rstrip("/")
+    path = parsed.path.rstrip("/")
+    if path.startswith("/solutions/products/"):
+        path = path[len("/solutions"):]
+    return "https://" + parsed.netloc.lower() + path
 
 
 def load_clean_urls():
@@ -0,0 +1,81 @@
+import numpy as np
+
+# faiss is imported inside the functions that use it, so importing this
+# module (the API does at startup, for parse_search_params) stays cheap
+
+DEFAULT_FACTORY = "Flat"
+
+# Runtime search knobs understood by apply_search_params
+SEARCH_PARAMS = ("nprobe", "efSearch")
+
+
+def build_index(embeddings, factory: str = DEFAULT_FACTORY, train_size: int = None):
+    """
+    Builds and trains an inner-product FAISS index from a factory string,
+    e.g. "Flat", "SQfp16", "HNSW32,Flat", "IVF1024,Flat", "IVF1024,PQ32",
+    "IVF1024,SQ8".
+    """
+    import faiss
+
+    vectors = np.ascontiguousarray(embeddings, dtype="float32")
+    index = faiss.index_factory(vectors.shape[1], factory, faiss.METRIC_INNER_PRODUCT)
+
+    if not index.is_trained:
+        train = vectors
+        if train_size and train_size < len(vectors):
+            rng = np.random.default_rng(0)
+            train = vectors[rng.choice(len(vectors), train_size, replace=False)]
+        index.train(train)
+
+    index.add(vectors)
+    return index
+
+
+def parse_search_params(spec: str) -> dict:
+    """
+    Parses "nprobe=16,efSearch=64" into {"nprobe": 16, "efSearch": 64}.
+    """
+    params = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        params[name.strip()] = int(value)
+    return params
+
+
+def apply_search_params(index, params: dict):
+    """
+    Sets runtime search parameters on an index. Parameters that do not
+    apply to the index type (e.g. nprobe on HNSW) are ignored, so one
+    configuration can be used across index types.
+    """
+    unknown = set(params or {}) - set(SEARCH_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown search parameters: {sorted(unknown)}")
+
+    import faiss
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and "nprobe" in params:
+        ivf.nprobe = params["nprobe"]
+
+    if hasattr(index, "hnsw") and "efSearch" in params:
+        index.hnsw.efSearch = params["efSearch"]
+
+
+def search_parameters(index, selector):
+    """
+    SearchParameters carrying an ID selector, of the type matching the
+    index so its current nprobe / efSearch are preserved.
+    """
+    import faiss
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+
+    if hasattr(index, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+
+    return faiss.SearchParameters(sel=selector)
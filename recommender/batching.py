@@ -0,0 +1,164 @@
+import json
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-query recommend calls into batches.
+
+    Callers get a Future per query resolving to its (row ids, scores).
+    A background worker flushes the pending queue as one `retrieve_batch`
+    call once `max_batch_size` queries are waiting or the oldest one has
+    waited `max_wait_ms`.
+    """
+
+    def __init__(self, recommender, max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        self.recommender = recommender
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+        # -------------------------
+        # Metrics
+        # -------------------------
+        self.batches = 0
+        self.requests = 0
+        self.max_observed_batch = 0
+        self.batch_sizes = Counter()
+
+    def start(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="shl-micro-batcher",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def close(self):
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+
+        if worker is not None:
+            self._queue.put(_STOP)
+            worker.join()
+
+    def submit(self, query: str, top_k: int = 5, filters: dict = None,
+               state=None) -> Future:
+        """
+        Enqueues a query and returns a Future resolving to its hits.
+        `state` pins the index snapshot to search (default: the live
+        one at submit time), so hits match the caller's result store.
+        """
+        self.start()
+
+        future = Future()
+        state = state or self.recommender.state
+        self._queue.put((query, top_k, filters, state, future))
+        return future
+
+    def retrieve(self, query: str, top_k: int = 5, filters: dict = None, state=None):
+        return self.submit(query, top_k, filters, state).result()
+
+    def _collect(self, first):
+        """
+        Gathers up to max_batch_size pending items, waiting at most
+        max_wait after the first one arrived.
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = self._collect(first)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # Drop callers that cancelled while queued
+        batch = [item for item in batch if item[4].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        self.batch_sizes[len(batch)] += 1
+        self.max_observed_batch = max(self.max_observed_batch, len(batch))
+
+        # Queries with different filters (or pinned to different index
+        # snapshots across a reload) are searched separately. A diversified
+        # top-k is not a prefix of a larger diversified list, so with
+        # diversity on each top_k is searched separately too
+        groups = {}
+        for item in batch:
+            key = (json.dumps(item[2], sort_keys=True), id(item[3]))
+            if self.recommender.diversity:
+                key += (item[1],)
+            groups.setdefault(key, []).append(item)
+
+        for group in groups.values():
+            self._search_group(group)
+
+    def _search_group(self, group):
+        queries = [query for query, _, _, _, _ in group]
+        top_k = max(k for _, k, _, _, _ in group)
+        _, _, filters, state, _ = group[0]
+
+        try:
+            batch_hits = self.recommender.retrieve_batch(
+                queries,
+                top_k=top_k,
+                filters=filters,
+                state=state
+            )
+        except Exception as e:
+            for *_, future in group:
+                future.set_exception(e)
+            return
+
+        for (_, k, _, _, future), (ids, scores) in zip(group, batch_hits):
+            future.set_result((ids[:k], scores[:k]))
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size_observed": self.max_observed_batch,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0
+        }
@@ -0,0 +1,108 @@
+from collections import Counter
+from recommender.utils import clean_description
+
+# Boilerplate = runs of at least MIN_SPAN_WORDS words covered by
+# SHINGLE_WORDS-word shingles that occur in at least MIN_DOC_FRACTION of
+# the catalog's descriptions (site navigation, CTA blocks, footers)
+SHINGLE_WORDS = 4
+MIN_DOC_FRACTION = 0.5
+MIN_SPAN_WORDS = 16
+
+
+def shingles(words, n: int):
+    return [tuple(words[i:i + n]) for i in range(len(words) - n + 1)]
+
+
+class BoilerplateStripper:
+    """
+    Removes text spans repeated across a large share of a corpus.
+
+    Learned from the corpus itself rather than hard-coded, so a change to
+    the crawled site's navigation or footer is picked up when it is
+    relearned. Short frequent phrases ("job levels", "test type:") never
+    form a long enough run and are kept.
+
+    The learned set depends on the whole corpus: relearning after any
+    catalog change can shift which spans are stripped and so change the
+    cleaned text (and cached embeddings) of unchanged documents. Builds
+    therefore persist it (to_dict / from_dict) and reuse it until asked
+    to relearn.
+    """
+
+    def __init__(self, boilerplate: frozenset, n: int = SHINGLE_WORDS,
+                 min_span: int = MIN_SPAN_WORDS):
+        self.boilerplate = boilerplate
+        self.n = n
+        self.min_span = min_span
+
+    @classmethod
+    def learn(cls, texts, n: int = SHINGLE_WORDS, min_doc_fraction: float = MIN_DOC_FRACTION,
+              min_span: int = MIN_SPAN_WORDS):
+        document_frequency = Counter()
+        for text in texts:
+            document_frequency.update(set(shingles(text.split(), n)))
+
+        threshold = max(2.0, min_doc_fraction * len(texts))
+        boilerplate = frozenset(
+            shingle for shingle, count in document_frequency.items() if count >= threshold
+        )
+        return cls(boilerplate, n, min_span)
+
+    def to_dict(self) -> dict:
+        return {
+            "shingle_words": self.n,
+            "min_span_words": self.min_span,
+            "shingles": sorted(list(shingle) for shingle in self.boilerplate)
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict):
+        return cls(
+            frozenset(tuple(shingle) for shingle in payload["shingles"]),
+            payload["shingle_words"],
+            payload["min_span_words"]
+        )
+
+    def strip(self, text: str) -> str:
+        """
+        The text without boilerplate runs, whitespace collapsed.
+        """
+        words = text.split()
+
+        # Words covered by any boilerplate shingle
+        covered = [False] * len(words)
+        for i, shingle in enumerate(shingles(words, self.n)):
+            if shingle in self.boilerplate:
+                covered[i:i + self.n] = [True] * self.n
+
+        kept = []
+        start = 0
+        while start < len(words):
+            end = start + 1
+            while end < len(words) and covered[end] == covered[start]:
+                end += 1
+            if not covered[start] or end - start < self.min_span:
+                kept.extend(words[start:end])
+            start = end
+
+        return " ".join(kept)
+
+
+def learn_boilerplate(descriptions) -> BoilerplateStripper:
+    """
+    Learns the boilerplate of a catalog's descriptions (page header cut
+    first, as clean_descriptions does).
+    """
+    return BoilerplateStripper.learn([clean_description(text) for text in descriptions])
+
+
+def clean_descriptions(descriptions, stripper: BoilerplateStripper = None):
+    """
+    Cleans a whole catalog's descriptions: drops the page header up to
+    "description" (clean_description), then strips the boilerplate
+    shared across the catalog, learned from these descriptions unless a
+    previously learned `stripper` is given.
+    """
+    headless = [clean_description(text) for text in descriptions]
+    stripper = stripper or BoilerplateStripper.learn(headless)
+    return [stripper.strip(text) for text in headless]
@@ -1,57 +1,266 @@
+"""
+Offline index build: encodes every assessment and writes a versioned
+index bundle (see recommender/bundle.py).
+
+Usage:
+    python -m recommender.build_index [--dtype float16] [--index-factory "HNSW32,Flat"]
+                                      [--output DIR] [--no-cache] [--backend int8]
+
+Unchanged documents are served from an on-disk embedding cache keyed
+by (model name + backend, embedding text), so a rebuild only encodes new
+or changed assessments.
+
+Descriptions are cleaned once here (recommender/boilerplate.py): the
+navigation / footer text shared across the catalog is stripped before
+encoding and the cleaned text is what the bundle stores and serves.
+The learned boilerplate is saved next to the embedding cache and reused
+by later builds (--relearn-boilerplate to learn it again), since
+relearning can change the cleaned text of unchanged documents and so
+invalidate their cached embeddings. Tokens per document before and
+after are reported and recorded in the manifest; counting uses the
+tokenizer only, so fully cached rebuilds still never load the weights.
+
+Near-duplicate assessments (embedding cosine >= --duplicate-threshold)
+are clustered and each record stores its `cluster_id`, used by
+diversified search (recommender/diversity.py).
+"""
+import argparse
 import json
-import pandas as pd
+import os
 import numpy as np
-from embedding import EmbeddingModel
+import pandas as pd
+from recommender.boilerplate import (
+    MIN_DOC_FRACTION, BoilerplateStripper, clean_descriptions, learn_boilerplate
+)
+from recommender.bundle import write_bundle
+from recommender.diversity import DUPLICATE_THRESHOLD, cluster_ids
+from recommender.embedding import BACKENDS, EmbeddingModel, DEFAULT_MODEL_NAME
+from recommender.embedding_cache import EmbeddingCache
+from recommender.metadata import extract_metadata
 
 INPUT_PATH = "data/processed/assessments.json"
-OUTPUT_EMB = "data/processed/assessment_embeddings.npy"
-OUTPUT_META = "data/processed/assessments.pkl"
-
-# -----------------------
-# Load JSON safely
-# -----------------------
-with open(INPUT_PATH, "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-# If wrapped in a key, uncomment this:
-# data = data["assessments"]
-
-df = pd.DataFrame(data)
-
-# -----------------------
-# Basic validation
-# -----------------------
-required_cols = {"assessment_name", "description", "url"}
-missing = required_cols - set(df.columns)
-
-if missing:
-    raise ValueError(f"Missing required fields: {missing}")
-
-# -----------------------
-# Clean data
-# -----------------------
-df = df.dropna(subset=["assessment_name", "description", "url"])
-df = df.reset_index(drop=True)
-
-# -----------------------
-# Build embedding text
-# -----------------------
-texts = (
-    df["assessment_name"].str.lower().str.strip() + ". " +
-    df["description"].str.lower().str.strip()
-).tolist()
-
-# -----------------------
-# Encode
-# -----------------------
-model = EmbeddingModel()
-embeddings = model.encode(texts)
-
-# -----------------------
-# Save outputs
-# -----------------------
-np.save(OUTPUT_EMB, embeddings)
-df.to_pickle(OUTPUT_META)
-
-print("Embeddings saved:", embeddings.shape)
-print("Metadata saved:", OUTPUT_META)
+OUTPUT_BUNDLE = "data/processed/index_bundle"
+EMBEDDING_CACHE_DIR = "data/processed/embedding_cache"
+
+# Learned boilerplate, kept with the embeddings it was cleaned for
+BOILERPLATE_FILE = "boilerplate.json"
+
+METADATA_COLS = ["assessment_name", "description", "url"]
+
+
+def load_assessments(input_path: str) -> pd.DataFrame:
+    # -----------------------
+    # Load JSON safely
+    # -----------------------
+    with open(input_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    # If wrapped in a key, uncomment this:
+    # data = data["assessments"]
+
+    df = pd.DataFrame(data)
+
+    # -----------------------
+    # Basic validation
+    # -----------------------
+    required_cols = {"assessment_name", "description", "url"}
+    missing = required_cols - set(df.columns)
+
+    if missing:
+        raise ValueError(f"Missing required fields: {missing}")
+
+    # -----------------------
+    # Clean data
+    # -----------------------
+    df = df.dropna(subset=["assessment_name", "description", "url"])
+    df = df.reset_index(drop=True)
+
+    return df
+
+
+def build_texts(df: pd.DataFrame):
+    # -----------------------
+    # Build embedding text
+    # -----------------------
+    return (
+        df["assessment_name"].str.lower().str.strip() + ". " +
+        df["description"].str.lower().str.strip()
+    ).tolist()
+
+
+def token_stats(counts, max_seq_length: int) -> dict:
+    counts = np.asarray(counts)
+    return {
+        "mean": round(float(counts.mean()), 1),
+        "p50": int(np.percentile(counts, 50)),
+        "max": int(counts.max()),
+        "truncated_docs": int((counts > max_seq_length).sum())
+    }
+
+
+def load_or_learn_boilerplate(descriptions, cache_dir: str = None, relearn: bool = False):
+    """
+    The boilerplate stripper saved in cache_dir by an earlier build, or
+    one learned from `descriptions` (and saved there when cache_dir is
+    set). Returns (stripper, learned).
+    """
+    path = os.path.join(cache_dir, BOILERPLATE_FILE) if cache_dir else None
+
+    if path and not relearn and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return BoilerplateStripper.from_dict(json.load(f)), False
+
+    stripper = learn_boilerplate(descriptions)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(stripper.to_dict(), f)
+    return stripper, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the SHL assessment index bundle")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_BUNDLE)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="torch",
+        help="Encoder backend (see `python -m recommender.verify_encoder`)"
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["float32", "float16"],
+        default="float32",
+        help="Storage dtype of the embedding matrix (float16 halves disk/RSS)"
+    )
+    parser.add_argument(
+        "--index-factory",
+        default=None,
+        help='FAISS factory string, e.g. "Flat", "HNSW32,Flat", "IVF1024,Flat", '
+             '"IVF1024,PQ32", "IVF1024,SQ8" (default: exact index for --dtype)'
+    )
+    parser.add_argument("--cache-dir", default=EMBEDDING_CACHE_DIR)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-encode every document and ignore the embedding cache "
+             "(the saved boilerplate is still reused)"
+    )
+    parser.add_argument(
+        "--relearn-boilerplate",
+        action="store_true",
+        help="Learn the shared boilerplate again instead of reusing the saved set "
+             "(re-encodes every document whose cleaned text changes)"
+    )
+    parser.add_argument(
+        "--duplicate-threshold",
+        type=float,
+        default=DUPLICATE_THRESHOLD,
+        help="Cosine similarity at which assessments count as near-duplicates"
+    )
+    args = parser.parse_args()
+
+    df = load_assessments(args.input)
+    model = EmbeddingModel(args.model, backend=args.backend)
+
+    # -----------------------
+    # Structured fields come from the raw crawled text
+    # -----------------------
+    records = df[METADATA_COLS].to_dict(orient="records")
+
+    # Typed columns (test type, job levels, languages, duration, flags)
+    for record in records:
+        record.update(extract_metadata(record))
+
+    # -----------------------
+    # Strip shared boilerplate; cleaned text is encoded and stored
+    # -----------------------
+    tokens_before = model.count_tokens(build_texts(df))
+
+    # Read (and saved) even with --no-cache, which only skips cached
+    # embeddings; relearning is --relearn-boilerplate's job
+    stripper, learned = load_or_learn_boilerplate(
+        df["description"].tolist(),
+        cache_dir=args.cache_dir,
+        relearn=args.relearn_boilerplate
+    )
+    print(
+        f"Boilerplate: {len(stripper.boilerplate)} shingles " +
+        ("learned" if learned else f"reused from {args.cache_dir} (--relearn-boilerplate to update)")
+    )
+
+    df["description"] = clean_descriptions(df["description"].tolist(), stripper)
+    for record, description in zip(records, df["description"]):
+        record["description"] = description
+
+    texts = build_texts(df)
+    tokens_after = model.count_tokens(texts)
+
+    max_seq_length = model.max_seq_length
+    text_normalization = {
+        "shingle_words": stripper.n,
+        "min_doc_fraction": MIN_DOC_FRACTION,
+        "min_span_words": stripper.min_span,
+        "boilerplate_shingles": len(stripper.boilerplate),
+        "boilerplate_learned": learned,
+        "tokens_before": token_stats(tokens_before, max_seq_length),
+        "tokens_after": token_stats(tokens_after, max_seq_length)
+    }
+    print(
+        "Tokens per document: {mean} mean / {max} max before, ".format(**text_normalization["tokens_before"]) +
+        "{mean} mean / {max} max after ".format(**text_normalization["tokens_after"]) +
+        f"({1 - sum(tokens_after) / sum(tokens_before):.0%} fewer tokens encoded)"
+    )
+
+    # -----------------------
+    # Encode (incrementally, via the content-hash cache)
+    # -----------------------
+
+    if args.no_cache:
+        embeddings = model.encode(texts)
+    else:
+        cache = EmbeddingCache(args.cache_dir)
+        embeddings, summary = cache.encode(model, df["url"].tolist(), texts)
+        cache.save()
+
+        print(
+            "Documents: {added} added, {changed} changed, {removed} removed, "
+            "{reused} reused, {encoded} encoded".format(**summary)
+        )
+
+    # -----------------------
+    # Near-duplicate clusters (diversified search)
+    # -----------------------
+    clusters = cluster_ids(embeddings, args.duplicate_threshold)
+    for record, cluster in zip(records, clusters.tolist()):
+        record["cluster_id"] = cluster
+
+    sizes = np.bincount(clusters)
+    print(
+        f"Near-duplicate clusters: {int((sizes > 1).sum())} clusters covering "
+        f"{int(sizes[sizes > 1].sum())} rows (largest {int(sizes.max())})"
+    )
+
+    # -----------------------
+    # Save bundle (metadata rows stay aligned with embeddings)
+    # -----------------------
+    manifest = write_bundle(
+        args.output,
+        embeddings,
+        records,
+        model_name=args.model,
+        dtype=args.dtype,
+        index_factory=args.index_factory,
+        text_normalization=text_normalization
+    )
+
+    print("Embeddings saved:", embeddings.shape, args.dtype)
+    print("Bundle saved:", args.output)
+    print("Index:", manifest["index_factory"], f"({manifest['index_type']})")
+    print("Bundle version:", manifest["version"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Offline bulk scoring: recommendations for a large file of job
+descriptions, without going through the API.
+
+The input (CSV with a header row, or JSONL) is streamed in chunks, so
+memory stays bounded by --chunk-size. Each chunk is encoded in large
+model batches and searched with one matrix FAISS query; results are
+appended to the output JSONL as each chunk finishes, one line per input
+row, in input order:
+
+    {"row": 0, "id": "...", "recommended_assessments": [...], "scores": [...]}
+
+--resume continues an interrupted run after the last row in the output.
+--workers N forks N processes from the loaded recommender (weights are
+shared copy-on-write, as in api.serve); --pin-cores gives each its own
+subset of cores.
+
+Usage:
+    python -m recommender.bulk_score --input jds.csv --query-column description \\
+        --output scores.jsonl [--id-column job_id] [--top-k 10] [--workers 4 --pin-cores]
+    python -m recommender.bulk_score --input jds.jsonl --output scores.jsonl --resume
+"""
+import argparse
+import csv
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from recommender.bundle import bundle_exists
+from recommender.diversity import DIVERSITY_MODES, MMR_LAMBDA
+from recommender.embedding import BACKENDS, LONG_QUERY_MODES
+from recommender.result_store import ResultStore
+from recommender.scorer import SHLRecommender
+
+logger = logging.getLogger("shl.bulk")
+
+INPUT_PATH = "data/processed/assessments.json"
+BUNDLE_DIR = "data/processed/index_bundle"
+
+# Job descriptions can exceed csv's default 128 KiB field limit
+CSV_FIELD_LIMIT = 1 << 24
+
+# Resuming reads the previous output backwards in blocks of this size
+RESUME_BLOCK_SIZE = 1 << 16
+
+# Recommender inherited by forked pool workers
+_recommender = None
+
+
+def read_rows(path: str, query_field: str, id_field: str = None, fmt: str = None):
+    """
+    Yields (row number, query, id) from a CSV or JSONL file, streaming.
+    Blank JSONL lines are skipped and not numbered.
+    """
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            csv.field_size_limit(CSV_FIELD_LIMIT)
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+
+        for row, record in enumerate(records):
+            query = record.get(query_field) or ""
+            yield row, str(query), record.get(id_field) if id_field else None
+
+
+def last_newline(f, before: int, block_size: int = RESUME_BLOCK_SIZE) -> int:
+    """
+    Offset of the last b"\n" in f[:before], or -1, reading backwards in
+    fixed-size blocks so only the file's tail is read.
+    """
+    end = before
+    while end > 0:
+        start = max(0, end - block_size)
+        f.seek(start)
+        found = f.read(end - start).rfind(b"\n")
+        if found >= 0:
+            return start + found
+        end = start
+    return -1
+
+
+def resume_offset(output_path: str) -> int:
+    """
+    Row to resume from: one past the last complete line of a previous
+    run's output. A partially written last line is truncated away.
+    Reads only the tail of the file, whatever its size.
+    """
+    if not os.path.exists(output_path):
+        return 0
+
+    with open(output_path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = last_newline(f, size) + 1
+        if end < size:
+            f.truncate(end)
+        if end == 0:
+            return 0
+
+        start = last_newline(f, end - 1) + 1
+        f.seek(start)
+        return json.loads(f.read(end - start))["row"] + 1
+
+
+def score_chunk(recommender, chunk, top_k: int, filters: dict, fields,
+                include_query: bool = False) -> str:
+    """
+    Scores one chunk of (row, query, id) and returns its output lines.
+    """
+    state = recommender.state
+    store = state.result_store
+    hits = recommender.retrieve_batch([query for _, query, _ in chunk], top_k, filters, state)
+
+    lines = []
+    for (row, query, row_id), (ids, scores) in zip(chunk, hits):
+        head = {"row": row}
+        if row_id is not None:
+            head["id"] = row_id
+        if include_query:
+            head["query"] = query
+
+        lines.append(
+            json.dumps(head, ensure_ascii=False, separators=(",", ":"))[:-1] +
+            ',"recommended_assessments":' + store.json_array(ids, fields) +
+            ',"scores":' + json.dumps([round(s, 6) for s in scores]) + "}\n"
+        )
+    return "".join(lines)
+
+
+# -------------------------
+# Process pool
+# -------------------------
+def core_sets(workers: int):
+    """
+    Splits the cores this process may run on into `workers` contiguous
+    subsets (cores are shared round-robin when there are fewer cores).
+    """
+    cores = sorted(os.sched_getaffinity(0))
+    per_worker = max(1, len(cores) // workers)
+    return [
+        cores[i * per_worker:(i + 1) * per_worker] or [cores[i % len(cores)]]
+        for i in range(workers)
+    ]
+
+
+def init_worker(slots, counter, pin: bool):
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+
+    cores = slots[slot % len(slots)]
+    if pin:
+        os.sched_setaffinity(0, cores)
+
+    try:
+        import torch
+        torch.set_num_threads(len(cores))
+    except ImportError:
+        pass
+
+    import faiss
+    faiss.omp_set_num_threads(len(cores))
+
+
+def score_chunk_in_worker(chunk, top_k, filters, fields, include_query):
+    return score_chunk(_recommender, chunk, top_k, filters, fields, include_query)
+
+
+def scored_chunks(recommender, chunks, args, filters, fields):
+    """
+    Yields each chunk's output lines in input order, scoring in-process
+    or on a forked pool with a bounded number of chunks in flight.
+    """
+    if args.workers <= 1:
+        for chunk in chunks:
+            yield len(chunk), score_chunk(recommender, chunk, args.top_k, filters,
+                                          fields, args.include_query)
+        return
+
+    global _recommender
+    _recommender = recommender
+
+    context = multiprocessing.get_context("fork")
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(core_sets(args.workers), context.Value("i", 0), args.pin_cores)
+    )
+
+    with pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), pool.submit(
+                score_chunk_in_worker, chunk, args.top_k, filters, fields, args.include_query
+            )))
+            if len(pending) >= 2 * args.workers:
+                n, future = pending.popleft()
+                yield n, future.result()
+
+        while pending:
+            n, future = pending.popleft()
+            yield n, future.result()
+
+
+def chunked(rows, size: int):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-score a CSV/JSONL file of job descriptions")
+    parser.add_argument("--input", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                        help="Input format (default: from the file extension)")
+    parser.add_argument("--query-column", default="query")
+    parser.add_argument("--id-column", default=None, help="Copied to each output line as `id`")
+    parser.add_argument("--include-query", action="store_true")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--filters", default=None, help='JSON, e.g. \'{"max_duration": 30}\'')
+    parser.add_argument("--fields", nargs="+", default=None, help="Result fields (default: all)")
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=128, help="Encoder batch size")
+    parser.add_argument("--start", type=int, default=0, help="Skip the first N input rows")
+    parser.add_argument("--resume", action="store_true",
+                        help="Append after the last row already in --output")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pin-cores", action="store_true",
+                        help="Pin each worker to its own subset of cores")
+    parser.add_argument("--bundle", default=BUNDLE_DIR)
+    parser.add_argument("--json-path", default=INPUT_PATH)
+    parser.add_argument("--backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--long-query-mode", choices=LONG_QUERY_MODES, default=None,
+                        help="Window long JDs instead of truncating them")
+    parser.add_argument("--window-overlap", type=int, default=64)
+    parser.add_argument("--max-windows", type=int, default=8)
+    parser.add_argument("--lexical-routing", action="store_true",
+                        help="Answer confident keyword queries from the BM25 index")
+    parser.add_argument("--diversity", choices=DIVERSITY_MODES, default=None,
+                        help="Collapse near-duplicates or re-rank by MMR")
+    parser.add_argument("--mmr-lambda", type=float, default=MMR_LAMBDA)
+    args = parser.parse_args()
+
+    logging.basicConfig(level="INFO", format="%(asctime)s %(name)s %(message)s")
+
+    filters = json.loads(args.filters) if args.filters else None
+    try:
+        fields = ResultStore.resolve_fields(args.fields)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = args.start
+    if args.resume:
+        start = max(start, resume_offset(args.output))
+
+    # -------------------------
+    # Load once; pool workers are forked from this process
+    # -------------------------
+    if args.workers > 1:
+        threads = str(max(1, len(os.sched_getaffinity(0)) // args.workers))
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ.setdefault(var, threads)
+
+    source = {"bundle_dir": args.bundle} if bundle_exists(args.bundle) else {"json_path": args.json_path}
+    recommender = SHLRecommender(
+        cache_size=0,
+        backend=args.backend,
+        encode_batch_size=args.batch_size,
+        long_query_mode=args.long_query_mode,
+        window_overlap=args.window_overlap,
+        max_windows=args.max_windows,
+        lexical_routing=args.lexical_routing,
+        diversity=args.diversity,
+        mmr_lambda=args.mmr_lambda,
+        **source
+    )
+
+    rows = itertools.islice(
+        read_rows(args.input, args.query_column, args.id_column, args.format),
+        start,
+        None
+    )
+
+    # -------------------------
+    # Score and write incrementally
+    # -------------------------
+    scored = 0
+    started = time.perf_counter()
+    with open(args.output, "a" if args.resume else "w", encoding="utf-8") as out:
+        for n, lines in scored_chunks(recommender, chunked(rows, args.chunk_size),
+                                      args, filters, fields):
+            out.write(lines)
+            out.flush()
+
+            scored += n
+            elapsed = time.perf_counter() - started
+            logger.info("rows %d-%d done, %.1f rows/s", start, start + scored - 1, scored / elapsed)
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "input": args.input,
+        "output": args.output,
+        "start_row": start,
+        "rows": scored,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(scored / elapsed, 1) if elapsed else None,
+        "workers": args.workers,
+        "index_version": recommender.index_version
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
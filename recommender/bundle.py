@@ -0,0 +1,364 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from recommender.ann import build_index
+from recommender.lexical import LexicalIndex
+
+FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+INDEX_FILE = "index.faiss"
+METADATA_FILE = "metadata.json"
+LEXICAL_FILE = "lexical.json"
+
+# Each build writes its artifacts to a "v-<version>" directory; half-written
+# builds live in ".build-*" until sealed
+GENERATION_PREFIX = "v-"
+BUILD_PREFIX = ".build-"
+
+# Default index built for each embedding storage dtype
+INDEX_FACTORY_BY_DTYPE = {
+    "float32": "Flat",
+    "float16": "SQfp16"
+}
+
+
+class BundleError(ValueError):
+    """
+    Raised when an index bundle is missing, corrupt or misaligned.
+    """
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fsync_path(path: str):
+    """
+    Flushes a file (or a directory entry list) to disk.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def artifact_path(bundle_dir: str, name: str, info: dict) -> str:
+    # Bundles written before generation directories keep files at the top
+    return os.path.join(bundle_dir, info.get("path", name))
+
+
+def read_manifest(bundle_dir: str):
+    """
+    The bundle's manifest, or None when there is none (or it is unreadable).
+    """
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def remove_stale_generations(out_dir: str, keep):
+    """
+    Deletes artifacts not referenced by the `keep` manifests: older
+    generation directories, abandoned builds and pre-generation top-level
+    files. The previous generation is kept so a server that read the old
+    manifest just before the swap can still open its files.
+    """
+    referenced = set()
+    for manifest in filter(None, keep):
+        for name, info in manifest["files"].items():
+            referenced.add(info.get("path", name).split("/")[0])
+
+    for entry in os.listdir(out_dir):
+        if entry in referenced:
+            continue
+        path = os.path.join(out_dir, entry)
+        if entry.startswith((GENERATION_PREFIX, BUILD_PREFIX)) and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif entry in (EMBEDDINGS_FILE, INDEX_FILE, METADATA_FILE, LEXICAL_FILE):
+            os.remove(path)
+
+
+def build_faiss_index(embeddings, dtype: str = "float32", factory: str = None):
+    """
+    Builds an inner-product FAISS index; defaults to the exact index
+    for the storage dtype when no factory string is given.
+    """
+    return build_index(embeddings, factory or INDEX_FACTORY_BY_DTYPE[dtype])
+
+
+def read_faiss_index(path: str):
+    """
+    Reads a serialized FAISS index with IO_FLAG_MMAP_IFC when the installed
+    FAISS supports it, which memory-maps Flat / SQ code arrays. Returns
+    (index, whether the flag was applied); see catalogs.index_bytes for
+    what that leaves on the heap.
+    """
+    import faiss
+
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    if flags:
+        try:
+            return faiss.read_index(path, flags), True
+        except RuntimeError:
+            pass
+    return faiss.read_index(path), False
+
+
+def write_bundle(out_dir: str, embeddings, records, model_name: str,
+                 dtype: str = "float32", index=None, index_factory: str = None,
+                 text_normalization: dict = None) -> dict:
+    """
+    Writes a versioned index bundle into a new v-<version>/ directory of
+    `out_dir`, then commits it by atomically replacing out_dir/manifest.json:
+      - embeddings.npy  (row-aligned embedding matrix, float32 or float16)
+      - index.faiss     (serialized, trained FAISS index)
+      - metadata.json   (compact, row-aligned assessment records)
+      - lexical.json    (BM25 postings over names + cleaned descriptions)
+      - manifest.json   (file paths, checksums, row count, dim, dtype, model name)
+    `text_normalization` (build-time description cleaning stats) is
+    recorded in the manifest; its presence marks the descriptions in
+    metadata.json as already cleaned. Returns the manifest.
+    """
+    if dtype not in INDEX_FACTORY_BY_DTYPE:
+        raise BundleError(f"Unsupported embedding dtype: {dtype}")
+
+    if len(records) != embeddings.shape[0]:
+        raise BundleError(
+            f"Row mismatch: {len(records)} records vs {embeddings.shape[0]} embeddings"
+        )
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Artifacts go into a fresh generation directory and the manifest,
+    # which names that directory, is swapped in with one rename. A crash
+    # at any point leaves the previous manifest and its files intact, and
+    # a running server that memory-mapped the previous files keeps them
+    generation = tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=out_dir)
+
+    def tmp_path(name):
+        return os.path.join(generation, name)
+
+    # -------------------------
+    # Embeddings + FAISS index
+    # -------------------------
+    with open(tmp_path(EMBEDDINGS_FILE), "wb") as f:
+        np.save(f, embeddings.astype(dtype, copy=False))
+
+    index_factory = index_factory or INDEX_FACTORY_BY_DTYPE[dtype]
+    if index is None:
+        index = build_faiss_index(embeddings, dtype, index_factory)
+
+    import faiss
+    faiss.write_index(index, tmp_path(INDEX_FILE))
+
+    # -------------------------
+    # Compact metadata
+    # -------------------------
+    with open(tmp_path(METADATA_FILE), "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, separators=(",", ":"))
+
+    # -------------------------
+    # BM25 inverted index (lexical routing)
+    # -------------------------
+    with open(tmp_path(LEXICAL_FILE), "w", encoding="utf-8") as f:
+        json.dump(LexicalIndex.build(records).to_dict(), f, ensure_ascii=False,
+                  separators=(",", ":"))
+
+    # -------------------------
+    # Seal the generation directory
+    # -------------------------
+    files = {}
+    for name in (EMBEDDINGS_FILE, INDEX_FILE, METADATA_FILE, LEXICAL_FILE):
+        path = tmp_path(name)
+        fsync_path(path)
+        files[name] = {
+            "sha256": file_sha256(path),
+            "bytes": os.path.getsize(path)
+        }
+
+    created_at = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    version = f"{created_at}-{files[EMBEDDINGS_FILE]['sha256'][:12]}"
+
+    generation_dir = GENERATION_PREFIX + version
+    suffix = 0
+    while os.path.exists(os.path.join(out_dir, generation_dir)):
+        suffix += 1
+        generation_dir = f"{GENERATION_PREFIX}{version}.{suffix}"
+    # mkdtemp creates the directory 0700; a server running as another user
+    # must be able to open it
+    os.chmod(generation, 0o755 & ~current_umask())
+    os.rename(generation, os.path.join(out_dir, generation_dir))
+    fsync_path(out_dir)
+
+    for name, info in files.items():
+        info["path"] = f"{generation_dir}/{name}"
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "created_at": created_at,
+        "model_name": model_name,
+        "rows": int(embeddings.shape[0]),
+        "dim": int(embeddings.shape[1]),
+        "dtype": dtype,
+        "index_type": type(index).__name__,
+        "index_factory": index_factory,
+        "files": files
+    }
+    if text_normalization is not None:
+        manifest["text_normalization"] = text_normalization
+
+    # -------------------------
+    # Commit: swap the manifest in
+    # -------------------------
+    previous = read_manifest(out_dir)
+
+    manifest_tmp = os.path.join(out_dir, MANIFEST_FILE + ".tmp")
+    with open(manifest_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(manifest_tmp, os.path.join(out_dir, MANIFEST_FILE))
+    fsync_path(out_dir)
+
+    remove_stale_generations(out_dir, keep=(manifest, previous))
+
+    return manifest
+
+
+class IndexBundle:
+    """
+    A loaded index bundle. Embeddings are memory-mapped read-only
+    (zero-copy); the FAISS index is read from its serialized form.
+
+    File sizes are always checked against the manifest. Hashing every
+    artifact costs time proportional to the bundle, so SHA-256 checksums
+    are verified only with `verify_checksums` (or `python -m
+    recommender.bundle DIR`).
+    """
+
+    def __init__(self, bundle_dir: str, verify_checksums: bool = False):
+        self.bundle_dir = bundle_dir
+
+        manifest_path = os.path.join(bundle_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise BundleError(f"No index bundle manifest at {manifest_path}")
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise BundleError(
+                f"Unsupported bundle format: {self.manifest.get('format_version')}"
+            )
+
+        # -------------------------
+        # Verify sizes (and checksums on request)
+        # -------------------------
+        for name, info in self.manifest["files"].items():
+            path = self._path(name)
+            if not os.path.exists(path):
+                raise BundleError(f"Missing bundle file {name}")
+            if os.path.getsize(path) != info["bytes"]:
+                raise BundleError(f"Size mismatch for {name}")
+            if verify_checksums and file_sha256(path) != info["sha256"]:
+                raise BundleError(f"Checksum mismatch for {name}")
+
+        # -------------------------
+        # Load artifacts
+        # -------------------------
+        self.embeddings = np.load(self._path(EMBEDDINGS_FILE), mmap_mode="r")
+        self.index, self.index_mapped = read_faiss_index(self._path(INDEX_FILE))
+
+        with open(self._path(METADATA_FILE), "r", encoding="utf-8") as f:
+            self.records = json.load(f)
+
+        # -------------------------
+        # Refuse misaligned bundles
+        # -------------------------
+        rows = self.manifest["rows"]
+        if not (self.embeddings.shape[0] == self.index.ntotal == len(self.records) == rows):
+            raise BundleError(
+                f"Row mismatch: manifest={rows} embeddings={self.embeddings.shape[0]} "
+                f"index={self.index.ntotal} metadata={len(self.records)}"
+            )
+
+        if self.embeddings.shape[1] != self.manifest["dim"] or self.index.d != self.manifest["dim"]:
+            raise BundleError("Embedding dimension does not match manifest")
+
+    def _path(self, name: str) -> str:
+        return artifact_path(self.bundle_dir, name, self.manifest["files"][name])
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def model_name(self) -> str:
+        return self.manifest["model_name"]
+
+    @property
+    def lexical(self):
+        """
+        The BM25 index, read on access (only lexical routing needs it);
+        None for bundles written before the lexical index existed.
+        """
+        if LEXICAL_FILE not in self.manifest["files"]:
+            return None
+        with open(self._path(LEXICAL_FILE), "r", encoding="utf-8") as f:
+            return LexicalIndex.from_dict(json.load(f))
+
+    @property
+    def text_normalized(self) -> bool:
+        """
+        True when descriptions were cleaned at build time; older bundles
+        store the raw crawled text.
+        """
+        return "text_normalization" in self.manifest
+
+
+def bundle_exists(bundle_dir: str) -> bool:
+    return os.path.exists(os.path.join(bundle_dir, MANIFEST_FILE))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fully verify an index bundle, checksums included")
+    parser.add_argument("bundle_dir")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        bundle = IndexBundle(args.bundle_dir, verify_checksums=True)
+        report = {"bundle": args.bundle_dir, "ok": True, "version": bundle.version,
+                  "rows": bundle.manifest["rows"]}
+    except BundleError as e:
+        report = {"bundle": args.bundle_dir, "ok": False, "error": str(e)}
+    report["seconds"] = round(time.perf_counter() - started, 3)
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
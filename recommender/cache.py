@@ -0,0 +1,60 @@
+import re
+import threading
+from collections import OrderedDict
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a query string into a cache key.
+    Lowercases and collapses whitespace so trivially different
+    submissions of the same job description share one entry.
+    """
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache of query embeddings.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector):
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses
+            }
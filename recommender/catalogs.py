@@ -0,0 +1,223 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from recommender.bundle import bundle_exists
+from recommender.metrics import CATALOG_EVICTIONS, CATALOG_LOADS, stage
+from recommender.scorer import SHLRecommender
+
+logger = logging.getLogger("shl.catalogs")
+
+
+def parse_catalogs(spec: str) -> dict:
+    """
+    "uk=/bundles/uk,us=/bundles/us" -> {"uk": "/bundles/uk", "us": "/bundles/us"}.
+    """
+    catalogs = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, path = item.partition("=")
+        if not name.strip() or not path.strip():
+            raise ValueError(f"Invalid catalog entry {item!r}; expected name=path")
+        catalogs[name.strip()] = path.strip()
+    return catalogs
+
+
+def catalog_source(path: str) -> dict:
+    """
+    A catalog path is an index bundle directory, or a legacy assessments
+    JSON with its embeddings next to it.
+    """
+    return {"bundle_dir": path} if bundle_exists(path) else {"json_path": path}
+
+
+# Rough per-object overheads (bytes) of the Python-side structures:
+# record dicts / result fragments per byte of row JSON, and per BM25 term
+RECORD_BYTES_PER_JSON_BYTE = 6
+LEXICAL_BYTES_PER_TERM = 300
+
+
+def index_bytes(index, mapped: bool = False) -> int:
+    """
+    Approximate heap memory of a FAISS index: its codes plus, for HNSW,
+    the graph links. With `mapped` (read with IO_FLAG_MMAP_IFC) only the
+    code arrays of Flat and SQ indexes, standalone or as HNSW storage, are
+    memory-mapped; graphs, IVF lists and everything else stay on the heap.
+    """
+    import faiss
+
+    index = faiss.downcast_index(index)
+
+    graph = 0
+    hnsw = getattr(index, "hnsw", None)
+    if hnsw is not None:
+        # int32 neighbor ids, size_t offsets, int levels
+        graph = 4 * hnsw.neighbors.size() + 8 * hnsw.offsets.size() + 4 * hnsw.levels.size()
+        index = faiss.downcast_index(index.storage)
+
+    if mapped and isinstance(index, (faiss.IndexFlat, faiss.IndexScalarQuantizer)):
+        return graph
+
+    code_size = getattr(index, "code_size", None) or index.d * 4
+    return graph + index.ntotal * code_size
+
+
+def state_bytes(state) -> int:
+    """
+    Approximate private memory held by a loaded index: records +
+    pre-serialized result rows, the BM25 index, the FAISS index (see
+    index_bytes) and the embedding matrix unless it is memory-mapped.
+    Mapped files live in the shared, reclaimable page cache.
+    """
+    rows = sum(len(row) for row in state.result_store.rows_json)
+
+    vectors = index_bytes(state.index, state.index_mapped)
+    if not isinstance(state.embeddings, np.memmap):
+        vectors += state.embeddings.nbytes
+
+    lexical = 0
+    if state.lexical is not None:
+        lexical = sum(
+            ids.nbytes + weights.nbytes + LEXICAL_BYTES_PER_TERM
+            for ids, weights in state.lexical.postings.values()
+        )
+
+    return int(vectors + RECORD_BYTES_PER_JSON_BYTE * rows + lexical)
+
+
+class UnknownCatalogError(KeyError):
+    """
+    Raised for a catalog name that is not configured.
+    """
+
+
+class CatalogRegistry:
+    """
+    Named catalogs (one index, metadata and filter set each) served from
+    one process.
+
+    Catalogs are loaded on first use as SHLRecommender instances; the
+    query encoder is not part of a catalog but shared process-wide per
+    model (see embedding.shared_encoder), so a catalog costs only its
+    index. When the loaded catalogs exceed `memory_budget` bytes the least
+    recently used ones are dropped and reload on their next request.
+    Requests already holding an evicted catalog finish on it.
+
+    The budget is enforced only when a catalog is loaded, against the
+    size estimated then (see state_bytes); nothing is evicted between
+    loads, and memory that grows afterwards is not tracked.
+    """
+
+    def __init__(self, catalogs: dict, memory_budget: int = 0, **recommender_kwargs):
+        self.paths = dict(catalogs)
+        self.memory_budget = memory_budget
+        self.recommender_kwargs = recommender_kwargs
+
+        self._loaded = OrderedDict()       # name -> (recommender, bytes), LRU first
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in self.paths}
+
+    def names(self):
+        return list(self.paths)
+
+    def get(self, name: str) -> SHLRecommender:
+        """
+        The loaded catalog, loading it (and evicting others) if needed.
+        """
+        if name not in self.paths:
+            raise UnknownCatalogError(name)
+
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                return self._loaded[name][0]
+
+        # One load per catalog at a time; other catalogs keep serving
+        with self._load_locks[name]:
+            with self._lock:
+                if name in self._loaded:
+                    self._loaded.move_to_end(name)
+                    return self._loaded[name][0]
+
+            started = time.perf_counter()
+            recommender = SHLRecommender(
+                **catalog_source(self.paths[name]),
+                **self.recommender_kwargs
+            )
+            recommender.warmup()
+            size = state_bytes(recommender.state)
+            CATALOG_LOADS.inc(name)
+            logger.info("catalog %s loaded in %.2fs (%.1f MB, index %s)", name,
+                        time.perf_counter() - started, size / 2**20, recommender.index_version)
+
+            with self._lock:
+                self._loaded[name] = (recommender, size)
+                self._evict(keep=name)
+            return recommender
+
+    def _evict(self, keep: str):
+        """
+        Drops least recently used catalogs until within the memory budget
+        (never `keep`, the one just requested). Caller holds the lock.
+        """
+        if self.memory_budget <= 0:
+            return
+
+        while self._loaded_bytes() > self.memory_budget:
+            name = next((n for n in self._loaded if n != keep), None)
+            if name is None:
+                return
+            _, size = self._loaded.pop(name)
+            CATALOG_EVICTIONS.inc(name)
+            logger.info("catalog %s evicted (%.1f MB)", name, size / 2**20)
+
+    def _loaded_bytes(self) -> int:
+        return sum(size for _, size in self._loaded.values())
+
+    def loaded_bytes(self) -> int:
+        with self._lock:
+            return self._loaded_bytes()
+
+    def status(self):
+        with self._lock:
+            loaded = dict(self._loaded)
+        return [
+            {
+                "name": name,
+                "path": path,
+                "loaded": name in loaded,
+                "bytes": loaded[name][1] if name in loaded else None,
+                "index_version": loaded[name][0].index_version if name in loaded else None
+            }
+            for name, path in self.paths.items()
+        ]
+
+    def retrieve_across(self, names, query: str, top_k: int = 5, filters: dict = None):
+        """
+        Searches several catalogs with one encoded query and merges the
+        hits by score. Returns [(catalog name, state, row id, score)], best
+        first. All catalogs must share one encoder, otherwise their scores
+        are not comparable (ValueError).
+        """
+        catalogs = [(name, self.get(name)) for name in dict.fromkeys(names)]
+        if not catalogs or not query or not query.strip():
+            return []
+
+        encoders = {id(recommender.model) for _, recommender in catalogs}
+        if len(encoders) > 1:
+            raise ValueError("Catalogs were built with different models; scores are not comparable")
+
+        # -------------------------
+        # Encode once, search each catalog's snapshot
+        # -------------------------
+        query_vectors = catalogs[0][1].encode_query(query)
+
+        hits = []
+        for name, recommender in catalogs:
+            state = recommender.state
+            ids, scores = recommender.retrieve_encoded(query_vectors, top_k, filters, state)
+            hits.extend((name, state, row, score) for row, score in zip(ids, scores))
+
+        with stage("merge"):
+            order = np.argsort([-hit[3] for hit in hits], kind="stable")[:top_k]
+            return [hits[i] for i in order]
@@ -0,0 +1,106 @@
+import numpy as np
+
+# Rows whose embeddings have cosine similarity >= DUPLICATE_THRESHOLD are
+# near-duplicates ("(New)" variants, language / region versions, 7.0 vs
+# 7.1 solutions); clusters are the connected components of that graph
+DUPLICATE_THRESHOLD = 0.96
+
+# Rows per block of the similarity graph computation (block x N floats)
+BLOCK_SIZE = 1024
+
+DIVERSITY_MODES = ("mmr", "collapse")
+
+# MMR trade-off: weight of relevance vs novelty against already picked rows
+MMR_LAMBDA = 0.5
+
+
+def similar_pairs(embeddings, threshold: float = DUPLICATE_THRESHOLD,
+                  block_size: int = BLOCK_SIZE):
+    """
+    (rows, cols) of every pair rows < cols with cosine similarity >=
+    threshold, from unit-normalized embeddings. The similarity matrix is
+    computed one block of rows at a time, so memory stays block_size x N.
+    """
+    embeddings = np.asarray(embeddings, dtype="float32")
+    rows, cols = [], []
+
+    for start in range(0, len(embeddings), block_size):
+        sims = embeddings[start:start + block_size] @ embeddings.T
+        block_rows, block_cols = np.nonzero(sims >= threshold)
+        block_rows += start
+
+        upper = block_rows < block_cols
+        rows.append(block_rows[upper])
+        cols.append(block_cols[upper])
+
+    if not rows:
+        return np.zeros(0, dtype="int64"), np.zeros(0, dtype="int64")
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def connected_components(n: int, rows, cols):
+    """
+    Component label per node (its smallest member) of an undirected graph,
+    by min-label propagation with pointer jumping.
+    """
+    labels = np.arange(n)
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, rows, labels[cols])
+        np.minimum.at(labels, cols, labels[rows])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def cluster_ids(embeddings, threshold: float = DUPLICATE_THRESHOLD,
+                block_size: int = BLOCK_SIZE):
+    """
+    Near-duplicate cluster id per row: the smallest row id in its cluster
+    (a row without near-duplicates is its own cluster).
+    """
+    rows, cols = similar_pairs(embeddings, threshold, block_size)
+    return connected_components(len(embeddings), rows, cols).astype("int32")
+
+
+# -------------------------
+# Re-ranking of an over-fetched candidate list (best first)
+# -------------------------
+def collapse(clusters, top_k: int):
+    """
+    Positions of the best-ranked candidate of each cluster, in rank
+    order, at most top_k.
+    """
+    _, first = np.unique(clusters, return_index=True)
+    return np.sort(first)[:top_k]
+
+
+def mmr(relevance, embeddings, top_k: int, lam: float = MMR_LAMBDA):
+    """
+    Positions picked by maximal marginal relevance: each step takes the
+    candidate maximizing lam * relevance - (1 - lam) * (max similarity to
+    the candidates already picked). Relevance is scaled by the best
+    candidate's score, so dense, BM25 and fused scores all work.
+    """
+    k = min(top_k, len(relevance))
+    relevance = np.asarray(relevance, dtype="float32")
+    if len(relevance) and relevance.max() > 0:
+        relevance = relevance / relevance.max()
+
+    embeddings = np.asarray(embeddings, dtype="float32")
+    sims = embeddings @ embeddings.T
+
+    picked = np.zeros(k, dtype="int64")
+    redundancy = np.zeros(len(relevance), dtype="float32")
+    available = np.ones(len(relevance), dtype=bool)
+
+    for step in range(k):
+        gain = lam * relevance - (1.0 - lam) * redundancy
+        gain[~available] = -np.inf
+        best = int(np.argmax(gain))
+
+        picked[step] = best
+        available[best] = False
+        redundancy = np.maximum(redundancy, sims[best])
+
+    return picked
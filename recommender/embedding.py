@@ -1,16 +1,302 @@
-from sentence_transformers import SentenceTransformer
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
 import numpy as np
+from recommender.metrics import MODEL_LOAD_SECONDS
+
+DEFAULT_MODEL_NAME = "all-mpnet-base-v2"
+
+# fp32 PyTorch, dynamically int8-quantized PyTorch, or ONNX Runtime
+BACKENDS = ("torch", "int8", "onnx")
+
+# Modules each backend imports on load (onnx: requirements-dev.txt)
+BACKEND_MODULES = {
+    "torch": ("torch", "sentence_transformers"),
+    "int8": ("torch", "sentence_transformers"),
+    "onnx": ("sentence_transformers", "optimum", "onnxruntime")
+}
+
+# Local ONNX exports, one directory per model
+ONNX_EXPORT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "processed",
+    "onnx"
+)
+
+# Long-query modes: pool the window embeddings into one query vector
+# (mean / max), or search every window and fuse the hits (fusion)
+LONG_QUERY_MODES = ("mean", "max", "fusion")
+
+# Tokens taken by [CLS] / [SEP] within the model's max sequence length
+SPECIAL_TOKENS = 2
+
+# sentence_transformers (and torch) are imported on first model load, not
+# at import; assign a factory here to substitute the encoder class
+SentenceTransformer = None
+
+# Model files needed to tokenize without loading the weights
+TOKENIZER_FILES = ["*.json", "*.txt", "*.model"]
+
+
+def window_starts(n_tokens: int, window: int, overlap: int, max_windows: int):
+    """
+    Start offsets of overlapping `window`-token windows covering
+    `n_tokens`. Past `max_windows`, that many windows are spread evenly
+    over the text instead (less overlap, or gaps), bounding encode cost.
+    """
+    if n_tokens <= window:
+        return [0]
+
+    last = n_tokens - window
+    stride = max(1, window - overlap)
+    count = 1 + -(-last // stride)
+    if count <= max_windows:
+        return [min(i * stride, last) for i in range(count)]
+
+    return np.linspace(0, last, max_windows).round().astype(int).tolist()
+
+
+def missing_modules(backend: str):
+    """
+    Modules `backend` needs that are not installed (checked without
+    importing them).
+    """
+    return [name for name in BACKEND_MODULES[backend] if importlib.util.find_spec(name) is None]
+
+
+def load_tokenizer(model_name: str):
+    """
+    (tokenizer, max sequence length) of a sentence-transformers model,
+    read from its tokenizer and config files only, so counting tokens
+    never loads the weights. Hub names without an owner resolve like
+    SentenceTransformer's (sentence-transformers/<name>).
+    """
+    path = model_name
+    if not os.path.isdir(path):
+        from huggingface_hub import snapshot_download
+
+        repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        path = snapshot_download(repo, allow_patterns=TOKENIZER_FILES)
+
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(path)
+
+    # sentence_bert_config.json overrides the tokenizer's own limit
+    # (all-mpnet-base-v2: 384 vs 512); newer exports only set the latter
+    config = {}
+    config_path = os.path.join(path, "sentence_bert_config.json")
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    return tokenizer, config.get("max_seq_length") or tokenizer.model_max_length
+
+
+def sentence_transformer_class():
+    global SentenceTransformer
+    if SentenceTransformer is None:
+        from sentence_transformers import SentenceTransformer
+    return SentenceTransformer
+
 
 class EmbeddingModel:
-    def __init__(self, model_path=None):
-        if model_path:
-            self.model = SentenceTransformer(model_path)
+    """
+    Sentence embedding model behind a selectable inference backend.
+    Every backend returns L2-normalized float32 vectors; the scorer and
+    the index builder both encode through this class.
+    """
+
+    def __init__(self, model_path=None, backend: str = "torch", onnx_dir: str = ONNX_EXPORT_DIR):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown encoder backend {backend!r}; expected one of {BACKENDS}")
+
+        self.model_name = model_path or DEFAULT_MODEL_NAME
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self._model = None
+        self._tokenizer = None
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Identity used to key cached document embeddings; non-fp32
+        backends produce slightly different vectors, so they get their own.
+        """
+        if self.backend == "torch":
+            return self.model_name
+        return f"{self.model_name}@{self.backend}"
+
+    @property
+    def model(self):
+        # Loaded on first use, so fully cached rebuilds never load weights
+        if self._model is None:
+            self._model = self._load()
+        return self._model
+
+    def load(self):
+        return self.model
+
+    def _load(self):
+        SentenceTransformer = sentence_transformer_class()
+
+        if self.backend == "onnx":
+            return self._load_onnx()
+
+        if self.backend == "int8":
+            import torch
+
+            # Linear layers hold nearly all transformer FLOPs; weights are
+            # int8, activations are quantized on the fly per batch
+            model = SentenceTransformer(self.model_name, device="cpu")
+            return torch.quantization.quantize_dynamic(
+                model,
+                {torch.nn.Linear},
+                dtype=torch.qint8
+            )
+
+        return SentenceTransformer(self.model_name)
+
+    def _load_onnx(self):
+        """
+        Loads the local ONNX export, exporting the cached PyTorch weights
+        on first use (requires `sentence-transformers[onnx]`).
+        """
+        SentenceTransformer = sentence_transformer_class()
+
+        export_dir = os.path.join(self.onnx_dir, self.model_name.replace("/", "__"))
+        if os.path.isdir(export_dir):
+            return SentenceTransformer(export_dir, backend="onnx")
+
+        model = SentenceTransformer(
+            self.model_name,
+            backend="onnx",
+            model_kwargs={"export": True}
+        )
+        model.save(export_dir)
+        return model
+
+    def split_windows(self, text: str, overlap: int = 64, max_windows: int = 8):
+        """
+        Splits a text longer than the model's max sequence length into
+        overlapping windows (see window_starts), as substrings of the
+        original text. Shorter texts are returned whole, unchanged.
+        Tokenizers without offsets fall back to whitespace-separated words.
+        """
+        model = self.model
+        window = model.max_seq_length - SPECIAL_TOKENS
+
+        tokenizer = getattr(model, "tokenizer", None)
+        if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+            spans = tokenizer(
+                text,
+                add_special_tokens=False,
+                return_offsets_mapping=True
+            )["offset_mapping"]
         else:
-            self.model = SentenceTransformer("all-mpnet-base-v2")
+            spans = [m.span() for m in re.finditer(r"\S+", text)]
+
+        if len(spans) <= window:
+            return [text]
+
+        return [
+            text[spans[start][0]:spans[min(start + window, len(spans)) - 1][1]]
+            for start in window_starts(len(spans), window, overlap, max_windows)
+        ]
+
+    def _tokenizer_info(self):
+        """
+        (tokenizer, max sequence length): the loaded model's if it is
+        loaded, otherwise read without the weights (load_tokenizer).
+        """
+        if self._model is not None:
+            return getattr(self._model, "tokenizer", None), self._model.max_seq_length
+        if self._tokenizer is None:
+            self._tokenizer = load_tokenizer(self.model_name)
+        return self._tokenizer
 
-    def encode(self, texts):
-        return self.model.encode(
-            texts,
-            normalize_embeddings=True,
-            show_progress_bar=False
+    @property
+    def max_seq_length(self) -> int:
+        return self._tokenizer_info()[1]
+
+    def count_tokens(self, texts):
+        """
+        Tokens per text before truncation (whitespace-separated words
+        when the model has no tokenizer). Does not load the weights.
+        """
+        tokenizer, _ = self._tokenizer_info()
+        if tokenizer is None:
+            return [len(text.split()) for text in texts]
+        return [
+            len(ids)
+            for ids in tokenizer(list(texts), add_special_tokens=False, verbose=False)["input_ids"]
+        ]
+
+    def encode(self, texts, batch_size: int = 32):
+        return np.asarray(
+            self.model.encode(
+                texts,
+                batch_size=batch_size,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            ),
+            dtype="float32"
         )
+
+
+# ============================================================
+# Process-wide encoder registry: one loaded model per
+# (model name, backend), shared by every catalog in the process
+# ============================================================
+_shared_encoders = {}           # (model name, backend) -> loaded EmbeddingModel
+_load_locks = {}                # (model name, backend) -> lock held while loading it
+_shared_encoders_lock = threading.Lock()     # guards both dicts, never held while loading
+
+
+def shared_encoder(model_name: str, backend: str = "torch") -> EmbeddingModel:
+    """
+    The process-wide encoder for (model name, backend), loaded on first use.
+    Loads run outside the registry lock, one per key at a time, so a slow
+    load never blocks lookups of encoders that are already loaded.
+    """
+    key = (model_name, backend)
+    with _shared_encoders_lock:
+        model = _shared_encoders.get(key)
+        if model is not None:
+            return model
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    with load_lock:
+        # Another caller may have finished loading while this one waited
+        with _shared_encoders_lock:
+            model = _shared_encoders.get(key)
+            if model is not None:
+                return model
+
+        started = time.perf_counter()
+        model = EmbeddingModel(model_name, backend=backend)
+        model.load()
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - started)
+
+        with _shared_encoders_lock:
+            _shared_encoders[key] = model
+        return model
+
+
+def shared_encoders():
+    """
+    (model name, backend) of every loaded shared encoder.
+    """
+    with _shared_encoders_lock:
+        return list(_shared_encoders)
+
+
+def clear_shared_encoders():
+    """
+    Drops the registry's references, so the next shared_encoder() call loads
+    a fresh model (recommenders keep the ones they hold).
+    """
+    with _shared_encoders_lock:
+        _shared_encoders.clear()
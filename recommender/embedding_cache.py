@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import re
+import numpy as np
+
+VECTORS_FILE = "vectors.npy"
+KEYS_FILE = "keys.json"
+URLS_FILE = "urls.json"
+
+
+def content_key(model_key: str, text: str) -> str:
+    """
+    Hash of (model identity, normalized embedding text).
+    """
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(f"{model_key}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+def read_store(directory: str):
+    """
+    ({content key: vector}, {url: content key}) saved in a directory;
+    empty when there is none (or it is corrupt).
+    """
+    keys_path = os.path.join(directory, KEYS_FILE)
+    if not os.path.exists(keys_path):
+        return {}, {}
+
+    with open(keys_path, "r", encoding="utf-8") as f:
+        keys = json.load(f)
+    matrix = np.load(os.path.join(directory, VECTORS_FILE))
+
+    if len(keys) != matrix.shape[0]:
+        # Corrupt cache: start over rather than misalign vectors
+        return {}, {}
+
+    url_keys = {}
+    urls_path = os.path.join(directory, URLS_FILE)
+    if os.path.exists(urls_path):
+        with open(urls_path, "r", encoding="utf-8") as f:
+            url_keys = json.load(f)
+
+    return dict(zip(keys, matrix)), url_keys
+
+
+class EmbeddingCache:
+    """
+    On-disk cache of document embeddings keyed by content hash, with one
+    store per model cache key (cache_dir/<model>/), so a build with
+    another model or backend never drops this one's vectors.
+
+    Each store also remembers which key each URL had at that model's last
+    build, so a rebuild can report added / changed / removed / reused
+    documents.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.stores = {}        # model cache key -> (vectors, url keys)
+
+    def model_dir(self, model_key: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model_key)
+        digest = hashlib.sha256(model_key.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.cache_dir, f"{slug}-{digest}")
+
+    def _store(self, model_key: str):
+        if model_key not in self.stores:
+            directory = self.model_dir(model_key)
+            if not os.path.exists(os.path.join(directory, KEYS_FILE)):
+                # Caches from before per-model stores keep a single store at the
+                # top; content keys include the model, so foreign vectors never hit
+                directory = self.cache_dir
+            self.stores[model_key] = read_store(directory)
+        return self.stores[model_key]
+
+    def encode(self, model, urls, texts):
+        """
+        Returns embeddings for texts, encoding only documents whose
+        content key is not cached. Returns (embeddings, summary).
+        """
+        model_key = model.cache_key
+        vectors, url_keys = self._store(model_key)
+        keys = [content_key(model_key, text) for text in texts]
+
+        # -------------------------
+        # Encode only uncached content
+        # -------------------------
+        to_encode = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in to_encode:
+                to_encode[key] = text
+
+        if to_encode:
+            encoded = model.encode(list(to_encode.values()))
+            for key, vector in zip(to_encode.keys(), encoded):
+                vectors[key] = vector
+
+        embeddings = np.vstack([vectors[key] for key in keys]).astype("float32")
+
+        # -------------------------
+        # Diff against the previous build
+        # -------------------------
+        current = dict(zip(urls, keys))
+        summary = {
+            "added": sum(1 for url in current if url not in url_keys),
+            "changed": sum(
+                1 for url, key in current.items()
+                if url in url_keys and url_keys[url] != key
+            ),
+            "removed": sum(1 for url in url_keys if url not in current),
+            "reused": len(keys) - sum(1 for key in keys if key in to_encode),
+            "encoded": len(to_encode)
+        }
+
+        # -------------------------
+        # Drop this model's vectors no longer referenced
+        # -------------------------
+        live = set(keys)
+        self.stores[model_key] = (
+            {key: vec for key, vec in vectors.items() if key in live},
+            current
+        )
+
+        return embeddings, summary
+
+    def save(self):
+        """
+        Writes the stores of the models used since loading; other models'
+        stores are left as they are.
+        """
+        for model_key, (vectors, url_keys) in self.stores.items():
+            directory = self.model_dir(model_key)
+            os.makedirs(directory, exist_ok=True)
+
+            keys = list(vectors.keys())
+            if keys:
+                matrix = np.vstack([vectors[key] for key in keys])
+            else:
+                matrix = np.zeros((0, 0), dtype="float32")
+
+            np.save(os.path.join(directory, VECTORS_FILE), matrix)
+            with open(os.path.join(directory, KEYS_FILE), "w", encoding="utf-8") as f:
+                json.dump(keys, f)
+            with open(os.path.join(directory, URLS_FILE), "w", encoding="utf-8") as f:
+                json.dump(url_keys, f)
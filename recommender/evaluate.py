@@ -0,0 +1,365 @@
+"""
+Offline retrieval evaluation on a labeled set of (query, relevant URLs).
+
+Labeled URLs are mapped to index rows through a normalized-URL lookup
+(data/data_cleaning.py:normalize_url), every query is encoded in one
+batched call and searched with one matrix query, and recall@k,
+precision@k, MAP@k and MRR are computed with NumPy over the whole
+result matrix. Encode / search time is reported alongside.
+
+Labels are JSONL ({"query": ..., "relevant_urls": [...]}) or CSV with
+one (query, url) pair per row (columns "query"/"Query" and
+"url"/"Assessment_url"); pairs are grouped by query.
+
+Without --sweep, the prebuilt index bundle (or legacy index) that the
+API would serve is evaluated through SHLRecommender.retrieve_batch, the
+path the API uses, so lexical routing, long-query handling and
+diversity (same flags as bulk_score) are part of what is measured.
+With --sweep, every combination of encoder backend, embedding text
+recipe and FAISS index type is built from --input and evaluated, one
+process per (backend, recipe); the sweep measures dense retrieval only.
+
+Usage:
+    python -m recommender.evaluate --labels labels.jsonl [--k 1 5 10]
+    python -m recommender.evaluate --labels labels.csv --sweep \\
+        --backends torch int8 --recipes name_description name \\
+        --factories Flat "HNSW32,Flat" --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from data.data_cleaning import normalize_url
+from recommender.ann import apply_search_params, build_index, parse_search_params
+from recommender.build_index import (
+    EMBEDDING_CACHE_DIR, INPUT_PATH, build_texts, load_assessments, load_or_learn_boilerplate
+)
+from recommender.bundle import bundle_exists
+from recommender.diversity import DIVERSITY_MODES, MMR_LAMBDA
+from recommender.embedding import BACKENDS, DEFAULT_MODEL_NAME, LONG_QUERY_MODES, EmbeddingModel
+from recommender.boilerplate import clean_descriptions
+from recommender.embedding_cache import EmbeddingCache
+
+BUNDLE_DIR = "data/processed/index_bundle"
+DEFAULT_KS = (1, 3, 5, 10)
+
+
+# -------------------------
+# Embedding text recipes (documents), given build_index's boilerplate stripper
+# -------------------------
+def _cleaned(df, stripper):
+    return df.assign(description=clean_descriptions(df["description"].tolist(), stripper))
+
+
+def _name_description_texts(df, stripper):
+    return build_texts(_cleaned(df, stripper))
+
+
+def _name_texts(df, stripper):
+    return df["assessment_name"].str.lower().str.strip().tolist()
+
+
+def _description_texts(df, stripper):
+    return _cleaned(df, stripper)["description"].str.lower().str.strip().tolist()
+
+
+def _name_raw_description_texts(df, stripper):
+    return build_texts(df)
+
+
+RECIPES = {
+    "name_description": _name_description_texts,          # what build_index encodes
+    "name": _name_texts,
+    "description": _description_texts,
+    "name_raw_description": _name_raw_description_texts   # before boilerplate stripping
+}
+
+
+# -------------------------
+# Labels
+# -------------------------
+def load_labels(path: str):
+    """
+    Returns (queries, relevant URL lists), queries in first-seen order.
+    """
+    grouped = {}
+
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                row = {key.strip().lower(): value for key, value in row.items()}
+                query = row.get("query")
+                url = row.get("url") or row.get("assessment_url")
+                if query and url:
+                    grouped.setdefault(query.strip(), []).append(url)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    grouped.setdefault(item["query"].strip(), []).extend(item["relevant_urls"])
+
+    return list(grouped), list(grouped.values())
+
+
+def url_rows(records) -> dict:
+    """
+    Normalized URL -> index row.
+    """
+    return {normalize_url(record["url"]): row for row, record in enumerate(records)}
+
+
+def relevance_matrix(label_urls, lookup: dict, n_rows: int):
+    """
+    (n_queries, n_rows) boolean relevance matrix, plus the labeled URLs
+    that are not in the index.
+    """
+    relevant = np.zeros((len(label_urls), n_rows), dtype=bool)
+    unmapped = set()
+    for i, urls in enumerate(label_urls):
+        for url in urls:
+            row = lookup.get(normalize_url(url))
+            if row is None:
+                unmapped.add(url)
+            else:
+                relevant[i, row] = True
+    return relevant, sorted(unmapped)
+
+
+# -------------------------
+# Metrics
+# -------------------------
+def retrieval_metrics(ids, relevant, ks) -> dict:
+    """
+    recall@k, precision@k and MAP@k for each k, and MRR at the largest k,
+    from an (n_queries, K) matrix of retrieved rows (-1 = no hit).
+    Queries without any relevant row in the index are left out.
+    """
+    found = ids >= 0
+    hits = relevant[np.arange(len(ids))[:, None], np.where(found, ids, 0)] & found
+
+    n_relevant = relevant.sum(axis=1)
+    scored = n_relevant > 0
+    hits, n_relevant = hits[scored], n_relevant[scored]
+    if not len(hits):
+        return {"queries_scored": 0}
+
+    metrics = {"queries_scored": int(scored.sum())}
+    for k in sorted(ks):
+        top = hits[:, :k]
+        cumulative = np.cumsum(top, axis=1)
+        ranks = np.arange(1, top.shape[1] + 1)
+
+        metrics[f"recall@{k}"] = float(np.mean(cumulative[:, -1] / n_relevant))
+        metrics[f"precision@{k}"] = float(np.mean(cumulative[:, -1] / k))
+        average_precision = (cumulative / ranks * top).sum(axis=1) / np.minimum(n_relevant, k)
+        metrics[f"map@{k}"] = float(np.mean(average_precision))
+
+    first = hits.argmax(axis=1)
+    reciprocal = np.where(hits.any(axis=1), 1.0 / (first + 1), 0.0)
+    metrics[f"mrr@{max(ks)}"] = float(np.mean(reciprocal))
+
+    return {name: round(value, 4) if isinstance(value, float) else value
+            for name, value in metrics.items()}
+
+
+def timed_search(encode, search, queries, k: int):
+    """
+    One batched encode + one matrix search, timed separately.
+    """
+    started = time.perf_counter()
+    embeddings = encode(queries)
+    encoded = time.perf_counter()
+    _, ids = search(embeddings, k)
+    searched = time.perf_counter()
+
+    return ids, {
+        "encode_seconds": round(encoded - started, 4),
+        "search_seconds": round(searched - encoded, 4),
+        "queries_per_second": round(len(queries) / (searched - started), 1)
+    }
+
+
+# -------------------------
+# Evaluations
+# -------------------------
+def evaluate_recommender(recommender, queries, label_urls, ks) -> dict:
+    """
+    Evaluates the ranking an SHLRecommender serves, through the same
+    retrieve_batch call as the API (routing, diversity and long-query
+    modes included).
+    """
+    state = recommender.state
+    relevant, unmapped = relevance_matrix(label_urls, url_rows(state.data), len(state.data))
+
+    k = max(ks)
+    started = time.perf_counter()
+    batch_hits = recommender.retrieve_batch(queries, k, state=state)
+    elapsed = time.perf_counter() - started
+
+    # One row per query, padded with -1 past its hits
+    ids = np.full((len(queries), k), -1, dtype="int64")
+    for row, (hit_ids, _) in enumerate(batch_hits):
+        ids[row, :len(hit_ids)] = hit_ids[:k]
+
+    timing = {
+        "retrieve_seconds": round(elapsed, 4),
+        "queries_per_second": round(len(queries) / elapsed, 1) if elapsed else None
+    }
+    return {
+        "index_version": state.version,
+        "index_type": type(state.index).__name__,
+        **retrieval_metrics(ids, relevant, ks),
+        **timing,
+        "unmapped_urls": unmapped
+    }
+
+
+def evaluate_config(backend: str, recipe: str, factories, search_params: dict, model_name: str,
+                    input_path: str, cache_dir: str, stripper, queries, label_urls, ks):
+    """
+    Encodes the catalog with one (backend, recipe) and evaluates every
+    index type on it. Runs in a sweep worker process.
+    """
+    df = load_assessments(input_path)
+    texts = RECIPES[recipe](df, stripper)
+    model = EmbeddingModel(model_name, backend=backend)
+
+    # Reuse build_index's document embeddings where the content matches;
+    # the cache is only read here, never saved, so workers can't race
+    if cache_dir:
+        embeddings, _ = EmbeddingCache(cache_dir).encode(model, df["url"].tolist(), texts)
+    else:
+        embeddings = model.encode(texts)
+
+    relevant, unmapped = relevance_matrix(
+        label_urls,
+        url_rows(df.to_dict(orient="records")),
+        len(df)
+    )
+
+    # A warm embedding cache never loads the weights; load them before
+    # timing so the first query encode does not include model loading
+    model.load()
+
+    results = []
+    for factory in factories:
+        index = build_index(embeddings, factory)
+        apply_search_params(index, search_params)
+        ids, timing = timed_search(model.encode, index.search, queries, max(ks))
+        results.append({
+            "backend": backend,
+            "recipe": recipe,
+            "index_factory": factory,
+            **retrieval_metrics(ids, relevant, ks),
+            **timing,
+            "unmapped_urls": len(unmapped)
+        })
+    return results
+
+
+def init_sweep_worker(threads: int):
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    import faiss
+    faiss.omp_set_num_threads(threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency")
+    parser.add_argument("--labels", required=True, help="Labeled (query, URLs) JSONL or CSV")
+    parser.add_argument("--k", type=int, nargs="+", default=list(DEFAULT_KS))
+    parser.add_argument("--bundle", default=BUNDLE_DIR)
+    parser.add_argument("--json-path", default=INPUT_PATH)
+    parser.add_argument("--backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--long-query-mode", choices=LONG_QUERY_MODES, default=None,
+                        help="Windowed encoding of long queries, as SHL_LONG_QUERY_MODE")
+    parser.add_argument("--window-overlap", type=int, default=64)
+    parser.add_argument("--max-windows", type=int, default=8)
+    parser.add_argument("--lexical-routing", action="store_true",
+                        help="Route keyword queries to BM25, as SHL_LEXICAL_ROUTING")
+    parser.add_argument("--diversity", choices=DIVERSITY_MODES, default=None,
+                        help="Diversify results, as SHL_DIVERSITY")
+    parser.add_argument("--mmr-lambda", type=float, default=MMR_LAMBDA)
+    parser.add_argument("--sweep", action="store_true",
+                        help="Build and evaluate every backend x recipe x factory")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["torch"])
+    parser.add_argument("--recipes", nargs="+", choices=list(RECIPES), default=list(RECIPES))
+    parser.add_argument("--factories", nargs="+", default=["Flat", "HNSW32,Flat"])
+    parser.add_argument("--search-params", default="",
+                        help='ANN search parameters for the sweep, e.g. "nprobe=8,efSearch=64"')
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--cache-dir", default=EMBEDDING_CACHE_DIR,
+                        help="build_index embedding cache to reuse ('' = encode everything)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    queries, label_urls = load_labels(args.labels)
+    report = {"labels": args.labels, "queries": len(queries), "k": sorted(args.k)}
+
+    if not args.sweep:
+        from recommender.scorer import SHLRecommender
+
+        if bundle_exists(args.bundle):
+            source = {"bundle_dir": args.bundle}
+        else:
+            source = {"json_path": args.json_path}
+        recommender = SHLRecommender(
+            cache_size=0,
+            backend=args.backend,
+            long_query_mode=args.long_query_mode,
+            window_overlap=args.window_overlap,
+            max_windows=args.max_windows,
+            lexical_routing=args.lexical_routing,
+            diversity=args.diversity,
+            mmr_lambda=args.mmr_lambda,
+            **source
+        )
+        recommender.warmup()
+
+        report["result"] = evaluate_recommender(recommender, queries, label_urls, args.k)
+        print(json.dumps(report, indent=2))
+        return
+
+    # -------------------------
+    # Parallel sweep: one process per (backend, recipe)
+    # -------------------------
+    configs = [(backend, recipe) for backend in args.backends for recipe in args.recipes]
+
+    # The boilerplate build_index saved (learned and saved here if there is
+    # none yet), so cleaned texts match the served bundle and the cache hits
+    stripper, _ = load_or_learn_boilerplate(
+        load_assessments(args.input)["description"].tolist(),
+        cache_dir=args.cache_dir or None
+    )
+    workers = max(1, min(args.workers, len(configs)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_sweep_worker,
+                             initargs=(threads,)) as pool:
+        futures = [
+            pool.submit(
+                evaluate_config, backend, recipe, args.factories,
+                parse_search_params(args.search_params), args.model, args.input,
+                args.cache_dir, stripper, queries, label_urls, args.k
+            )
+            for backend, recipe in configs
+        ]
+        results = [result for future in futures for result in future.result()]
+
+    best = max(results, key=lambda r: r.get(f"map@{max(args.k)}", 0.0))
+    report["results"] = results
+    report["best"] = {key: best[key] for key in ("backend", "recipe", "index_factory")}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
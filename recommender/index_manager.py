@@ -0,0 +1,159 @@
+import logging
+import os
+import threading
+import time
+from recommender.bundle import MANIFEST_FILE, bundle_exists
+from recommender.metrics import REGISTRY, Counter
+from recommender.scorer import LEGACY_EMBEDDINGS_FILE
+
+logger = logging.getLogger("shl.index")
+
+INDEX_RELOADS = REGISTRY.register(Counter(
+    "shl_index_reloads_total",
+    "Index hot-reload attempts by outcome",
+    label_names=("outcome",)
+))
+
+
+class IndexManager:
+    """
+    Hot-reloads the recommender's index without restarting the process.
+
+    New artifacts are loaded and validated while the live index keeps
+    serving; on success the recommender's state is swapped atomically and
+    in-flight requests finish on the old one. A failed load keeps the
+    live index. The loaded embedding model is reused, never reloaded.
+
+    Reloads are triggered by `reload()` / `reload_async()`, or by polling
+    the artifacts' mtimes every `poll_seconds` (0 = no watcher).
+    """
+
+    def __init__(self, recommender, bundle_dir: str = None, json_path: str = None,
+                 poll_seconds: float = 0.0):
+        self.recommender = recommender
+        self.bundle_dir = bundle_dir
+        self.json_path = json_path
+        self.poll_seconds = poll_seconds
+
+        self._lock = threading.Lock()      # one reload at a time
+        self._stop = threading.Event()
+        self._watcher = None
+        self._fingerprint = self._artifact_fingerprint()
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_attempt_at = None
+
+    def _source(self) -> dict:
+        # A bundle takes over from the legacy files as soon as one exists
+        if self.bundle_dir and bundle_exists(self.bundle_dir):
+            return {"bundle_dir": self.bundle_dir}
+        return {"json_path": self.json_path}
+
+    def _artifact_fingerprint(self):
+        """
+        (path, mtime, size) of the files whose change means a new index:
+        the bundle manifest (written last) and the legacy JSON + .npy.
+        """
+        paths = []
+        if self.bundle_dir:
+            paths.append(os.path.join(self.bundle_dir, MANIFEST_FILE))
+        if self.json_path:
+            paths.append(self.json_path)
+            paths.append(os.path.join(
+                os.path.dirname(os.path.abspath(self.json_path)),
+                LEGACY_EMBEDDINGS_FILE
+            ))
+
+        fingerprint = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                fingerprint.append((path, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                fingerprint.append((path, None, None))
+        return tuple(fingerprint)
+
+    def reload(self) -> bool:
+        """
+        Loads the current artifacts and swaps them in. Returns True on
+        success; on failure the live index is kept and the error recorded.
+        Concurrent calls wait for the running reload.
+        """
+        with self._lock:
+            self.last_attempt_at = time.time()
+            # Remember what was attempted, so the watcher does not retry
+            # a broken artifact set until it changes again
+            self._fingerprint = self._artifact_fingerprint()
+
+            try:
+                state = self.recommender.load_state(**self._source())
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                INDEX_RELOADS.inc("failure")
+                logger.warning("index reload failed, keeping %s: %s",
+                               self.recommender.index_version, self.last_error)
+                return False
+
+            previous = self.recommender.index_version
+            self.recommender.swap_state(state)
+
+            self.reloads += 1
+            self.last_error = None
+            INDEX_RELOADS.inc("success")
+            logger.info("index reloaded %s -> %s in %.3fs",
+                        previous, state.version, state.load_seconds)
+            return True
+
+    def reload_async(self) -> threading.Thread:
+        thread = threading.Thread(target=self.reload, name="shl-index-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def check(self) -> bool:
+        """
+        Reloads when the artifacts changed since the last attempt.
+        """
+        if self._artifact_fingerprint() == self._fingerprint:
+            return False
+        return self.reload()
+
+    # -------------------------
+    # Background watcher
+    # -------------------------
+    def start(self):
+        if self.poll_seconds <= 0 or self._watcher is not None:
+            return
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="shl-index-watch", daemon=True)
+        self._watcher.start()
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("index watcher error")
+
+    def status(self) -> dict:
+        state = self.recommender.state
+        return {
+            "index_version": state.version,
+            "index_source": state.source,
+            "index_rows": len(state.data),
+            "index_loaded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(state.loaded_at)),
+            "index_load_seconds": round(state.load_seconds, 3),
+            "reloads": self.reloads,
+            "reload_failures": self.failures,
+            "last_reload_error": self.last_error,
+            "watching": self._watcher is not None
+        }
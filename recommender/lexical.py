@@ -0,0 +1,129 @@
+import re
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is of on or the to with".split()
+)
+
+# BM25 parameters; names count `NAME_WEIGHT` times as much as descriptions
+K1 = 1.2
+B = 0.75
+NAME_WEIGHT = 2.0
+
+
+def tokenize(text: str):
+    """
+    Lowercased alphanumeric tokens without stopwords ("Excel 365 (New)"
+    -> ["excel", "365", "new"]).
+    """
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def terms(tokens):
+    """
+    Unigrams plus adjacent bigrams, so "java 8" also matches as a phrase.
+    """
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over assessment names and cleaned descriptions.
+
+    Built once per index (at build time for bundles) and stored as one
+    (row ids, weights) posting pair per term. Each weight is the term's
+    full BM25 contribution for that row, with both fields folded in, so
+    a query is scored with one vectorized add per query term.
+    """
+
+    def __init__(self, postings: dict, size: int, name_terms):
+        self.postings = postings
+        self.size = size
+        self.name_terms = name_terms
+
+    @classmethod
+    def build(cls, records, k1: float = K1, b: float = B, name_weight: float = NAME_WEIGHT):
+        fields = (
+            ([terms(tokenize(r["assessment_name"])) for r in records], name_weight),
+            ([terms(tokenize(r.get("description", ""))) for r in records], 1.0)
+        )
+        size = len(records)
+
+        weights = {}
+        for docs, field_weight in fields:
+            lengths = np.array([len(doc) for doc in docs], dtype="float32")
+            avg_length = max(float(lengths.mean()), 1.0) if size else 1.0
+
+            frequencies = {}
+            for row, doc in enumerate(docs):
+                for term in doc:
+                    rows = frequencies.setdefault(term, {})
+                    rows[row] = rows.get(row, 0) + 1
+
+            for term, rows in frequencies.items():
+                idf = np.log(1.0 + (size - len(rows) + 0.5) / (len(rows) + 0.5))
+                ids = np.fromiter(rows, dtype="int32", count=len(rows))
+                tf = np.fromiter(rows.values(), dtype="float32", count=len(rows))
+                norm = k1 * (1.0 - b + b * lengths[ids] / avg_length)
+                contribution = field_weight * idf * tf * (k1 + 1.0) / (tf + norm)
+
+                term_weights = weights.setdefault(term, {})
+                for row, weight in zip(ids.tolist(), contribution.tolist()):
+                    term_weights[row] = term_weights.get(row, 0.0) + weight
+
+        postings = {
+            term: (
+                np.fromiter(rows, dtype="int32", count=len(rows)),
+                np.fromiter(rows.values(), dtype="float32", count=len(rows))
+            )
+            for term, rows in weights.items()
+        }
+        name_terms = [frozenset(tokenize(r["assessment_name"])) for r in records]
+        return cls(postings, size, name_terms)
+
+    def to_dict(self) -> dict:
+        return {
+            "size": self.size,
+            "postings": {
+                term: [ids.tolist(), [round(w, 5) for w in weights.tolist()]]
+                for term, (ids, weights) in self.postings.items()
+            },
+            "name_terms": [sorted(t) for t in self.name_terms]
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict):
+        postings = {
+            term: (np.asarray(ids, dtype="int32"), np.asarray(weights, dtype="float32"))
+            for term, (ids, weights) in payload["postings"].items()
+        }
+        name_terms = [frozenset(t) for t in payload["name_terms"]]
+        return cls(postings, payload["size"], name_terms)
+
+    def search(self, tokens, top_k: int, mask=None):
+        """
+        (row ids, scores) of the top_k rows by BM25 for a tokenized query,
+        best first; only rows matching at least one term (and `mask`).
+        """
+        scores = np.zeros(self.size, dtype="float32")
+        for term in set(terms(tokens)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+
+        if mask is not None:
+            scores[~mask] = 0.0
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        return order, scores[order]
+
+    def names_cover(self, row: int, tokens) -> bool:
+        """
+        True when every query token appears in the row's assessment name.
+        """
+        return set(tokens) <= self.name_terms[row]
@@ -0,0 +1,217 @@
+import re
+import numpy as np
+
+# SHL catalog test type keys
+TEST_TYPES = {
+    "A": "Ability & Aptitude",
+    "B": "Biodata & Situational Judgement",
+    "C": "Competencies",
+    "D": "Development & 360",
+    "E": "Assessment Exercises",
+    "K": "Knowledge & Skills",
+    "P": "Personality & Behavior",
+    "S": "Simulations"
+}
+
+JOB_LEVELS = [
+    "director",
+    "entry-level",
+    "executive",
+    "front line manager",
+    "general population",
+    "graduate",
+    "manager",
+    "mid-professional",
+    "professional individual contributor",
+    "supervisor"
+]
+
+TEST_TYPE_RE = re.compile(r"test type:\s*((?:[a-z]\s+)*[a-z])\s+remote testing:")
+JOB_LEVELS_RE = re.compile(r"job levels (.*?)(?:,? languages |,? assessment length |,? test type:)")
+LANGUAGES_RE = re.compile(r"(?:^|[,.] )languages (.*?)(?:,? assessment length |,? test type:)")
+DURATION_RE = re.compile(r"minutes = (?:max )?(\d+)(?: to (\d+))?")
+NOT_ADAPTIVE_RE = re.compile(r"\bnot adaptive\b")
+ADAPTIVE_RE = re.compile(r"\badaptive\b")
+
+# Longer entries are prose captured by a loose match, not language names
+MAX_LANGUAGE_LEN = 40
+
+STRUCTURED_FIELDS = (
+    "test_type",
+    "job_levels",
+    "languages",
+    "duration",
+    "remote_support",
+    "adaptive_support"
+)
+
+
+def _split_list(segment: str):
+    return [part.strip() for part in segment.split(",") if part.strip()]
+
+
+def extract_metadata(record: dict) -> dict:
+    """
+    Parses structured fields out of the crawled description text:
+    test type letters, job levels, languages, duration (minutes) and
+    adaptive support. Remote support is shown as an icon the text crawl
+    cannot see, so it stays None (unknown) unless the record carries it.
+    Values already present on the record take precedence.
+    """
+    text = (record.get("description") or "").lower()
+    name = (record.get("assessment_name") or "").lower()
+
+    # -------------------------
+    # Test type letters -> names
+    # -------------------------
+    match = TEST_TYPE_RE.search(text)
+    codes = match.group(1).upper().split() if match else []
+    test_type = [TEST_TYPES[c] for c in dict.fromkeys(codes) if c in TEST_TYPES]
+
+    # -------------------------
+    # Job levels (last "job levels" block, known values only)
+    # -------------------------
+    job_levels = []
+    matches = JOB_LEVELS_RE.findall(text)
+    if matches:
+        values = set(_split_list(matches[-1]))
+        job_levels = [level for level in JOB_LEVELS if level in values]
+
+    # -------------------------
+    # Languages
+    # -------------------------
+    languages = []
+    matches = LANGUAGES_RE.findall(text)
+    if matches:
+        languages = [
+            lang for lang in _split_list(matches[-1])
+            if len(lang) <= MAX_LANGUAGE_LEN
+        ]
+
+    # -------------------------
+    # Duration (upper bound for ranges; None if untimed/variable)
+    # -------------------------
+    duration = None
+    match = DURATION_RE.search(text)
+    if match:
+        duration = int(match.group(2) or match.group(1))
+
+    # -------------------------
+    # Adaptive support
+    # -------------------------
+    adaptive = "adaptive" in name or (
+        ADAPTIVE_RE.search(text) is not None and NOT_ADAPTIVE_RE.search(text) is None
+    )
+
+    parsed = {
+        "test_type": test_type,
+        "job_levels": job_levels,
+        "languages": languages,
+        "duration": duration,
+        "remote_support": None,
+        "adaptive_support": "Yes" if adaptive else "No"
+    }
+
+    return {
+        field: record[field] if record.get(field) not in (None, []) else parsed[field]
+        for field in STRUCTURED_FIELDS
+    }
+
+
+def enrich_records(records):
+    """
+    Adds structured fields to records that do not have them yet.
+    """
+    for record in records:
+        if any(field not in record for field in STRUCTURED_FIELDS):
+            record.update(extract_metadata(record))
+    return records
+
+
+class FilterIndex:
+    """
+    Per-value row bitmaps over the structured columns, used to restrict
+    FAISS search to matching IDs.
+    """
+
+    def __init__(self, records):
+        self.size = len(records)
+        self.bitmaps = {
+            "test_type": {},
+            "job_levels": {},
+            "languages": {}
+        }
+
+        for row, record in enumerate(records):
+            for field, bitmaps in self.bitmaps.items():
+                for value in record.get(field) or []:
+                    key = self._normalize(field, value)
+                    if key not in bitmaps:
+                        bitmaps[key] = np.zeros(self.size, dtype=bool)
+                    bitmaps[key][row] = True
+
+        # Remote support is only filterable where it is known
+        self.remote_known = np.array([r.get("remote_support") is not None for r in records], dtype=bool)
+        self.remote = np.array([r.get("remote_support") == "Yes" for r in records], dtype=bool)
+        self.adaptive = np.array([r.get("adaptive_support") == "Yes" for r in records], dtype=bool)
+        self.duration = np.array(
+            [r["duration"] if r.get("duration") is not None else -1 for r in records],
+            dtype=np.int32
+        )
+
+    @staticmethod
+    def _normalize(field: str, value: str) -> str:
+        value = value.strip().lower()
+        if field == "test_type":
+            # Accept either the letter code or the full name
+            for code, name in TEST_TYPES.items():
+                if value in (code.lower(), name.lower()):
+                    return code
+        return value
+
+    def _any_of(self, field: str, values):
+        mask = np.zeros(self.size, dtype=bool)
+        for value in values:
+            bitmap = self.bitmaps[field].get(self._normalize(field, value))
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def mask(self, filters: dict):
+        """
+        Returns a boolean row mask for the filters, or None if no filter
+        is set. Filters AND across fields and OR within a list field:
+          test_type, job_levels, languages: list of accepted values
+          remote_support, adaptive_support: bool (remote_support raises
+            ValueError when no row has it, e.g. text-crawled catalogs)
+          max_duration: int minutes (rows with unknown duration excluded)
+        """
+        if not filters:
+            return None
+
+        mask = None
+
+        def combine(current, new):
+            return new if current is None else current & new
+
+        for field in ("test_type", "job_levels", "languages"):
+            if filters.get(field):
+                mask = combine(mask, self._any_of(field, filters[field]))
+
+        if filters.get("remote_support") is not None:
+            if not self.remote_known.any():
+                raise ValueError("remote_support is not known for this catalog and cannot be filtered on")
+            wanted = bool(filters["remote_support"])
+            mask = combine(mask, self.remote_known & (self.remote == wanted))
+
+        if filters.get("adaptive_support") is not None:
+            wanted = bool(filters["adaptive_support"])
+            mask = combine(mask, self.adaptive == wanted)
+
+        if filters.get("max_duration") is not None:
+            mask = combine(
+                mask,
+                (self.duration >= 0) & (self.duration <= filters["max_duration"])
+            )
+
+        return mask
@@ -0,0 +1,207 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets (seconds) for per-stage histograms
+STAGE_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    inner = ",".join(f'{name}="{value}"' for name, value in pairs)
+    return "{" + inner + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    Gauge read from a callback at scrape time, or set explicitly.
+    """
+
+    def __init__(self, name: str, help_text: str, callback=None):
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def render(self):
+        value = self.callback() if self.callback else self.value
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {float(value)}"
+        ]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; observe() is a bisect plus a locked increment.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names=(), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    label_str = _format_labels(self.label_names, labels, ("le", le))
+                    lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+                label_str = _format_labels(self.label_names, labels)
+                lines.append(f"{self.name}_sum{label_str} {total}")
+                lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "shl_stage_duration_seconds",
+    "Time spent per recommendation stage",
+    label_names=("stage",)
+))
+
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "shl_model_load_seconds",
+    "Time taken to load the query embedding model"
+))
+
+# Lexical answers take microseconds; extend the buckets below STAGE_BUCKETS
+ROUTE_BUCKETS = (0.00001, 0.000025, 0.00005) + STAGE_BUCKETS
+
+QUERY_ROUTES = REGISTRY.register(Counter(
+    "shl_query_routes_total",
+    "Queries by retrieval path (lexical, hybrid, dense) under lexical routing",
+    label_names=("route",)
+))
+ROUTE_SECONDS = REGISTRY.register(Histogram(
+    "shl_route_duration_seconds",
+    "Per-query retrieval latency by path (batched encodes amortized)",
+    label_names=("route",),
+    buckets=ROUTE_BUCKETS
+))
+
+CATALOG_LOADS = REGISTRY.register(Counter(
+    "shl_catalog_loads_total",
+    "Catalog loads into memory (first use or after eviction)",
+    label_names=("catalog",)
+))
+CATALOG_EVICTIONS = REGISTRY.register(Counter(
+    "shl_catalog_evictions_total",
+    "Catalogs evicted to stay within the catalog memory budget",
+    label_names=("catalog",)
+))
+
+# ============================================================
+# Per-request stage traces (for the slow-query log)
+# ============================================================
+_current_trace = contextvars.ContextVar("shl_trace", default=None)
+
+
+def start_trace():
+    """
+    Starts collecting stage timings for the current request context.
+    Returns (trace dict, token for end_trace).
+    """
+    trace = {"_started": time.perf_counter()}
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def record_stage(name: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, name)
+
+    trace = _current_trace.get()
+    if trace is not None:
+        trace[name] = trace.get(name, 0.0) + seconds
+
+
+def mark_since_start(name: str):
+    """
+    Records the time since the trace started as a stage (e.g. request
+    parsing, measured when the handler begins).
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        record_stage(name, time.perf_counter() - trace["_started"])
+
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
@@ -0,0 +1,108 @@
+import json
+
+# Public response fields, in response order
+API_FIELDS = (
+    "url",
+    "name",
+    "adaptive_support",
+    "description",
+    "duration",
+    "remote_support",
+    "test_type"
+)
+
+
+class ResultStore:
+    """
+    API-shaped assessment records, built once at index load time from
+    records whose descriptions are already cleaned (recommender/boilerplate.py).
+
+    Values are kept column-wise (one list per field) and also
+    pre-serialized as JSON fragments, so results are assembled by row
+    index lookup and string joins only. Data never changes between
+    index builds, so none of this work is repeated per request.
+    """
+
+    def __init__(self, records):
+        self.size = len(records)
+
+        # -------------------------
+        # Columns (cleaned, defaults applied)
+        # -------------------------
+        self.columns = {
+            "url": [r["url"] for r in records],
+            "name": [r["assessment_name"] for r in records],
+            "adaptive_support": [r.get("adaptive_support", "No") for r in records],
+            "description": [r.get("description", "") for r in records],
+            "duration": [r.get("duration", None) for r in records],
+            "remote_support": [r.get("remote_support") for r in records],
+            "test_type": [tuple(r.get("test_type", [])) for r in records]
+        }
+
+        # -------------------------
+        # Pre-serialized `"field":value` fragments + full rows
+        # -------------------------
+        self.fragments = {
+            field: [
+                json.dumps(field) + ":" + json.dumps(value, ensure_ascii=False)
+                for value in values
+            ]
+            for field, values in self.columns.items()
+        }
+        self.rows_json = [
+            "{" + ",".join(self.fragments[field][i] for field in API_FIELDS) + "}"
+            for i in range(self.size)
+        ]
+
+    @staticmethod
+    def resolve_fields(fields=None):
+        """
+        Validates a field projection. Returns None for "all fields",
+        otherwise a tuple of fields in the requested order.
+        """
+        if not fields:
+            return None
+
+        unknown = [field for field in fields if field not in API_FIELDS]
+        if unknown:
+            raise ValueError(
+                f"Unknown fields {unknown}; expected any of {list(API_FIELDS)}"
+            )
+
+        fields = tuple(dict.fromkeys(fields))
+        return None if fields == API_FIELDS else fields
+
+    def rows(self, ids, fields=None):
+        """
+        Returns API-shaped dicts for row ids, restricted to `fields`.
+        """
+        fields = self.resolve_fields(fields) or API_FIELDS
+        columns = [(field, self.columns[field]) for field in fields]
+        return [
+            {field: column[i] for field, column in columns}
+            for i in ids
+        ]
+
+    def json_objects(self, ids, fields=None):
+        """
+        Returns the JSON object of each row id, restricted to `fields`,
+        built from pre-serialized fragments.
+        """
+        fields = self.resolve_fields(fields)
+
+        if fields is None:
+            rows_json = self.rows_json
+            return [rows_json[i] for i in ids]
+
+        fragments = [self.fragments[field] for field in fields]
+        return [
+            "{" + ",".join(column[i] for column in fragments) + "}"
+            for i in ids
+        ]
+
+    def json_array(self, ids, fields=None) -> str:
+        """
+        Returns the JSON array of API-shaped records for row ids,
+        restricted to `fields`.
+        """
+        return "[" + ",".join(self.json_objects(ids, fields)) + "]"
@@ -1,8 +1,79 @@
 import json
+import os
+import time
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-from recommender.utils import clean_description
+from recommender.ann import apply_search_params, search_parameters
+from recommender.boilerplate import clean_descriptions
+from recommender.bundle import BundleError, IndexBundle
+from recommender.cache import QueryEmbeddingCache, normalize_query
+from recommender.diversity import DIVERSITY_MODES, MMR_LAMBDA, cluster_ids, collapse, mmr
+from recommender.embedding import DEFAULT_MODEL_NAME, LONG_QUERY_MODES, shared_encoder
+from recommender.lexical import LexicalIndex, tokenize
+from recommender.metadata import FilterIndex, enrich_records
+from recommender.metrics import QUERY_ROUTES, ROUTE_SECONDS, stage
+from recommender.result_store import ResultStore
+
+
+LEGACY_EMBEDDINGS_FILE = "assessment_embeddings.npy"
+
+# Filtered searches matching at most this many rows are scored exactly
+# over the matching subset instead of through a FAISS ID selector
+SUBSET_SEARCH_MAX_IDS = 2048
+
+# Lexical routing: queries of at most LEXICAL_MAX_TOKENS tokens whose top
+# BM25 hit contains every query token in its name skip the encoder;
+# other queries of at most HYBRID_MAX_TOKENS tokens with a lexical match
+# fuse the dense and BM25 rankings (reciprocal rank fusion)
+LEXICAL_MAX_TOKENS = 4
+HYBRID_MAX_TOKENS = 32
+HYBRID_CANDIDATES = 50
+RRF_K = 60
+
+# Diversified search re-ranks DIVERSITY_OVERFETCH x top_k candidates
+DIVERSITY_OVERFETCH = 5
+
+
+class IndexState:
+    """
+    One loaded index: records, embeddings, FAISS index, filter bitmaps,
+    near-duplicate clusters and result store. Never mutated after construction, so requests holding a
+    reference keep a consistent view while a newer state is swapped in.
+    """
+
+    def __init__(self, data, embeddings, index, version: str, source: str,
+                 load_seconds: float, lexical: LexicalIndex = None,
+                 index_mapped: bool = False):
+        self.data = data
+        self.embeddings = embeddings
+        self.index = index
+        self.index_mapped = index_mapped      # read with IO_FLAG_MMAP_IFC (Flat / SQ codes mapped)
+        self.version = version
+        self.source = source
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+        # -------------------------
+        # Structured columns + filter bitmaps
+        # -------------------------
+        enrich_records(self.data)
+        self.filter_index = FilterIndex(self.data)
+
+        # Near-duplicate cluster per row (rows without one: their own)
+        self.cluster_ids = np.fromiter(
+            (record.get("cluster_id", row) for row, record in enumerate(self.data)),
+            dtype="int32",
+            count=len(self.data)
+        )
+
+        # -------------------------
+        # Cleaned, pre-serialized result rows
+        # -------------------------
+        self.result_store = ResultStore(self.data)
+
+        # -------------------------
+        # BM25 inverted index (lexical routing only)
+        # -------------------------
+        self.lexical = lexical
 
 
 class SHLRecommender:
@@ -10,61 +81,589 @@ class SHLRecommender:
     SHL Assessment Recommender using precomputed Sentence Transformer embeddings + FAISS
     """
 
-    def __init__(self, json_path: str):
+    def __init__(self, json_path: str = None, cache_size: int = 1024, bundle_dir: str = None,
+                 search_params: dict = None, backend: str = "torch",
+                 encode_batch_size: int = 32, long_query_mode: str = None,
+                 window_overlap: int = 64, max_windows: int = 8,
+                 lexical_routing: bool = False, diversity: str = None,
+                 mmr_lambda: float = MMR_LAMBDA, verify_checksums: bool = False):
+        # -------------------------
+        # Query embedding cache (LRU)
+        # -------------------------
+        self.query_cache = QueryEmbeddingCache(max_size=cache_size)
+        self.model = None
+        self.model_name = None
+
+        # Query encoder backend: "torch" (fp32), "int8" or "onnx"
+        self.backend = backend
+        self.encode_batch_size = encode_batch_size
+
+        # Queries past the model's max sequence length: truncated (None),
+        # or split into overlapping token windows (see LONG_QUERY_MODES)
+        if long_query_mode is not None and long_query_mode not in LONG_QUERY_MODES:
+            raise ValueError(
+                f"Unknown long query mode {long_query_mode!r}; expected one of {LONG_QUERY_MODES}"
+            )
+        self.long_query_mode = long_query_mode
+        self.window_overlap = window_overlap
+        self.max_windows = max_windows
+
+        # Answer short keyword queries from the BM25 index when confident
+        self.lexical_routing = lexical_routing
+
+        # Diversified results: None, "collapse" (one row per near-duplicate
+        # cluster) or "mmr" (maximal marginal relevance)
+        if diversity is not None and diversity not in DIVERSITY_MODES:
+            raise ValueError(
+                f"Unknown diversity mode {diversity!r}; expected one of {DIVERSITY_MODES}"
+            )
+        self.diversity = diversity
+        self.mmr_lambda = mmr_lambda
+
+        # Runtime ANN tuning, e.g. {"nprobe": 16, "efSearch": 64}
+        self.search_params = dict(search_params or {})
+
+        # Hash every bundle artifact on (re)load, not just check sizes
+        self.verify_checksums = verify_checksums
+
+        self.load_index(json_path=json_path, bundle_dir=bundle_dir)
+
+    def _load_model(self, model_name: str):
+        # -------------------------
+        # Embedding model (query only), shared process-wide
+        # -------------------------
+        if self.model is None:
+            self.model = shared_encoder(model_name, self.backend)
+            self.model_name = model_name
+        elif model_name != self.model_name:
+            raise BundleError(
+                f"Index was built with {model_name}, but {self.model_name} is loaded"
+            )
+
+    def load_index(self, json_path: str = None, bundle_dir: str = None):
+        """
+        Loads assessment metadata + embeddings + FAISS index, either from a
+        versioned index bundle (preferred) or from the legacy JSON + .npy pair,
+        and makes it the live index.
+        """
+        self.swap_state(self.load_state(json_path=json_path, bundle_dir=bundle_dir))
+
+    def load_state(self, json_path: str = None, bundle_dir: str = None) -> IndexState:
+        """
+        Loads and validates an index without touching the live one.
+        The already-loaded model is reused; an index built with a
+        different model is refused.
+        """
+        started = time.perf_counter()
+
+        if bundle_dir:
+            # -------------------------
+            # Open bundle (mmap, prebuilt FAISS index)
+            # -------------------------
+            bundle = IndexBundle(bundle_dir, verify_checksums=self.verify_checksums)
+            self._load_model(bundle.model_name)
+            lexical = bundle.lexical if self.lexical_routing else None
+            text_normalized = bundle.text_normalized
+
+            data = bundle.records
+            embeddings = bundle.embeddings
+            index = bundle.index
+            index_mapped = bundle.index_mapped
+            version = bundle.version
+            source = bundle_dir
+        else:
+            data, embeddings, index = self._load_legacy(json_path)
+            index_mapped = False
+            lexical = None
+            text_normalized = False
+            version = "legacy"
+            source = json_path
+
+        apply_search_params(index, self.search_params)
+
+        # Raw crawled descriptions (legacy JSON, older bundles) are cleaned
+        # once here, after the structured fields are parsed out of them
+        if not text_normalized:
+            enrich_records(data)
+            cleaned = clean_descriptions([record.get("description", "") for record in data])
+            for record, description in zip(data, cleaned):
+                record["description"] = description
+
+        # Bundles from before build-time clustering get clusters here
+        if self.diversity and any("cluster_id" not in record for record in data):
+            for record, cluster in zip(data, cluster_ids(embeddings).tolist()):
+                record["cluster_id"] = cluster
+
+        # Bundles from before the lexical index existed get one built here
+        if self.lexical_routing and lexical is None:
+            lexical = LexicalIndex.build(data)
+
+        return IndexState(
+            data,
+            embeddings,
+            index,
+            version=version,
+            source=source,
+            load_seconds=time.perf_counter() - started,
+            lexical=lexical,
+            index_mapped=index_mapped
+        )
+
+    def swap_state(self, state: IndexState):
+        """
+        Atomically replaces the live index. In-flight requests finish on
+        the state they started with. The query embedding cache stays
+        valid because the model is unchanged.
+        """
+        self.state = state
+
+    # -------------------------
+    # Read-only views of the live state
+    # -------------------------
+    @property
+    def data(self):
+        return self.state.data
+
+    @property
+    def embeddings(self):
+        return self.state.embeddings
+
+    @property
+    def index(self):
+        return self.state.index
+
+    @property
+    def filter_index(self):
+        return self.state.filter_index
+
+    @property
+    def result_store(self):
+        return self.state.result_store
+
+    @property
+    def index_version(self) -> str:
+        return self.state.version
+
+    def _load_legacy(self, json_path: str):
+        self._load_model(DEFAULT_MODEL_NAME)
+
         # -------------------------
         # Load assessment metadata
         # -------------------------
         with open(json_path, "r", encoding="utf-8") as f:
-            self.data = json.load(f)
+            data = json.load(f)
 
         # -------------------------
-        # Load precomputed embeddings
+        # Load precomputed embeddings (next to the metadata file)
         # -------------------------
-        self.embeddings = np.load(
-            "data/processed/assessment_embeddings.npy"
-        ).astype("float32")
+        embeddings_path = os.path.join(
+            os.path.dirname(os.path.abspath(json_path)),
+            LEGACY_EMBEDDINGS_FILE
+        )
+        embeddings = np.load(embeddings_path, mmap_mode="r")
+
+        if embeddings.shape[0] != len(data):
+            raise BundleError(
+                f"Row mismatch: {len(data)} records vs "
+                f"{embeddings.shape[0]} embeddings"
+            )
 
         # -------------------------
-        # Load embedding model (query only)
+        # Build FAISS index
         # -------------------------
-        self.model = SentenceTransformer("all-mpnet-base-v2")
+        import faiss
+
+        index = faiss.IndexFlatIP(embeddings.shape[1])
+        index.add(np.ascontiguousarray(embeddings, dtype="float32"))
+        return data, embeddings, index
+
+    def encode_query(self, query: str):
+        """
+        Returns the (1, dim) float32 embedding for a query,
+        served from the LRU cache when the normalized query was seen before.
+        (In "fusion" mode, one row per window.)
+        """
+        return self.encode_queries([query])
+
+    def encode_queries(self, queries):
+        """
+        Returns the (n, dim) float32 embedding matrix for a list of queries.
+        Cache misses are encoded together in a single batched model call.
+        (In "fusion" mode, the window rows of every query, stacked.)
+        """
+        return np.vstack(self._encode_cached(queries))
+
+    def _encode_cached(self, queries):
+        """
+        One (windows, dim) array per query; a single row unless the long
+        query mode is "fusion".
+        """
+        keys = [normalize_query(q) for q in queries]
+        vectors = [self.query_cache.get(key) for key in keys]
 
         # -------------------------
-        # Build FAISS index
+        # Encode cache misses in one batch
         # -------------------------
-        dim = self.embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dim)
-        self.index.add(self.embeddings)
+        missing = {}
+        for i, (key, vector) in enumerate(zip(keys, vectors)):
+            if vector is None:
+                missing.setdefault(key, []).append(i)
 
-    def recommend(self, query: str, top_k: int = 5):
-        if not query or not query.strip():
-            return []
+        if missing:
+            texts = [queries[positions[0]] for positions in missing.values()]
+            with stage("encode"):
+                encoded = self._encode_texts(texts)
+
+            for (key, positions), vector in zip(missing.items(), encoded):
+                vector.setflags(write=False)
+                self.query_cache.put(key, vector)
+                for i in positions:
+                    vectors[i] = vector
+
+        return vectors
+
+    def _encode_texts(self, texts):
+        """
+        Encodes texts in one batched model call. In long query mode every
+        text is first split into token windows, all windows of all texts
+        go through the same call, and are then pooled per text.
+        """
+        if self.long_query_mode is None:
+            encoded = self.model.encode(texts, batch_size=self.encode_batch_size)
+            return [row.reshape(1, -1) for row in encoded]
+
+        windows = [
+            self.model.split_windows(text, self.window_overlap, self.max_windows)
+            for text in texts
+        ]
+        encoded = self.model.encode(
+            [window for text_windows in windows for window in text_windows],
+            batch_size=self.encode_batch_size
+        )
+
+        pooled = []
+        start = 0
+        for text_windows in windows:
+            block = encoded[start:start + len(text_windows)]
+            start += len(text_windows)
+
+            if self.long_query_mode == "fusion":
+                pooled.append(np.ascontiguousarray(block))
+                continue
+
+            if self.long_query_mode == "mean":
+                vector = block.mean(axis=0, keepdims=True)
+            else:
+                vector = block.max(axis=0, keepdims=True)
+            pooled.append(vector / np.maximum(np.linalg.norm(vector), 1e-12))
+
+        return pooled
+
+    def warmup(self):
+        """
+        Runs one encode + search outside the query cache and metrics, so
+        lazy initialization (kernels, thread pools, allocator arenas)
+        happens before the first real request.
+        """
+        vector = self.model.encode(["warmup"])
+        state = self.state
+        self._search(vector, 1, None, state)
+
+    def set_search_params(self, **params):
+        """
+        Tunes ANN search at runtime (nprobe for IVF, efSearch for HNSW).
+        """
+        self.search_params.update(params)
+        apply_search_params(self.state.index, self.search_params)
+
+    def search(self, query_embeddings, top_k: int, filters: dict = None,
+               state: IndexState = None):
+        """
+        FAISS search, optionally restricted to rows matching `filters`
+        (see FilterIndex.mask). Filtered searches still return a full
+        top_k when enough rows match.
+        """
+        with stage("search"):
+            return self._search(query_embeddings, top_k, filters, state or self.state)
+
+    def _search(self, query_embeddings, top_k: int, filters: dict, state: IndexState):
+        mask = state.filter_index.mask(filters)
+        if mask is None:
+            return state.index.search(query_embeddings, top_k)
+
+        ids = np.flatnonzero(mask)
+        n = query_embeddings.shape[0]
+
+        if len(ids) == 0:
+            return (
+                np.full((n, top_k), -np.inf, dtype="float32"),
+                np.full((n, top_k), -1, dtype="int64")
+            )
 
         # -------------------------
-        # Encode query ONLY
+        # Small subsets: exact scoring over matching rows only
         # -------------------------
-        query_embedding = self.model.encode(
-            [query],
-            normalize_embeddings=True
-        ).astype("float32")
+        if len(ids) <= SUBSET_SEARCH_MAX_IDS:
+            subset = np.asarray(state.embeddings[ids], dtype="float32")
+            sims = query_embeddings @ subset.T
+
+            k = min(top_k, len(ids))
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+
+            scores = np.full((n, top_k), -np.inf, dtype="float32")
+            indices = np.full((n, top_k), -1, dtype="int64")
+            scores[:, :k] = np.take_along_axis(top_scores, order, axis=1)
+            indices[:, :k] = ids[np.take_along_axis(top, order, axis=1)]
+            return scores, indices
 
         # -------------------------
-        # Search FAISS index
+        # Large subsets: FAISS search through an ID bitmap selector
         # -------------------------
-        scores, indices = self.index.search(query_embedding, top_k)
+        import faiss
+
+        bitmap = np.packbits(mask, bitorder="little")
+        selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+        params = search_parameters(state.index, selector)
+        return state.index.search(query_embeddings, top_k, params=params)
+
+    def _search_fused(self, query_vectors, top_k: int, filters: dict, state: IndexState):
+        """
+        Searches every window of every query in one FAISS call and fuses
+        each query's window hits by max score. A row's fused score is its
+        best window's score, so the per-window top_k always contains the
+        fused top_k.
+        """
+        scores, indices = self.search(np.vstack(query_vectors), top_k, filters, state)
+
+        fused_scores = np.full((len(query_vectors), top_k), -np.inf, dtype="float32")
+        fused_indices = np.full((len(query_vectors), top_k), -1, dtype="int64")
+
+        start = 0
+        for row, vectors in enumerate(query_vectors):
+            window_scores = scores[start:start + len(vectors)].ravel()
+            window_indices = indices[start:start + len(vectors)].ravel()
+            start += len(vectors)
+
+            # Best score first, then the first occurrence of each row id
+            order = np.argsort(-window_scores, kind="stable")
+            ids = window_indices[order]
+            _, first = np.unique(ids, return_index=True)
+            best = np.sort(first)
+            best = best[ids[best] >= 0][:top_k]
+
+            fused_indices[row, :len(best)] = ids[best]
+            fused_scores[row, :len(best)] = window_scores[order][best]
+
+        return fused_scores, fused_indices
+
+    def _hydrate(self, ids, scores, state: IndexState):
+        """
+        Maps one query's hits to assessment dicts.
+        """
+        with stage("hydrate"):
+            return self._hydrate_rows(ids, scores, state)
+
+    def _hydrate_rows(self, ids, scores, state: IndexState):
+        columns = state.result_store.columns
+        names = columns["name"]
+        urls = columns["url"]
+        descriptions = columns["description"]
+        durations = columns["duration"]
+        remote = columns["remote_support"]
+        adaptive = columns["adaptive_support"]
+        test_types = columns["test_type"]
+
+        return [
+            {
+                "assessment_name": names[i],
+                "url": urls[i],
+                "description": descriptions[i],
+                "duration": durations[i],
+                "remote_support": remote[i],
+                "adaptive_support": adaptive[i],
+                "test_type": list(test_types[i]),
+                "score": score
+            }
+            for i, score in zip(ids, scores)
+        ]
+
+    def retrieve(self, query: str, top_k: int = 5, filters: dict = None,
+                 state: IndexState = None):
+        """
+        Returns (row ids, scores) of the top_k hits for one query, without
+        building result dicts; rows are looked up in the result store of
+        the same `state` (default: the live one).
+        """
+        return self.retrieve_batch([query], top_k, filters, state)[0]
+
+    def retrieve_batch(self, queries, top_k: int = 5, filters: dict = None,
+                       state: IndexState = None):
+        """
+        Returns one (row ids, scores) pair per query, in input order.
+        All queries are encoded in one batched call and searched with a
+        single 2-D FAISS query; blank queries yield no hits.
+
+        With lexical routing, confident keyword queries are answered from
+        the BM25 index instead (scores are then BM25 scores), and
+        ambiguous short queries get dense + BM25 rank-fused results.
+        """
+        state = state or self.state
+        valid = [i for i, q in enumerate(queries) if q and q.strip()]
+        empty = ([], [])
+        hits = [empty for _ in queries]
+
+        if not valid:
+            return hits
+
+        # -------------------------
+        # Lexical fast path
+        # -------------------------
+        routes = {}
+        if self.lexical_routing:
+            mask = state.filter_index.mask(filters)
+            dense = []
+            for i in valid:
+                started = time.perf_counter()
+                with stage("lexical"):
+                    route, ids, scores = self._route(queries[i], top_k, mask, state)
+                elapsed = time.perf_counter() - started
+
+                if route == "lexical":
+                    hits[i] = self._top(ids, scores, top_k, state)
+                    QUERY_ROUTES.inc(route)
+                    ROUTE_SECONDS.observe(elapsed, route)
+                else:
+                    dense.append(i)
+                    routes[i] = (route, ids, elapsed)
+
+            valid = dense
+            if not valid:
+                return hits
+
+        started = time.perf_counter()
+        depth = top_k
+        if any(route == "hybrid" for route, _, _ in routes.values()):
+            depth = max(top_k, HYBRID_CANDIDATES)
+        if self.diversity:
+            depth = max(depth, top_k * DIVERSITY_OVERFETCH)
+
+        # -------------------------
+        # Encode all queries together
+        # -------------------------
+        query_vectors = self._encode_cached([queries[i] for i in valid])
+
+        # -------------------------
+        # Search FAISS index once
+        # -------------------------
+        if self.long_query_mode == "fusion":
+            scores, indices = self._search_fused(query_vectors, depth, filters, state)
+        else:
+            scores, indices = self.search(np.vstack(query_vectors), depth, filters, state)
+
+        for row, i in enumerate(valid):
+            keep = indices[row] >= 0
+            ids, row_scores = indices[row][keep], scores[row][keep]
+
+            route, lexical_ids, _ = routes.get(i, ("dense", None, 0.0))
+            if route == "hybrid":
+                ids, row_scores = self._fuse_ranks(ids, lexical_ids, depth)
+            hits[i] = self._top(ids, row_scores, top_k, state)
+
+        # Encoding and search are shared by the batch: amortize their time
+        if routes:
+            shared = (time.perf_counter() - started) / len(valid)
+            for route, _, elapsed in routes.values():
+                QUERY_ROUTES.inc(route)
+                ROUTE_SECONDS.observe(elapsed + shared, route)
+
+        return hits
+
+    def retrieve_encoded(self, query_vectors, top_k: int = 5, filters: dict = None,
+                         state: IndexState = None):
+        """
+        Returns (row ids, scores) for one query already encoded by
+        encode_query, possibly by another catalog sharing the encoder.
+        Dense retrieval only, so scores are cosine similarities and
+        comparable across catalogs encoded by the same model.
+        """
+        state = state or self.state
+        depth = top_k * DIVERSITY_OVERFETCH if self.diversity else top_k
+
+        if self.long_query_mode == "fusion":
+            scores, indices = self._search_fused([query_vectors], depth, filters, state)
+        else:
+            scores, indices = self.search(query_vectors, depth, filters, state)
+
+        keep = indices[0] >= 0
+        return self._top(indices[0][keep], scores[0][keep], top_k, state)
+
+    def _route(self, query: str, top_k: int, mask, state: IndexState):
+        """
+        Picks the retrieval path for one query: ("lexical", BM25 candidate
+        ids, scores) for a confident keyword match, ("hybrid", BM25 candidate ids, ...)
+        when some rows match lexically, else ("dense", None, None).
+        """
+        tokens = tokenize(query)
+        if not tokens or len(tokens) > HYBRID_MAX_TOKENS:
+            return "dense", None, None
+
+        ids, scores = state.lexical.search(tokens, max(top_k, HYBRID_CANDIDATES), mask)
+        if len(ids) == 0:
+            return "dense", None, None
+
+        if len(tokens) <= LEXICAL_MAX_TOKENS and state.lexical.names_cover(ids[0], tokens):
+            return "lexical", ids, scores
+
+        return "hybrid", ids, scores
+
+    @staticmethod
+    def _fuse_ranks(dense_ids, lexical_ids, top_k: int):
+        """
+        Reciprocal rank fusion of a dense and a BM25 ranking.
+        """
+        fused = {}
+        for ranking in (dense_ids.tolist(), lexical_ids.tolist()):
+            for rank, row in enumerate(ranking):
+                fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        best = sorted(fused.items(), key=lambda item: -item[1])[:top_k]
+        return (
+            np.array([row for row, _ in best], dtype="int64"),
+            np.array([score for _, score in best], dtype="float64")
+        )
+
+    def _top(self, ids, scores, top_k: int, state: IndexState):
+        """
+        The first top_k of a ranked candidate list as (ids, scores) lists;
+        with diversity on, picked from all candidates by cluster collapsing
+        or MMR instead.
+        """
+        if self.diversity is None or len(ids) == 0:
+            return ids[:top_k].tolist(), scores[:top_k].tolist()
+
+        with stage("diversify"):
+            if self.diversity == "collapse":
+                keep = collapse(state.cluster_ids[ids], top_k)
+            else:
+                keep = mmr(scores, state.embeddings[ids], top_k, self.mmr_lambda)
 
-        results = []
-        for idx, score in zip(indices[0], scores[0]):
-            item = self.data[idx]
-            results.append({
-            "assessment_name": item["assessment_name"],
-            "url": item["url"],
-            "description": clean_description(item.get("description", "")),            "duration": item.get("duration", None),
-            "remote_support": item.get("remote_support", "Yes"),
-            "adaptive_support": item.get("adaptive_support", "No"),
-            "test_type": item.get("test_type", []),
-            "score": float(score)
-            })
+        return ids[keep].tolist(), scores[keep].tolist()
 
+    def recommend(self, query: str, top_k: int = 5, filters: dict = None):
+        state = self.state
+        ids, scores = self.retrieve(query, top_k, filters, state)
+        return self._hydrate(ids, scores, state)
 
-        return results
+    def recommend_batch(self, queries, top_k: int = 5, filters: dict = None):
+        """
+        Recommends assessments for many queries at once (see retrieve_batch).
+        Results are returned in input order; blank queries yield an empty
+        list. `filters` apply to every query.
+        """
+        state = self.state
+        return [
+            self._hydrate(ids, scores, state)
+            for ids, scores in self.retrieve_batch(queries, top_k, filters, state)
+        ]
@@ -0,0 +1,153 @@
+"""
+Verifies an encoder backend against the fp32 PyTorch reference on the
+catalog, and times both.
+
+  - cosine agreement: per-document cosine between reference and candidate
+    embeddings of the same text (mean / min)
+  - top-k overlap: for each query, |reference top-k ∩ candidate top-k| / k,
+    where each side searches its own catalog embeddings
+
+Queries default to the assessment names; pass --queries FILE (one per
+line) to use real hiring queries instead.
+
+With --backend all, every non-fp32 backend is verified in turn; those
+whose dependencies are not installed are reported as skipped.
+
+Usage:
+    python -m recommender.verify_encoder --backend int8 [--top-k 10]
+    python -m recommender.verify_encoder --backend onnx --min-cosine 0.995
+    python -m recommender.verify_encoder --backend all
+"""
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from recommender.build_index import INPUT_PATH, build_texts, load_assessments
+from recommender.embedding import BACKENDS, DEFAULT_MODEL_NAME, EmbeddingModel, missing_modules
+
+
+def timed_encode(model, texts, batch_size: int):
+    model.load()
+    started = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size)
+    return embeddings, time.perf_counter() - started
+
+
+def single_query_ms(model, queries, n: int = 50):
+    timings = []
+    for query in queries[:n]:
+        started = time.perf_counter()
+        model.encode([query])
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(float(np.percentile(timings, 50)), 3)
+
+
+def top_k(query_embeddings, doc_embeddings, k: int):
+    sims = query_embeddings @ doc_embeddings.T
+    return np.argsort(-sims, axis=1)[:, :k]
+
+
+def verify(reference, ref_docs, ref_seconds, backend: str, texts, queries, args) -> dict:
+    """
+    Compares one candidate backend against the fp32 reference.
+    """
+    candidate = EmbeddingModel(args.model, backend=backend)
+
+    # -------------------------
+    # Catalog embeddings (bulk encode)
+    # -------------------------
+    cand_docs, cand_seconds = timed_encode(candidate, texts, args.batch_size)
+
+    cosines = np.sum(ref_docs * cand_docs, axis=1)
+
+    # -------------------------
+    # Retrieval agreement
+    # -------------------------
+    ref_top = top_k(reference.encode(queries, args.batch_size), ref_docs, args.top_k)
+    cand_top = top_k(candidate.encode(queries, args.batch_size), cand_docs, args.top_k)
+    overlaps = [len(set(r) & set(c)) / args.top_k for r, c in zip(ref_top, cand_top)]
+
+    report = {
+        "backend": backend,
+        "documents": len(texts),
+        "queries": len(queries),
+        "cosine_mean": round(float(cosines.mean()), 5),
+        "cosine_min": round(float(cosines.min()), 5),
+        f"top{args.top_k}_overlap_mean": round(float(np.mean(overlaps)), 4),
+        f"top{args.top_k}_overlap_min": round(float(np.min(overlaps)), 4),
+        "bulk_docs_per_second": {
+            "torch": round(len(texts) / ref_seconds, 1),
+            backend: round(len(texts) / cand_seconds, 1)
+        },
+        "single_query_p50_ms": {
+            "torch": single_query_ms(reference, queries),
+            backend: single_query_ms(candidate, queries)
+        }
+    }
+    report["passed"] = (
+        report["cosine_mean"] >= args.min_cosine
+        and report[f"top{args.top_k}_overlap_mean"] >= args.min_overlap
+    )
+    return report
+
+
+def main():
+    candidates = [b for b in BACKENDS if b != "torch"]
+
+    parser = argparse.ArgumentParser(description="Verify encoder backends against fp32")
+    parser.add_argument("--backend", choices=candidates + ["all"], required=True,
+                        help="Backend to verify; \"all\" skips those whose dependencies are missing")
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--queries", default=None, help="Text file, one query per line")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--min-overlap", type=float, default=0.9)
+    args = parser.parse_args()
+
+    backends = candidates if args.backend == "all" else [args.backend]
+
+    # -------------------------
+    # Skip backends that cannot load here
+    # -------------------------
+    results = []
+    runnable = []
+    for backend in backends:
+        missing = sorted(set(missing_modules("torch") + missing_modules(backend)))
+        if missing:
+            results.append({"backend": backend, "skipped": f"missing {', '.join(missing)}"})
+        else:
+            runnable.append(backend)
+
+    if runnable:
+        texts = build_texts(load_assessments(args.input))
+
+        if args.queries:
+            with open(args.queries, "r", encoding="utf-8") as f:
+                queries = [line.strip() for line in f if line.strip()]
+        else:
+            queries = load_assessments(args.input)["assessment_name"].tolist()
+
+        reference = EmbeddingModel(args.model, backend="torch")
+        ref_docs, ref_seconds = timed_encode(reference, texts, args.batch_size)
+
+        results.extend(
+            verify(reference, ref_docs, ref_seconds, backend, texts, queries, args)
+            for backend in runnable
+        )
+
+    # An explicitly requested backend must run; "all" only checks what can
+    if args.backend != "all" and not runnable:
+        passed = False
+    else:
+        passed = all(result.get("passed", True) for result in results)
+
+    print(json.dumps(results[0] if args.backend != "all" else
+                     {"results": results, "passed": passed}, indent=2))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()